@@ -0,0 +1,27 @@
+import glob
+import os
+import sys
+
+from src.parser.paritychecker import ParityChecker
+
+
+SAMPLE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test")
+
+
+def main():
+    # both parsers must build the same tree for every sample program, or
+    # for the programs named on the command line
+    data_files = sys.argv[1:] or sorted(glob.glob(os.path.join(SAMPLE_DIRECTORY, "*.txt")))
+
+    checker = ParityChecker()
+    for data_file in data_files:
+        try:
+            functions = checker.check(data_file)
+        except Exception as e:
+            print data_file + ": " + str(e)
+            sys.exit(1)
+        print data_file + ": parsers agree on " + str(functions) + " functions"
+
+
+if __name__ == "__main__":
+    main()
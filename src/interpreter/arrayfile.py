@@ -0,0 +1,111 @@
+import ast
+import mmap
+import os
+import struct
+import sys
+
+from box.mappedvalues import MappedValues
+
+
+# arrays are stored as raw little endian int64 or one byte bools, or as
+# version 1.0 .npy files holding a one dimensional array of either
+NPY_MAGIC = "\x93NUMPY"
+
+NPY_TYPES = {
+    "int": "<i8",
+    "bool": "|b1"
+}
+
+TYPECODES = {
+    "int": "l",
+    "bool": "b"
+}
+
+
+def load_array(array_box, path):
+    element_type = array_box.get_element_type()
+
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                raise Exception("Cannot load an array from empty file " + path)
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, mmap.error) as e:
+        raise Exception("Cannot load " + path + ": " + str(e))
+
+    offset = 0
+    if path.endswith(".npy"):
+        offset, size = read_npy_header(mapping, path, element_type)
+    else:
+        itemsize = 8 if element_type == "int" else 1
+        if size % itemsize != 0:
+            raise Exception(path + " is not a whole number of " + element_type + " values")
+        size /= itemsize
+
+    if size == 0:
+        raise Exception("Cannot load an array from empty file " + path)
+    if size != array_box.get_size():
+        raise Exception(path + " holds " + str(size) + " values, expected " + str(array_box.get_size()))
+
+    array_box.set_mapped_values(MappedValues(mapping, offset, size, TYPECODES[element_type]))
+
+
+def save_array(array_box, path):
+    element_type = array_box.get_element_type()
+
+    try:
+        with open(path, "wb") as f:
+            if path.endswith(".npy"):
+                f.write(npy_header(element_type, array_box.get_size()))
+            for values in array_box.get_chunks():
+                if sys.byteorder == "big":
+                    values = values[:]
+                    values.byteswap()
+                values.tofile(f)
+    except (IOError, OSError) as e:
+        raise Exception("Cannot save " + path + ": " + str(e))
+
+
+def read_npy_header(mapping, path, element_type):
+    if len(mapping) < 10 or mapping[:6] != NPY_MAGIC:
+        raise Exception(path + " is not a .npy file")
+
+    major = ord(mapping[6])
+    if major == 1:
+        header_size, = struct.unpack("<H", mapping[8:10])
+        start = 10
+    elif major in (2, 3):
+        header_size, = struct.unpack("<I", mapping[8:12])
+        start = 12
+    else:
+        raise Exception(path + " has unsupported .npy version " + str(major))
+
+    try:
+        header = ast.literal_eval(mapping[start:start + header_size])
+        descr = header["descr"]
+        shape = header["shape"]
+    except (SyntaxError, ValueError, KeyError, TypeError):
+        raise Exception(path + " has a malformed .npy header")
+
+    # byte order marks aside the element type must match the array
+    if str(descr).lstrip("<=|") != NPY_TYPES[element_type].lstrip("<=|"):
+        raise Exception(path + " holds " + str(descr) + " values, expected " + NPY_TYPES[element_type])
+    if not isinstance(shape, tuple) or len(shape) != 1:
+        raise Exception(path + " does not hold a one dimensional array")
+
+    offset = start + header_size
+    itemsize = 8 if element_type == "int" else 1
+    if len(mapping) - offset < shape[0] * itemsize:
+        raise Exception(path + " is shorter than its .npy header says")
+
+    return offset, shape[0]
+
+
+def npy_header(element_type, size):
+    header = "{'descr': '" + NPY_TYPES[element_type] + "', 'fortran_order': False, 'shape': (" + str(size) + ",), }"
+
+    # the header is padded so the data starts on a 64 byte boundary
+    padding = 64 - (10 + len(header) + 1) % 64
+    header += " " * (padding % 64) + "\n"
+    return NPY_MAGIC + "\x01\x00" + struct.pack("<H", len(header)) + header
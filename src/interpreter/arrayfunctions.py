@@ -0,0 +1,119 @@
+import itertools
+import operator
+
+from arrayfile import load_array, save_array
+from runtime import get_array, typecast_int, typecast_bool
+
+
+# array functions run over the array storage directly rather than
+# element by element through the interpreter. user functions of the same
+# name take precedence, so programs defining their own keep working
+
+
+def array_fill(array_box, value):
+    array_box.fill(get_element(array_box, value))
+
+
+def array_copy(array_box, source):
+    if get_array(source).get_element_type() != array_box.get_element_type():
+        raise Exception("Unable to typecast to correct array type")
+    array_box.copy(source)
+
+
+def array_sum(array_box):
+    return sum(sum(chunk) for chunk in get_int_array(array_box).get_chunks())
+
+
+def array_min(array_box):
+    return min(min(chunk) for chunk in get_int_array(array_box).get_chunks())
+
+
+def array_max(array_box):
+    return max(max(chunk) for chunk in get_int_array(array_box).get_chunks())
+
+
+def array_dot(array_box, other):
+    left = get_int_array(array_box)
+    right = get_int_array(other)
+    if left.get_size() != right.get_size():
+        raise Exception("Incorrect array size")
+    return sum(itertools.imap(operator.mul, get_elements(left), get_elements(right)))
+
+
+def array_sort(array_box):
+    array_box.sort()
+
+
+def array_reverse(array_box):
+    array_box.reverse()
+
+
+def array_count(array_box, value):
+    value = get_element(array_box, value)
+    return sum(chunk.count(value) for chunk in array_box.get_chunks())
+
+
+def array_load(array_box, path):
+    load_array(array_box, get_string(path))
+
+
+def array_save(array_box, path):
+    save_array(array_box, get_string(path))
+
+
+def get_int_array(value):
+    array_box = get_array(value)
+    if array_box.get_element_type() != "int":
+        raise Exception("Expected type array_int")
+    return array_box
+
+
+def get_elements(array_box):
+    return itertools.chain.from_iterable(array_box.get_chunks())
+
+
+def get_string(value):
+    if not isinstance(value, str):
+        raise Exception("Expected type string")
+    return value
+
+
+def get_element(array_box, value):
+    if array_box.get_element_type() == "int":
+        return typecast_int(value)
+    return typecast_bool(value)
+
+
+# name: (function, parameter types, return type) where "array" is an
+# array of any element type and "element" a value of that element type
+ARRAY_FUNCTIONS = {
+    "fill": (array_fill, ("array", "element"), "void"),
+    "copy": (array_copy, ("array", "array"), "void"),
+    "sum": (array_sum, ("array_int",), "int"),
+    "min": (array_min, ("array_int",), "int"),
+    "max": (array_max, ("array_int",), "int"),
+    "dot": (array_dot, ("array_int", "array_int"), "int"),
+    "sort": (array_sort, ("array",), "void"),
+    "reverse": (array_reverse, ("array",), "void"),
+    "count": (array_count, ("array", "element"), "int"),
+    "load": (array_load, ("array", "string"), "void"),
+    "save": (array_save, ("array", "string"), "void")
+}
+
+# functions that write to their first argument
+MUTATING_ARRAY_FUNCTIONS = ("fill", "copy", "sort", "reverse", "load")
+
+# functions that touch files
+IO_ARRAY_FUNCTIONS = ("load", "save")
+
+
+def call_array_function(function_name, args):
+    function, param_types, _ = ARRAY_FUNCTIONS[function_name]
+    if len(args) != len(param_types):
+        raise Exception(function_name + " takes " + str(len(param_types)) + " arguments")
+
+    if args:
+        args[0] = get_array(args[0])
+        if args[0].get_element_type() == "qubit":
+            raise Exception(function_name + " does not take an array of qubits")
+    return function(*args)
@@ -1,43 +1,188 @@
+import array
+import itertools
+
 from box import Box
-from intbox import IntBox
-from boolbox import BoolBox
+from arraybuffer import ArrayBuffer
+from intelementbox import IntElementBox
+from boolelementbox import BoolElementBox
+
+
+# ints are stored as 64 bit words, bools as single bytes
+TYPECODES = {
+    "IntType": "l",
+    "BoolType": "b"
+}
+
+ELEMENT_TYPES = {
+    "l": "int",
+    "b": "bool"
+}
+
+ELEMENT_BOXES = {
+    "l": IntElementBox,
+    "b": BoolElementBox
+}
 
 
 class ArrayBox(Box):
 
     def __init__(self, type, size):
+        # storage is only allocated on first use, so an array that is
+        # assigned to before it is used never allocates its own
+        self.buffer = None
 
         if size <= 0:
             raise Exception("Cannot initialize array of size " + str(size))
 
-        self.values = []
-        for _ in range(size):
-            if type.__class__.__name__ == "IntType":
-                self.values.append(IntBox())
-            elif type.__class__.__name__ == "BoolType":
-                self.values.append(BoolBox())
-            else:
-                raise Exception("Could not create array box")
+        typecode = TYPECODES.get(type.__class__.__name__)
+        if typecode is None:
+            raise Exception("Could not create array box")
+
+        self.typecode = typecode
+        self.size = size
 
     def set_value(self, array_box):
-        self.values = array_box.values
+        # arrays are values: assigning one shares its buffer and the first
+        # write through either box copies it
+        buffer = array_box.buffer
+        if buffer is not None:
+            buffer.refs += 1
+
+        self.__release()
+        self.buffer = buffer
+        self.size = array_box.size
 
     def get_value(self, index):
-        return self.values[index]
+        # check the index here so a bad one fails on lookup, not on use
+        if not -self.size <= index < self.size:
+            raise IndexError("array index out of range")
+        return ELEMENT_BOXES[self.typecode](self, index)
+
+    def get_element_type(self):
+        return ELEMENT_TYPES[self.typecode]
+
+    def load(self, index):
+        buffer = self.buffer
+        if buffer is None:
+            buffer = self.__allocate()
+
+        if self.typecode == "b":
+            return buffer.values[index] != 0
+        return buffer.values[index]
+
+    def store(self, index, value):
+        buffer = self.buffer
+        if buffer is None:
+            buffer = self.__allocate()
+        elif buffer.refs > 1:
+            buffer.refs -= 1
+            buffer = ArrayBuffer(self.__copy_values(buffer.values))
+            self.buffer = buffer
+
+        try:
+            buffer.values[index] = value
+        except OverflowError:
+            raise Exception("Integer overflow in array element")
 
     def get_size(self):
-        return len(self.values)
+        return self.size
+
+    def get_chunks(self):
+        # the elements as arrays to read from, the storage itself or slices
+        # decoded from mapped storage, which is never copied for a read
+        buffer = self.buffer
+        if buffer is None:
+            buffer = self.__allocate()
+        if isinstance(buffer.values, array.array):
+            return [buffer.values]
+        return buffer.values.chunks()
+
+    def set_mapped_values(self, values):
+        # the file holds a reference of its own, so mapped storage is
+        # copied by the first write and never written through
+        if len(values) != self.size:
+            raise Exception("Incorrect array size")
+
+        buffer = ArrayBuffer(values)
+        buffer.refs += 1
+
+        self.__release()
+        self.buffer = buffer
+
+    def set_values(self, values):
+        try:
+            values = array.array(self.typecode, values)
+        except OverflowError:
+            raise Exception("Integer overflow in array element")
+
+        if len(values) != self.size:
+            raise Exception("Incorrect array size")
+
+        self.__release()
+        self.buffer = ArrayBuffer(values)
+
+    def fill(self, value):
+        try:
+            values = array.array(self.typecode, [value]) * self.size
+        except OverflowError:
+            raise Exception("Integer overflow in array element")
+
+        self.__release()
+        self.buffer = ArrayBuffer(values)
+
+    def copy(self, array_box):
+        # copies as many leading elements as both arrays have
+        if self.size == array_box.size:
+            self.set_value(array_box)
+            return
+
+        values = self.__own()
+        start = 0
+        for chunk in array_box.get_chunks():
+            size = min(len(chunk), self.size - start)
+            if size <= 0:
+                break
+            values[start:start + size] = chunk[:size]
+            start += size
+
+    def sort(self):
+        values = array.array(self.typecode, sorted(itertools.chain.from_iterable(self.get_chunks())))
+        self.__release()
+        self.buffer = ArrayBuffer(values)
+
+    def reverse(self):
+        self.__own().reverse()
+
+    def __own(self):
+        buffer = self.buffer
+        if buffer is None:
+            buffer = self.__allocate()
+        elif buffer.refs > 1:
+            buffer.refs -= 1
+            buffer = ArrayBuffer(self.__copy_values(buffer.values))
+            self.buffer = buffer
+        return buffer.values
+
+    def __copy_values(self, values):
+        if isinstance(values, array.array):
+            return array.array(self.typecode, values)
+        return values.to_array()
+
+    def __allocate(self):
+        self.buffer = ArrayBuffer(array.array(self.typecode, [0]) * self.size)
+        return self.buffer
+
+    def __release(self):
+        if self.buffer is not None:
+            self.buffer.refs -= 1
+            self.buffer = None
+
+    def __del__(self):
+        self.__release()
 
     def __str__(self):
-        string = "["
-        i = 0
-        for value in self.values:
-            if i == 0:
-                string += value
-            else:
-                string += ", " + str(value)
-        string += "]"
-        return string
+        return "[" + ", ".join(str(self.load(i)) for i in xrange(self.size)) + "]"
 
     def __iter__(self):
-        return iter(self.values)
+        element_box = ELEMENT_BOXES[self.typecode]
+        return (element_box(self, i) for i in xrange(self.size))
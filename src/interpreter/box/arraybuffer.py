@@ -0,0 +1,6 @@
+class ArrayBuffer():
+    # element storage shared by every array box holding the same value,
+    # refs counts those boxes so a write knows when it must copy first
+    def __init__(self, values):
+        self.values = values
+        self.refs = 1
@@ -0,0 +1,19 @@
+from intbox import IntBox
+
+
+class IntElementBox(IntBox):
+    # stands in for one element of an int array, reads and writes go
+    # through the array so shared storage is copied before a write
+    def __init__(self, array_box, index):
+        self.array_box = array_box
+        self.index = index
+
+    @property
+    def value(self):
+        return self.array_box.load(self.index)
+
+    def set_value(self, value):
+        self.array_box.store(self.index, int(value))
+
+    def get_value(self):
+        return self.array_box.load(self.index)
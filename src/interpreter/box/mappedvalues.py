@@ -0,0 +1,49 @@
+import array
+import struct
+import sys
+
+
+INT64 = struct.Struct("<q")
+
+# elements decoded at a time when reading through the whole file
+CHUNK_ELEMENTS = 1 << 16
+
+
+class MappedValues():
+    # read only view of little endian array elements in a memory mapped
+    # file, indexing decodes a single element without copying the rest
+    def __init__(self, mapping, offset, size, typecode):
+        self.mapping = mapping
+        self.offset = offset
+        self.size = size
+        self.typecode = typecode
+        self.itemsize = 8 if typecode == "l" else 1
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("array index out of range")
+
+        if self.typecode == "b":
+            return ord(self.mapping[self.offset + index])
+        return INT64.unpack_from(self.mapping, self.offset + 8 * index)[0]
+
+    def to_array(self):
+        return self.__decode(0, self.size)
+
+    def chunks(self, count=CHUNK_ELEMENTS):
+        # the elements a slice at a time, so reading every element never
+        # holds more than a slice of the file in memory
+        for start in xrange(0, self.size, count):
+            yield self.__decode(start, min(start + count, self.size))
+
+    def __decode(self, start, stop):
+        values = array.array(self.typecode, self.mapping[self.offset + start * self.itemsize:
+                                                         self.offset + stop * self.itemsize])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
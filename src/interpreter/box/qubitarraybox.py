@@ -0,0 +1,41 @@
+from arraybox import ArrayBox
+from qubitbox import QubitBox
+
+
+class QubitArrayBox(ArrayBox):
+    # qubits allocated together. the elements are the qubits' own boxes, so
+    # they are shared like any qubit, and the array itself cannot be copied
+    def __init__(self, simulator, size):
+        self.buffer = None
+
+        if size <= 0:
+            raise Exception("Cannot initialize array of size " + str(size))
+
+        self.size = size
+        self.qubits = [QubitBox(simulator, simulator.allocate()) for _ in xrange(size)]
+
+    def set_value(self, array_box):
+        raise Exception("Cannot assign to an array of qubits")
+
+    def get_value(self, index):
+        if not -self.size <= index < self.size:
+            raise IndexError("array index out of range")
+        return self.qubits[index]
+
+    def get_element_type(self):
+        return "qubit"
+
+    def get_qubits(self):
+        return self.qubits
+
+    def load(self, index):
+        return self.qubits[index]
+
+    def store(self, index, value):
+        raise Exception("Cannot assign to a qubit")
+
+    def __str__(self):
+        return "[" + ", ".join(str(qubit) for qubit in self.qubits) + "]"
+
+    def __iter__(self):
+        return iter(self.qubits)
@@ -0,0 +1,28 @@
+from box import Box
+
+
+class QubitBox(Box):
+    # a qubit is a handle on one qubit of the simulator's state, it cannot
+    # be copied so boxes are shared rather than assigned. the qubit is given
+    # back once the last reference to its box is gone
+    def __init__(self, simulator, index):
+        self.simulator = simulator
+        self.index = index
+
+    def set_value(self, value):
+        raise Exception("Cannot assign to a qubit")
+
+    def get_value(self):
+        return self.index
+
+    def get_simulator(self):
+        return self.simulator
+
+    def get_index(self):
+        return self.index
+
+    def __del__(self):
+        self.simulator.release(self.index)
+
+    def __str__(self):
+        return "qubit " + str(self.index)
\ No newline at end of file
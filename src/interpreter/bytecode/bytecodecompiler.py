@@ -0,0 +1,391 @@
+from opcodes import *
+from codeobject import CodeObject
+
+from ..arrayfunctions import ARRAY_FUNCTIONS
+from ..quantumfunctions import QUANTUM_FUNCTIONS
+from ..slotscope import SlotScope
+
+from ...parser.types.inttype import IntType
+from ...parser.types.booltype import BoolType
+from ...parser.types.arraytype import ArrayType
+from ...parser.types.qubittype import QubitType
+from ...parser.nodes.assignnode import AssignNode
+
+
+# kinds of value an expression leaves on the stack, known at compile time
+INT = "int"
+BOOL = "bool"
+INT_BOX = "int_box"
+BOOL_BOX = "bool_box"
+ARRAY_BOX = "array_box"
+UNKNOWN = None
+
+
+class BytecodeCompiler():
+    def __init__(self, debug=0):
+        self.debug = debug
+        self.code = None
+        self.function_names = set()
+        self.built_in_functions = ("print", "read")
+        self.compilers = {
+            "ArithmeticNode": self.__compile_arithmetic,
+            "AssignNode": self.__compile_assign,
+            "BoolNode": self.__compile_bool,
+            "CallNode": self.__compile_call,
+            "ConditionNode": self.__compile_condition,
+            "IndexNode": self.__compile_index,
+            "IntNode": self.__compile_int,
+            "LogicNode": self.__compile_logic,
+            "NotNode": self.__compile_not,
+            "StringNode": self.__compile_string,
+            "VariableNode": self.__compile_variable
+        }
+        self.statement_compilers = {
+            "CompoundNode": self.__compile_compound,
+            "IfNode": self.__compile_if,
+            "NewVariableNode": self.__compile_new_variable,
+            "ReturnNode": self.__compile_return,
+            "WhileNode": self.__compile_while
+        }
+
+    def compile_program(self, ast):
+        functions = {}
+        self.function_names = set(function.get_function_name() for function in ast.program)
+
+        for function in ast.program:
+            fun_name = function.get_function_name()
+            if fun_name in self.built_in_functions:
+                raise Exception("Cannot overwrite a built-in function: " + str(self.built_in_functions))
+
+            function_name = function.get_function_name_with_params()
+
+            if functions.get(function_name) is not None:
+                raise Exception(function_name + " already exists")
+
+            functions[function_name] = self.compile_function(function)
+
+        return functions
+
+    def compile_function(self, node):
+
+        if self.debug > 0:
+            print "Compiling", node.get_function_name_with_params()
+
+        params = node.get_params().get_params()
+        self.code = CodeObject(node.get_function_name_with_params(), len(params), node.get_return_type())
+        scope = SlotScope()
+
+        for i in range(len(params)):
+            # scalar parameters are fully initialised by the store itself
+            if isinstance(params[i].get_type(), ArrayType):
+                self.__compile_new_variable(params[i], scope)
+            else:
+                scope.add_variable(params[i].get_variable_name().get_value(), params[i].get_type())
+            self.code.emit(LOAD_ARG, i)
+            self.__compile_store(params[i].get_variable_name().get_value(), scope)
+
+        self.__compile_statements(node.get_statements(), scope)
+        self.code.emit(END)
+        self.code.set_frame_size(scope.get_frame_size())
+
+        return self.code
+
+    def __compile_statement(self, node, scope):
+        compiler = self.statement_compilers.get(node.__class__.__name__)
+        if compiler is not None:
+            compiler(node, scope)
+        elif node.__class__.__name__ == "AssignNode":
+            self.__compile_assign(node, scope, False)
+        else:
+            self.__compile_expression(node, scope)
+            self.code.emit(POP)
+
+    def __compile_statements(self, node, scope):
+        for statement in node.get_statements():
+            self.__compile_statement(statement, scope)
+
+    def __compile_compound(self, node, scope):
+        self.__compile_statements(node.get_statements(), SlotScope(scope))
+
+    def __compile_if(self, node, scope):
+        self.__compile_bool_value(node.get_condition(), scope)
+        jump_false = self.code.emit(JUMP_IF_FALSE)
+        self.__compile_statement(node.get_true_expression(), scope)
+
+        if node.get_false_expression() is None:
+            self.code.patch(jump_false, self.code.get_position())
+            return
+
+        jump_end = self.code.emit(JUMP)
+        self.code.patch(jump_false, self.code.get_position())
+        self.__compile_statement(node.get_false_expression(), scope)
+        self.code.patch(jump_end, self.code.get_position())
+
+    def __compile_while(self, node, scope):
+        start = self.code.get_position()
+        self.__compile_bool_value(node.get_condition(), scope)
+        jump_end = self.code.emit(JUMP_IF_FALSE)
+        self.__compile_statement(node.get_expression(), scope)
+        self.code.emit(JUMP, start)
+        self.code.patch(jump_end, self.code.get_position())
+
+    def __compile_return(self, node, scope):
+        value = node.get_return_value()
+
+        if value is None:
+            self.code.emit(RETURN_VOID)
+        elif value.__class__.__name__ == "CallNode" and \
+                value.get_function_name().get_value() not in self.built_in_functions and \
+                not self.__is_library_function(value.get_function_name().get_value()):
+            # the callee's frame replaces ours, so recursion in tail position
+            # runs in constant space
+            for param in value.get_params():
+                self.__compile_expression(param, scope)
+            self.code.emit(TAIL_CALL, (value.get_function_name().get_value(), len(value.get_params()),
+                                       value.get_resolved_name()))
+        else:
+            self.__compile_expression(node.get_return_value(), scope)
+            self.code.emit(RETURN)
+
+    def __compile_new_variable(self, node, scope):
+        node_type = node.get_type()
+        variable_name = node.get_variable_name().get_value()
+
+        if isinstance(node_type, ArrayType):
+            size = node_type.get_size()
+            if isinstance(size, int):
+                self.code.emit(LOAD_CONST, size)
+            else:
+                self.__compile_int_value(size, scope)
+            slot = scope.add_variable(variable_name, node_type)
+            if isinstance(node_type.get_type(), QubitType):
+                self.code.emit(NEW_QUBIT_ARRAY, slot)
+            else:
+                self.code.emit(NEW_ARRAY, (slot, node_type.get_type()))
+        elif isinstance(node_type, IntType):
+            self.code.emit(NEW_INT, scope.add_variable(variable_name, node_type))
+        elif isinstance(node_type, BoolType):
+            self.code.emit(NEW_BOOL, scope.add_variable(variable_name, node_type))
+        elif isinstance(node_type, QubitType):
+            self.code.emit(NEW_QUBIT, scope.add_variable(variable_name, node_type))
+        else:
+            raise Exception("Invalid type")
+
+    def __compile_store(self, variable_name, scope):
+        slot, variable_type = scope.get_variable(variable_name)
+
+        if isinstance(variable_type, IntType):
+            self.code.emit(STORE_INT, slot)
+        elif isinstance(variable_type, BoolType):
+            self.code.emit(STORE_BOOL, slot)
+        elif isinstance(variable_type, QubitType):
+            self.code.emit(STORE_QUBIT, slot)
+        else:
+            self.code.emit(STORE_ARRAY, slot)
+
+        return slot
+
+    # every expression leaves exactly one value on the stack
+
+    def __compile_expression(self, node, scope):
+        compiler = self.compilers.get(node.__class__.__name__)
+        if compiler is None:
+            raise Exception(node.__class__.__name__ + " is an unrecognized type")
+        return compiler(node, scope)
+
+    def __compile_int_value(self, node, scope):
+        kind = self.__compile_expression(node, scope)
+
+        if kind == UNKNOWN:
+            self.code.emit(CHECK_INT)
+        elif kind not in (INT, BOOL, INT_BOX):
+            self.code.emit(FAIL, "Expected type int")
+
+    def __compile_bool_value(self, node, scope):
+        kind = self.__compile_expression(node, scope)
+
+        if kind == UNKNOWN:
+            self.code.emit(CHECK_BOOL)
+        elif kind not in (BOOL, BOOL_BOX):
+            self.code.emit(FAIL, "Expected type bool")
+
+    def __compile_array_value(self, node, scope):
+        kind = self.__compile_expression(node, scope)
+
+        if kind == UNKNOWN:
+            self.code.emit(CHECK_ARRAY)
+        elif kind != ARRAY_BOX:
+            self.code.emit(FAIL, "Expected type array")
+
+    @staticmethod
+    def __box_kind(variable_type):
+        if isinstance(variable_type, IntType):
+            return INT_BOX
+        elif isinstance(variable_type, BoolType):
+            return BOOL_BOX
+        elif isinstance(variable_type, ArrayType):
+            return ARRAY_BOX
+        return UNKNOWN
+
+    def __compile_int(self, node, scope):
+        self.code.emit(LOAD_CONST, node.get_value())
+        return INT
+
+    def __compile_string(self, node, scope):
+        self.code.emit(LOAD_CONST, node.get_value())
+        return UNKNOWN
+
+    def __compile_bool(self, node, scope):
+        self.code.emit(LOAD_CONST, node.get_value())
+        return BOOL
+
+    def __compile_variable(self, node, scope):
+        variable = scope.get_variable(node.get_value())
+
+        if variable is None:
+            self.code.emit(FAIL, "Variable " + node.get_value() + " does not exist")
+            return UNKNOWN
+
+        self.code.emit(LOAD_SLOT, variable[0])
+        return self.__box_kind(variable[1])
+
+    def __element_kind(self, node, scope):
+        if node.get_name().__class__.__name__ == "VariableNode":
+            variable = scope.get_variable(node.get_name().get_value())
+            if variable is not None and isinstance(variable[1], ArrayType):
+                return self.__box_kind(variable[1].get_type())
+        return UNKNOWN
+
+    def __compile_index(self, node, scope):
+        self.__compile_array_value(node.get_name(), scope)
+        self.__compile_int_value(node.get_index(), scope)
+        self.code.emit(INDEX)
+        return self.__element_kind(node, scope)
+
+    def __compile_arithmetic(self, node, scope):
+        operation = ARITHMETIC.get(node.get_arithmetic_operation())
+        if operation is None:
+            raise Exception("Unrecognized arithmetic operation")
+
+        self.__compile_int_value(node.get_left_expression(), scope)
+        self.__compile_int_value(node.get_right_expression(), scope)
+        self.code.emit(operation)
+        return INT
+
+    def __compile_condition(self, node, scope):
+        comparison = COMPARISON.get(node.get_comparison())
+        if comparison is None:
+            raise Exception("Unrecognized comparison operation")
+
+        self.__compile_int_value(node.get_left_expression(), scope)
+        self.__compile_int_value(node.get_right_expression(), scope)
+        self.code.emit(comparison)
+        return BOOL
+
+    def __compile_logic(self, node, scope):
+        logic = node.get_logic_operation()
+        if logic == "&&":
+            short_circuit, operation = JUMP_IF_FALSE_KEEP, AND
+        elif logic == "||":
+            short_circuit, operation = JUMP_IF_TRUE_KEEP, OR
+        else:
+            raise Exception("Unrecognized logical operation")
+
+        self.__compile_bool_value(node.get_left_expression(), scope)
+        jump_end = self.code.emit(short_circuit)
+        self.__compile_bool_value(node.get_right_expression(), scope)
+        self.code.emit(operation)
+        self.code.patch(jump_end, self.code.get_position())
+        return BOOL
+
+    def __compile_not(self, node, scope):
+        self.__compile_bool_value(node.get_expression(), scope)
+        self.code.emit(NOT)
+        return BOOL
+
+    def __compile_assign(self, node, scope, keep=True):
+        variable = node.get_left()
+        variable_type = variable.__class__.__name__
+
+        if variable_type == "VariableNode" and self.__is_qubit(variable, scope):
+            self.__compile_expression(node.get_right(), scope)
+            self.code.emit(FAIL, "Cannot assign to a qubit")
+            return UNKNOWN
+        elif variable_type == "VariableNode" and scope.get_variable(variable.get_value()) is not None:
+            self.__compile_expression(node.get_right(), scope)
+            slot = self.__compile_store(variable.get_value(), scope)
+            if keep:
+                self.code.emit(LOAD_SLOT, slot)
+            return self.__box_kind(scope.get_variable(variable.get_value())[1])
+        elif variable_type == "IndexNode":
+            self.__compile_array_value(variable.get_name(), scope)
+            self.__compile_int_value(variable.get_index(), scope)
+            self.__compile_expression(node.get_right(), scope)
+            self.code.emit(STORE_INDEX, keep)
+            return self.__element_kind(variable, scope)
+        elif variable_type == "AssignNode":
+            # "a = b = c" parses as "(a = b) = c", which leaves c in a
+            self.__compile_assign(variable, scope, False)
+            return self.__compile_assign(AssignNode(variable.get_left(), node.get_right()), scope, keep)
+
+        self.__compile_expression(variable, scope)
+        self.code.emit(FAIL, "Can only assign to variable")
+        return UNKNOWN
+
+    def __compile_call(self, node, scope):
+        function_name = node.get_function_name().get_value()
+        params = node.get_params()
+
+        if function_name == "print":
+            for param in params:
+                self.__compile_expression(param, scope)
+            self.code.emit(PRINT, len(params))
+            return UNKNOWN
+        elif function_name == "read":
+            for param in params:
+                self.__compile_read(param, scope)
+            self.code.emit(LOAD_CONST, None)
+            return UNKNOWN
+        elif self.__is_library_function(function_name):
+            for param in params:
+                self.__compile_expression(param, scope)
+            opcode = ARRAY_FUNCTION if function_name in ARRAY_FUNCTIONS else QUANTUM_FUNCTION
+            self.code.emit(opcode, (function_name, len(params)))
+            return UNKNOWN
+
+        for param in params:
+            self.__compile_expression(param, scope)
+        self.code.emit(CALL, (function_name, len(params), node.get_resolved_name()))
+        return UNKNOWN
+
+    def __is_library_function(self, function_name):
+        # user functions of the same name take precedence
+        if function_name in self.function_names:
+            return False
+        return function_name in ARRAY_FUNCTIONS or function_name in QUANTUM_FUNCTIONS
+
+    @staticmethod
+    def __is_qubit(node, scope):
+        variable = scope.get_variable(node.get_value())
+        return variable is not None and isinstance(variable[1], QubitType)
+
+    def __compile_read(self, node, scope):
+        node_type = node.__class__.__name__
+
+        if node_type == "VariableNode" and self.__is_qubit(node, scope):
+            self.code.emit(FAIL, "Cannot read into a qubit")
+        elif node_type == "VariableNode" and scope.get_variable(node.get_value()) is not None:
+            kind = self.__box_kind(scope.get_variable(node.get_value())[1])
+            if kind == ARRAY_BOX:
+                self.code.emit(LOAD_SLOT, scope.get_variable(node.get_value())[0])
+                self.code.emit(READ_ARRAY)
+            else:
+                self.code.emit(READ_INT if kind == INT_BOX else READ_BOOL)
+                self.__compile_store(node.get_value(), scope)
+        elif node_type == "IndexNode":
+            self.__compile_array_value(node.get_name(), scope)
+            self.__compile_int_value(node.get_index(), scope)
+            self.code.emit(READ_ELEMENT)
+        else:
+            self.__compile_expression(node, scope)
+            self.code.emit(FAIL, "Can only read into variable")
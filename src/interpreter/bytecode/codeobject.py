@@ -0,0 +1,35 @@
+class CodeObject():
+    def __init__(self, name, param_count, return_type):
+        self.name = name
+        self.param_count = param_count
+        self.return_type = return_type
+        self.code = []
+        self.frame_size = 0
+
+    def emit(self, opcode, arg=None):
+        self.code.append((opcode, arg))
+        return len(self.code) - 1
+
+    def patch(self, index, arg):
+        self.code[index] = (self.code[index][0], arg)
+
+    def get_position(self):
+        return len(self.code)
+
+    def get_name(self):
+        return self.name
+
+    def get_param_count(self):
+        return self.param_count
+
+    def get_return_type(self):
+        return self.return_type
+
+    def get_code(self):
+        return self.code
+
+    def get_frame_size(self):
+        return self.frame_size
+
+    def set_frame_size(self, frame_size):
+        self.frame_size = frame_size
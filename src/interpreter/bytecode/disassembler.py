@@ -0,0 +1,41 @@
+from opcodes import NAMES, JUMPS, CALL, TAIL_CALL, NEW_ARRAY, ARRAY_FUNCTION, QUANTUM_FUNCTION
+
+
+class Disassembler():
+
+    def disassemble_program(self, functions):
+        text = []
+        for name in sorted(functions):
+            text.append(self.disassemble(functions[name]))
+        return "\n\n".join(text)
+
+    def disassemble(self, code_object):
+        code = code_object.get_code()
+        targets = set(arg for opcode, arg in code if opcode in JUMPS)
+
+        lines = [code_object.get_name() + " (params " + str(code_object.get_param_count()) +
+                 ", frame " + str(code_object.get_frame_size()) +
+                 ", returns " + str(code_object.get_return_type()) + ")"]
+
+        for position in range(len(code)):
+            opcode, arg = code[position]
+
+            marker = ">>" if position in targets else "  "
+            line = "  " + marker + " " + str(position).rjust(4) + " " + NAMES[opcode].ljust(20)
+            if arg is not None:
+                line += self.__format_arg(opcode, arg)
+            lines.append(line.rstrip())
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def __format_arg(opcode, arg):
+        if opcode in JUMPS:
+            return "to " + str(arg)
+        elif opcode in (CALL, TAIL_CALL):
+            return (arg[2] or arg[0]) + " (" + str(arg[1]) + " args)"
+        elif opcode in (ARRAY_FUNCTION, QUANTUM_FUNCTION):
+            return arg[0] + " (" + str(arg[1]) + " args)"
+        elif opcode == NEW_ARRAY:
+            return str(arg[0]) + " (" + str(arg[1]) + ")"
+        return repr(arg)
@@ -0,0 +1,17 @@
+class Frame(object):
+    __slots__ = ("code_object", "code", "slots", "args", "pc", "return_type", "checks", "memo_key")
+
+    def __init__(self, code_object, args, return_type, checks=(), memo_key=None):
+        self.code_object = code_object
+        self.code = code_object.code
+        self.slots = [None] * code_object.frame_size
+        self.args = args
+        self.pc = 0
+
+        # return_type is what this function must return, checks are the
+        # return types of the callers it replaced through tail calls
+        self.return_type = return_type
+        self.checks = checks
+
+        # where the return value is remembered, for calls of pure functions
+        self.memo_key = memo_key
@@ -0,0 +1,130 @@
+LOAD_CONST = 0
+LOAD_SLOT = 1
+LOAD_ARG = 2
+STORE_INT = 3
+STORE_BOOL = 4
+STORE_ARRAY = 5
+NEW_INT = 6
+NEW_BOOL = 7
+NEW_ARRAY = 8
+INDEX = 9
+STORE_INDEX = 10
+
+ADD = 11
+SUB = 12
+MUL = 13
+DIV = 14
+MOD = 15
+
+LT = 16
+LE = 17
+GT = 18
+GE = 19
+EQ = 20
+NE = 21
+
+NOT = 22
+AND = 23
+OR = 24
+
+CHECK_INT = 25
+CHECK_BOOL = 26
+CHECK_ARRAY = 27
+
+JUMP = 28
+JUMP_IF_FALSE = 29
+JUMP_IF_FALSE_KEEP = 30
+JUMP_IF_TRUE_KEEP = 31
+
+CALL = 32
+RETURN = 33
+RETURN_VOID = 34
+END = 35
+
+PRINT = 36
+READ_INT = 37
+READ_BOOL = 38
+READ_ARRAY = 39
+READ_ELEMENT = 40
+
+POP = 41
+FAIL = 42
+
+TAIL_CALL = 43
+ARRAY_FUNCTION = 44
+
+QUANTUM_FUNCTION = 45
+NEW_QUBIT = 46
+STORE_QUBIT = 47
+NEW_QUBIT_ARRAY = 48
+
+NAMES = {
+    LOAD_CONST: "LOAD_CONST",
+    LOAD_SLOT: "LOAD_SLOT",
+    LOAD_ARG: "LOAD_ARG",
+    STORE_INT: "STORE_INT",
+    STORE_BOOL: "STORE_BOOL",
+    STORE_ARRAY: "STORE_ARRAY",
+    NEW_INT: "NEW_INT",
+    NEW_BOOL: "NEW_BOOL",
+    NEW_ARRAY: "NEW_ARRAY",
+    INDEX: "INDEX",
+    STORE_INDEX: "STORE_INDEX",
+    ADD: "ADD",
+    SUB: "SUB",
+    MUL: "MUL",
+    DIV: "DIV",
+    MOD: "MOD",
+    LT: "LT",
+    LE: "LE",
+    GT: "GT",
+    GE: "GE",
+    EQ: "EQ",
+    NE: "NE",
+    NOT: "NOT",
+    AND: "AND",
+    OR: "OR",
+    CHECK_INT: "CHECK_INT",
+    CHECK_BOOL: "CHECK_BOOL",
+    CHECK_ARRAY: "CHECK_ARRAY",
+    JUMP: "JUMP",
+    JUMP_IF_FALSE: "JUMP_IF_FALSE",
+    JUMP_IF_FALSE_KEEP: "JUMP_IF_FALSE_KEEP",
+    JUMP_IF_TRUE_KEEP: "JUMP_IF_TRUE_KEEP",
+    CALL: "CALL",
+    RETURN: "RETURN",
+    RETURN_VOID: "RETURN_VOID",
+    END: "END",
+    PRINT: "PRINT",
+    READ_INT: "READ_INT",
+    READ_BOOL: "READ_BOOL",
+    READ_ARRAY: "READ_ARRAY",
+    READ_ELEMENT: "READ_ELEMENT",
+    POP: "POP",
+    FAIL: "FAIL",
+    TAIL_CALL: "TAIL_CALL",
+    ARRAY_FUNCTION: "ARRAY_FUNCTION",
+    QUANTUM_FUNCTION: "QUANTUM_FUNCTION",
+    NEW_QUBIT: "NEW_QUBIT",
+    STORE_QUBIT: "STORE_QUBIT",
+    NEW_QUBIT_ARRAY: "NEW_QUBIT_ARRAY"
+}
+
+JUMPS = (JUMP, JUMP_IF_FALSE, JUMP_IF_FALSE_KEEP, JUMP_IF_TRUE_KEEP)
+
+ARITHMETIC = {
+    "+": ADD,
+    "-": SUB,
+    "*": MUL,
+    "/": DIV,
+    "%": MOD
+}
+
+COMPARISON = {
+    "<": LT,
+    "<=": LE,
+    ">": GT,
+    ">=": GE,
+    "==": EQ,
+    "!=": NE
+}
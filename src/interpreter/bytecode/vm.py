@@ -0,0 +1,350 @@
+from opcodes import *
+from bytecodecompiler import BytecodeCompiler
+from disassembler import Disassembler
+from frame import Frame
+
+from ..box.intbox import IntBox
+from ..box.arraybox import ArrayBox
+from ..box.qubitbox import QubitBox
+from ..box.qubitarraybox import QubitArrayBox
+from ..arrayfunctions import call_array_function
+from ..quantumfunctions import call_quantum_function
+from ..inputreader import InputReader
+from ..outputwriter import OutputWriter
+from ..memocache import MemoCache
+from ..purity import PurityAnalyzer
+from ..runtime import get_qubit, typecast_int, typecast_bool, type_str, read_box
+
+from ...parser.types.voidtype import VoidType
+from ...parser.types.inttype import IntType
+from ...parser.types.booltype import BoolType
+from ...parser.types.qubittype import QubitType
+from ...quantum.simulator import Simulator
+
+
+VALUE_TYPES = {
+    int: "_int",
+    long: "_int",
+    bool: "_bool"
+}
+
+
+class VirtualMachine():
+    def __init__(self, ast, debug=0, memo_size=10000, reader=None, writer=None, simulator=None):
+        self.ast = ast
+        self.simulator = simulator if simulator is not None else Simulator()
+        self.debug = debug
+        self.writer = writer if writer is not None else OutputWriter()
+        self.reader = reader if reader is not None else InputReader(flush=self.writer.flush)
+        self.functions = {}
+        self.return_types = {}
+        self.pure_functions = set()
+        self.memo = MemoCache(memo_size) if memo_size > 0 else None
+
+    def compile(self):
+        self.functions = BytecodeCompiler(self.debug).compile_program(self.ast)
+
+        for name, code_object in self.functions.items():
+            return_type = code_object.get_return_type()
+            if isinstance(return_type, VoidType):
+                self.return_types[name] = type(None)
+            elif isinstance(return_type, IntType):
+                self.return_types[name] = (int, long)
+            elif isinstance(return_type, BoolType):
+                self.return_types[name] = bool
+            elif isinstance(return_type, QubitType):
+                self.return_types[name] = QubitBox
+            else:
+                self.return_types[name] = ArrayBox
+
+        # main is run without checking what it returns
+        self.return_types["main_void"] = object
+
+        if self.memo is not None:
+            nodes = dict((function.get_function_name_with_params(), function) for function in self.ast.program)
+            self.pure_functions = PurityAnalyzer().memoizable(nodes)
+
+    def disassemble(self):
+        self.compile()
+        return Disassembler().disassemble_program(self.functions)
+
+    def interpret(self):
+        self.compile()
+
+        main = self.functions.get("main_void")
+        if main is None:
+            return
+
+        try:
+            self.__execute(main)
+        finally:
+            self.writer.flush()
+
+    def get_memo(self):
+        return self.memo
+
+    def __resolve(self, function_name, args):
+        if not args:
+            function_name += "_void"
+
+        for arg in args:
+            suffix = VALUE_TYPES.get(type(arg))
+            if suffix is None:
+                suffix = "_" + type_str(arg)
+            function_name += suffix
+
+        function = self.functions.get(function_name)
+        if function is None:
+            raise Exception("Could not match function of type " + function_name)
+        return function
+
+    def __execute(self, code_object):
+        # interpreted calls never recurse on the Python stack: suspended
+        # callers are kept in frames and all of them share one operand stack
+        frames = []
+        frame = Frame(code_object, [], self.return_types[code_object.get_name()])
+        code = frame.code
+        slots = frame.slots
+        args = frame.args
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        reader = self.reader
+        print_value = self.writer.print_value
+        simulator = self.simulator
+        memo = self.memo
+        pure_functions = self.pure_functions
+        pc = 0
+
+        while True:
+            opcode, arg = code[pc]
+            pc += 1
+
+            if opcode == LOAD_SLOT:
+                push(slots[arg])
+            elif opcode == LOAD_CONST:
+                push(arg)
+            elif opcode == STORE_INT:
+                value = pop()
+                if type(value) is not int:
+                    value = typecast_int(value)
+                slots[arg] = value
+            elif opcode == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif opcode == JUMP:
+                pc = arg
+            elif opcode == ADD:
+                right = pop()
+                stack[-1] += right
+            elif opcode == SUB:
+                right = pop()
+                stack[-1] -= right
+            elif opcode == LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif opcode == LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif opcode == CALL:
+                function_name, count, resolved_name = arg
+                if count:
+                    args = stack[-count:]
+                    del stack[-count:]
+                else:
+                    args = []
+                if resolved_name is None:
+                    callee = self.__resolve(function_name, args)
+                else:
+                    callee = self.functions[resolved_name]
+
+                # scalar arguments are never boxed on the operand stack
+                key = None
+                if callee.get_name() in pure_functions:
+                    key = (callee.get_name(), tuple(args))
+                    value = memo.get(key)
+                    if value is not None:
+                        push(value)
+                        continue
+
+                frame.pc = pc
+                frames.append(frame)
+                frame = Frame(callee, args, self.return_types[callee.get_name()], memo_key=key)
+                code = frame.code
+                slots = frame.slots
+                pc = 0
+            elif opcode == RETURN:
+                value = pop()
+                if not isinstance(value, frame.return_type):
+                    raise Exception("Incorrect return type")
+                for accepted in frame.checks:
+                    if not isinstance(value, accepted):
+                        raise Exception("Incorrect return type")
+                if frame.memo_key is not None:
+                    memo.put(frame.memo_key, value)
+
+                if not frames:
+                    return value
+                frame = frames.pop()
+                code = frame.code
+                slots = frame.slots
+                args = frame.args
+                pc = frame.pc
+                push(value)
+            elif opcode == TAIL_CALL:
+                function_name, count, resolved_name = arg
+                if count:
+                    args = stack[-count:]
+                    del stack[-count:]
+                else:
+                    args = []
+                if resolved_name is None:
+                    callee = self.__resolve(function_name, args)
+                else:
+                    callee = self.functions[resolved_name]
+
+                checks = frame.checks
+                if frame.return_type not in checks:
+                    checks += (frame.return_type,)
+                # the callee returns what the replaced call would have
+                frame = Frame(callee, args, self.return_types[callee.get_name()], checks, frame.memo_key)
+                code = frame.code
+                slots = frame.slots
+                pc = 0
+            elif opcode == INDEX:
+                index = pop()
+                stack[-1] = stack[-1].load(index)
+            elif opcode == MUL:
+                right = pop()
+                stack[-1] *= right
+            elif opcode == DIV:
+                right = pop()
+                stack[-1] /= right
+            elif opcode == MOD:
+                right = pop()
+                stack[-1] %= right
+            elif opcode == GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif opcode == GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif opcode == EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif opcode == NE:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif opcode == NOT:
+                stack[-1] = not stack[-1]
+            elif opcode == POP:
+                pop()
+            elif opcode == STORE_BOOL:
+                value = pop()
+                if type(value) is not bool:
+                    value = typecast_bool(value)
+                slots[arg] = value
+            elif opcode == STORE_INDEX:
+                value = pop()
+                index = pop()
+                box = pop().get_value(index)
+                if isinstance(box, IntBox):
+                    box.set_value(typecast_int(value))
+                else:
+                    box.set_value(typecast_bool(value))
+                if arg:
+                    push(box.get_value())
+            elif opcode == STORE_ARRAY:
+                value = pop()
+                if type_str(slots[arg]) != type_str(value):
+                    raise Exception("Unable to typecast to correct array type")
+                slots[arg].set_value(value)
+            elif opcode == LOAD_ARG:
+                push(args[arg])
+            elif opcode == NEW_INT:
+                slots[arg] = 0
+            elif opcode == NEW_BOOL:
+                slots[arg] = False
+            elif opcode == NEW_ARRAY:
+                slots[arg[0]] = ArrayBox(arg[1], pop())
+            elif opcode == NEW_QUBIT:
+                slots[arg] = QubitBox(simulator, simulator.allocate())
+            elif opcode == NEW_QUBIT_ARRAY:
+                slots[arg] = QubitArrayBox(simulator, pop())
+            elif opcode == STORE_QUBIT:
+                # only parameters are stored to, qubits are shared not copied
+                slots[arg] = get_qubit(pop())
+            elif opcode == JUMP_IF_FALSE_KEEP:
+                if stack[-1] is False:
+                    pc = arg
+            elif opcode == JUMP_IF_TRUE_KEEP:
+                if stack[-1] is True:
+                    pc = arg
+            elif opcode == AND:
+                right = pop()
+                stack[-1] = stack[-1] and right
+            elif opcode == OR:
+                right = pop()
+                stack[-1] = stack[-1] or right
+            elif opcode == CHECK_INT:
+                if not isinstance(stack[-1], (int, long)):
+                    raise Exception("Expected type int")
+            elif opcode == CHECK_BOOL:
+                if not isinstance(stack[-1], bool):
+                    raise Exception("Expected type bool")
+            elif opcode == CHECK_ARRAY:
+                if not isinstance(stack[-1], ArrayBox):
+                    raise Exception("Expected type array")
+            elif opcode in (RETURN_VOID, END):
+                if not isinstance(None, frame.return_type):
+                    if opcode == END:
+                        raise Exception("Missing return statement")
+                    raise Exception("Incorrect return type")
+                for accepted in frame.checks:
+                    if not isinstance(None, accepted):
+                        raise Exception("Incorrect return type")
+
+                if not frames:
+                    return None
+                frame = frames.pop()
+                code = frame.code
+                slots = frame.slots
+                args = frame.args
+                pc = frame.pc
+                push(None)
+            elif opcode == PRINT:
+                if arg:
+                    values = stack[-arg:]
+                    del stack[-arg:]
+                    for value in values:
+                        print_value(value)
+                push(None)
+            elif opcode == READ_INT:
+                push(int(reader.read_word()))
+            elif opcode == READ_BOOL:
+                push(bool(reader.read_word()))
+            elif opcode == READ_ARRAY:
+                read_box(reader, pop())
+            elif opcode == READ_ELEMENT:
+                index = pop()
+                read_box(reader, pop().get_value(index))
+            elif opcode == ARRAY_FUNCTION:
+                function_name, count = arg
+                if count:
+                    values = stack[-count:]
+                    del stack[-count:]
+                else:
+                    values = []
+                push(call_array_function(function_name, values))
+            elif opcode == QUANTUM_FUNCTION:
+                function_name, count = arg
+                if count:
+                    values = stack[-count:]
+                    del stack[-count:]
+                else:
+                    values = []
+                push(call_quantum_function(function_name, values))
+            elif opcode == FAIL:
+                raise Exception(arg)
+            else:
+                raise Exception(str(opcode) + " is an unrecognized opcode")
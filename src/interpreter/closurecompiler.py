@@ -0,0 +1,623 @@
+from box.box import Box
+from box.intbox import IntBox
+from box.boolbox import BoolBox
+from box.arraybox import ArrayBox
+from box.qubitbox import QubitBox
+from box.qubitarraybox import QubitArrayBox
+
+from arrayfunctions import ARRAY_FUNCTIONS, call_array_function
+from quantumfunctions import QUANTUM_FUNCTIONS, call_quantum_function
+from inputreader import InputReader
+from outputwriter import OutputWriter
+from memocache import MemoCache
+from purity import PurityAnalyzer
+from slotscope import SlotScope
+from runtime import get_int, get_bool, get_array, get_qubit, typecast_int, typecast_bool, assign_box, type_str, read_box, \
+    unbox
+
+from ..parser.types.voidtype import VoidType
+from ..parser.types.inttype import IntType
+from ..parser.types.booltype import BoolType
+from ..parser.types.arraytype import ArrayType
+from ..parser.types.qubittype import QubitType
+from ..quantum.simulator import Simulator
+
+
+# kinds of value an expression closure can produce, known at compile time
+INT = "int"
+BOOL = "bool"
+INT_BOX = "int_box"
+BOOL_BOX = "bool_box"
+ARRAY_BOX = "array_box"
+UNKNOWN = None
+
+ARITHMETIC = {
+    "+": lambda l, r: lambda frame: l(frame) + r(frame),
+    "-": lambda l, r: lambda frame: l(frame) - r(frame),
+    "*": lambda l, r: lambda frame: l(frame) * r(frame),
+    "/": lambda l, r: lambda frame: l(frame) / r(frame),
+    "%": lambda l, r: lambda frame: l(frame) % r(frame)
+}
+
+ARITHMETIC_CONSTANT = {
+    "+": lambda l, c: lambda frame: l(frame) + c,
+    "-": lambda l, c: lambda frame: l(frame) - c,
+    "*": lambda l, c: lambda frame: l(frame) * c,
+    "/": lambda l, c: lambda frame: l(frame) / c,
+    "%": lambda l, c: lambda frame: l(frame) % c
+}
+
+COMPARISON = {
+    "<": lambda l, r: lambda frame: l(frame) < r(frame),
+    "<=": lambda l, r: lambda frame: l(frame) <= r(frame),
+    ">=": lambda l, r: lambda frame: l(frame) >= r(frame),
+    ">": lambda l, r: lambda frame: l(frame) > r(frame),
+    "!=": lambda l, r: lambda frame: l(frame) != r(frame),
+    "==": lambda l, r: lambda frame: l(frame) == r(frame)
+}
+
+COMPARISON_CONSTANT = {
+    "<": lambda l, c: lambda frame: l(frame) < c,
+    "<=": lambda l, c: lambda frame: l(frame) <= c,
+    ">=": lambda l, c: lambda frame: l(frame) >= c,
+    ">": lambda l, c: lambda frame: l(frame) > c,
+    "!=": lambda l, c: lambda frame: l(frame) != c,
+    "==": lambda l, c: lambda frame: l(frame) == c
+}
+
+
+class ClosureCompiler():
+    def __init__(self, ast, debug=0, memo_size=10000, reader=None, writer=None, simulator=None):
+        self.ast = ast
+        self.simulator = simulator if simulator is not None else Simulator()
+        self.writer = writer if writer is not None else OutputWriter()
+        self.reader = reader if reader is not None else InputReader(flush=self.writer.flush)
+        self.functions = {}
+        self.function_names = set()
+        self.pure_functions = set()
+        self.memo = MemoCache(memo_size) if memo_size > 0 else None
+        self.debug = debug
+        self.built_in_functions = ("print", "read")
+        self.built_in_functions_map = {
+            "print": self.__compile_print,
+            "read": self.__compile_read
+        }
+        self.compilers = {
+            "ArithmeticNode": self.__compile_arithmetic,
+            "AssignNode": self.__compile_assign,
+            "BoolNode": self.__compile_bool,
+            "CallNode": self.__compile_call,
+            "ConditionNode": self.__compile_condition,
+            "IndexNode": self.__compile_index,
+            "IntNode": self.__compile_int,
+            "LogicNode": self.__compile_logic,
+            "NotNode": self.__compile_not,
+            "StringNode": self.__compile_string,
+            "VariableNode": self.__compile_variable
+        }
+        self.statement_compilers = {
+            "CompoundNode": self.__compile_compound,
+            "IfNode": self.__compile_if,
+            "NewVariableNode": self.__compile_new_variable,
+            "ReturnNode": self.__compile_return,
+            "WhileNode": self.__compile_while
+        }
+
+    def interpret(self):
+        self.function_names = set(function.get_function_name() for function in self.ast.program)
+
+        if self.memo is not None:
+            nodes = dict((function.get_function_name_with_params(), function) for function in self.ast.program)
+            self.pure_functions = PurityAnalyzer().memoizable(nodes)
+
+        for function in self.ast.program:
+            fun_name = function.get_function_name()
+            if fun_name in self.built_in_functions:
+                raise Exception("Cannot overwrite a built-in function: " + str(self.built_in_functions))
+
+            function_name = function.get_function_name_with_params()
+
+            if self.functions.get(function_name) is not None:
+                raise Exception(function_name + " already exists")
+
+            self.functions[function_name] = self.__compile_function(function)
+
+        main = self.functions.get("main_void")
+        if main is None:
+            return
+
+        try:
+            main.run_body()
+        finally:
+            self.writer.flush()
+
+    def __compile_function(self, node):
+
+        if self.debug > 0:
+            print "Compiling", node.get_function_name_with_params()
+
+        scope = SlotScope()
+        binders = []
+        for param in node.get_params().get_params():
+            binders.append(self.__compile_param(param, scope))
+
+        body = self.__compile_statements(node.get_statements(), scope)
+        check = self.__compile_return_check(node.get_return_type())
+        frame_size = scope.get_frame_size()
+
+        def invoke(values):
+            frame = [None] * frame_size
+            for i in range(len(binders)):
+                binders[i](frame, values[i])
+
+            result = body(frame)
+            if result is None:
+                return check(None, False)
+            return check(result[0], True)
+
+        def run_body():
+            body([None] * frame_size)
+
+        if node.get_function_name_with_params() in self.pure_functions:
+            invoke = self.__memoize(node.get_function_name_with_params(), invoke)
+        invoke.run_body = run_body
+        return invoke
+
+    def __memoize(self, name, invoke):
+        memo = self.memo
+
+        def memoized(values):
+            key = (name, tuple(unbox(value) for value in values))
+            value = memo.get(key)
+            if value is None:
+                value = unbox(invoke(values))
+                memo.put(key, value)
+            return value
+
+        return memoized
+
+    def get_memo(self):
+        return self.memo
+
+    def __compile_param(self, node, scope):
+        if isinstance(node.get_type(), QubitType):
+            # qubits are passed by reference, the callee shares the box
+            slot = scope.add_variable(node.get_variable_name().get_value(), node.get_type())
+
+            def bind_qubit(frame, value):
+                frame[slot] = get_qubit(value)
+
+            return bind_qubit
+
+        declare = self.__compile_new_variable(node, scope)
+        slot = scope.get_variable(node.get_variable_name().get_value())[0]
+
+        def bind(frame, value):
+            declare(frame)
+            assign_box(frame[slot], value)
+
+        return bind
+
+    @staticmethod
+    def __compile_return_check(return_type):
+
+        if isinstance(return_type, VoidType):
+            accepted = None
+        elif isinstance(return_type, IntType):
+            accepted = (int, IntBox)
+        elif isinstance(return_type, BoolType):
+            accepted = (BoolBox, bool)
+        elif isinstance(return_type, QubitType):
+            accepted = QubitBox
+        else:
+            accepted = ArrayBox
+
+        def check(value, returned):
+            if not returned:
+                if accepted is not None:
+                    raise Exception("Missing return statement")
+                return None
+
+            if accepted is None:
+                if value is not None:
+                    raise Exception("Incorrect return type")
+            elif not isinstance(value, accepted):
+                raise Exception("Incorrect return type")
+            return value
+
+        return check
+
+    # statements return None when they complete normally and a one element
+    # tuple holding the return value when a return statement was executed
+
+    def __compile_statement(self, node, scope):
+        compiler = self.statement_compilers.get(node.__class__.__name__)
+        if compiler is not None:
+            return compiler(node, scope)
+
+        expression = self.__compile_expression(node, scope)[0]
+
+        def statement(frame):
+            expression(frame)
+
+        return statement
+
+    def __compile_statements(self, node, scope):
+        statements = tuple(self.__compile_statement(statement, scope) for statement in node.get_statements())
+
+        if len(statements) == 1:
+            return statements[0]
+
+        def block(frame):
+            for statement in statements:
+                result = statement(frame)
+                if result is not None:
+                    return result
+
+        return block
+
+    def __compile_compound(self, node, scope):
+        return self.__compile_statements(node.get_statements(), SlotScope(scope))
+
+    def __compile_if(self, node, scope):
+        condition = self.__compile_bool_value(node.get_condition(), scope)
+        true_expr = self.__compile_statement(node.get_true_expression(), scope)
+
+        if node.get_false_expression() is None:
+            def if_statement(frame):
+                if condition(frame):
+                    return true_expr(frame)
+
+            return if_statement
+
+        false_expr = self.__compile_statement(node.get_false_expression(), scope)
+
+        def if_else_statement(frame):
+            if condition(frame):
+                return true_expr(frame)
+            return false_expr(frame)
+
+        return if_else_statement
+
+    def __compile_while(self, node, scope):
+        condition = self.__compile_bool_value(node.get_condition(), scope)
+        expression = self.__compile_statement(node.get_expression(), scope)
+
+        def while_statement(frame):
+            while condition(frame):
+                result = expression(frame)
+                if result is not None:
+                    return result
+
+        return while_statement
+
+    def __compile_return(self, node, scope):
+        if node.get_return_value() is None:
+            def return_void(frame):
+                return (None,)
+
+            return return_void
+
+        value = self.__compile_expression(node.get_return_value(), scope)[0]
+
+        def return_statement(frame):
+            return (value(frame),)
+
+        return return_statement
+
+    def __compile_new_variable(self, node, scope):
+        node_type = node.get_type()
+        variable_name = node.get_variable_name().get_value()
+
+        if isinstance(node_type, ArrayType):
+            element_type = node_type.get_type()
+            size = node_type.get_size()
+            if isinstance(size, int):
+                size = self.__constant(size)
+            else:
+                size = self.__compile_int_value(size, scope)
+            slot = scope.add_variable(variable_name, node_type)
+
+            if isinstance(element_type, QubitType):
+                simulator = self.simulator
+
+                def new_qubit_array(frame):
+                    frame[slot] = QubitArrayBox(simulator, size(frame))
+
+                return new_qubit_array
+
+            def new_array(frame):
+                frame[slot] = ArrayBox(element_type, size(frame))
+
+            return new_array
+
+        if isinstance(node_type, QubitType):
+            simulator = self.simulator
+            slot = scope.add_variable(variable_name, node_type)
+
+            def new_qubit(frame):
+                frame[slot] = QubitBox(simulator, simulator.allocate())
+
+            return new_qubit
+
+        if isinstance(node_type, IntType):
+            box_class = IntBox
+        elif isinstance(node_type, BoolType):
+            box_class = BoolBox
+        else:
+            raise Exception("Invalid type")
+
+        slot = scope.add_variable(variable_name, node_type)
+
+        def new_variable(frame):
+            frame[slot] = box_class()
+
+        return new_variable
+
+    # expressions compile to a closure and the kind of value it produces
+
+    def __compile_expression(self, node, scope):
+        compiler = self.compilers.get(node.__class__.__name__)
+        if compiler is None:
+            raise Exception(node.__class__.__name__ + " is an unrecognized type")
+        return compiler(node, scope)
+
+    def __compile_int_value(self, node, scope):
+        if node.__class__.__name__ == "VariableNode":
+            variable = scope.get_variable(node.get_value())
+            if variable is not None and isinstance(variable[1], IntType):
+                slot = variable[0]
+                return lambda frame: frame[slot].value
+
+        expression, kind = self.__compile_expression(node, scope)
+
+        if kind in (INT, BOOL):
+            return expression
+        elif kind == INT_BOX:
+            return lambda frame: expression(frame).value
+        elif kind == UNKNOWN:
+            return lambda frame: get_int(expression(frame))
+        return self.__compile_failure(expression, "Expected type int")
+
+    def __compile_bool_value(self, node, scope):
+        if node.__class__.__name__ == "VariableNode":
+            variable = scope.get_variable(node.get_value())
+            if variable is not None and isinstance(variable[1], BoolType):
+                slot = variable[0]
+                return lambda frame: frame[slot].value
+
+        expression, kind = self.__compile_expression(node, scope)
+
+        if kind == BOOL:
+            return expression
+        elif kind == BOOL_BOX:
+            return lambda frame: expression(frame).value
+        elif kind == UNKNOWN:
+            return lambda frame: get_bool(expression(frame))
+        return self.__compile_failure(expression, "Expected type bool")
+
+    @staticmethod
+    def __compile_failure(expression, message):
+        def failure(frame):
+            expression(frame)
+            raise Exception(message)
+
+        return failure
+
+    @staticmethod
+    def __constant(value):
+        return lambda frame: value
+
+    def __compile_int(self, node, scope):
+        return self.__constant(node.get_value()), INT
+
+    def __compile_bool(self, node, scope):
+        return self.__constant(node.get_value()), BOOL
+
+    def __compile_string(self, node, scope):
+        return self.__constant(node.get_value()), UNKNOWN
+
+    def __compile_variable(self, node, scope):
+        variable_name = node.get_value()
+        variable = scope.get_variable(variable_name)
+
+        if variable is None:
+            def missing(frame):
+                raise Exception("Variable " + variable_name + " does not exist")
+
+            return missing, UNKNOWN
+
+        slot, variable_type = variable
+        return (lambda frame: frame[slot]), self.__box_kind(variable_type)
+
+    @staticmethod
+    def __box_kind(variable_type):
+        if isinstance(variable_type, IntType):
+            return INT_BOX
+        elif isinstance(variable_type, BoolType):
+            return BOOL_BOX
+        elif isinstance(variable_type, ArrayType):
+            return ARRAY_BOX
+        return UNKNOWN
+
+    def __compile_index(self, node, scope):
+        array, kind = self.__compile_expression(node.get_name(), scope)
+        index = self.__compile_int_value(node.get_index(), scope)
+
+        if kind == ARRAY_BOX:
+            element_kind = UNKNOWN
+            if node.get_name().__class__.__name__ == "VariableNode":
+                element_kind = self.__box_kind(scope.get_variable(node.get_name().get_value())[1].get_type())
+
+            return (lambda frame: array(frame).get_value(index(frame))), element_kind
+        elif kind != UNKNOWN:
+            return self.__compile_failure(array, "Expected type array"), UNKNOWN
+
+        def index_value(frame):
+            return get_array(array(frame)).get_value(index(frame))
+
+        return index_value, UNKNOWN
+
+    def __compile_arithmetic(self, node, scope):
+        operation = node.get_arithmetic_operation()
+        if operation not in ARITHMETIC:
+            raise Exception("Unrecognized arithmetic operation")
+
+        left = self.__compile_int_value(node.get_left_expression(), scope)
+        right_node = node.get_right_expression()
+        if right_node.__class__.__name__ == "IntNode":
+            return ARITHMETIC_CONSTANT[operation](left, right_node.get_value()), INT
+
+        right = self.__compile_int_value(right_node, scope)
+        return ARITHMETIC[operation](left, right), INT
+
+    def __compile_condition(self, node, scope):
+        comparison = node.get_comparison()
+        if comparison not in COMPARISON:
+            raise Exception("Unrecognized comparison operation")
+
+        left = self.__compile_int_value(node.get_left_expression(), scope)
+        right_node = node.get_right_expression()
+        if right_node.__class__.__name__ == "IntNode":
+            return COMPARISON_CONSTANT[comparison](left, right_node.get_value()), BOOL
+
+        right = self.__compile_int_value(right_node, scope)
+        return COMPARISON[comparison](left, right), BOOL
+
+    def __compile_logic(self, node, scope):
+        logic = node.get_logic_operation()
+        left = self.__compile_bool_value(node.get_left_expression(), scope)
+        right = self.__compile_bool_value(node.get_right_expression(), scope)
+
+        # short circuit operations
+        if logic == "&&":
+            def logic_and(frame):
+                left_value = left(frame)
+                if left_value is False:
+                    return False
+                right_value = right(frame)
+                return left_value and right_value
+
+            return logic_and, BOOL
+        elif logic == "||":
+            def logic_or(frame):
+                left_value = left(frame)
+                if left_value is True:
+                    return True
+                right_value = right(frame)
+                return left_value or right_value
+
+            return logic_or, BOOL
+
+        raise Exception("Unrecognized logical operation")
+
+    def __compile_not(self, node, scope):
+        expression = self.__compile_bool_value(node.get_expression(), scope)
+        return (lambda frame: not expression(frame)), BOOL
+
+    def __compile_assign(self, node, scope):
+        variable, kind = self.__compile_expression(node.get_left(), scope)
+        value, value_kind = self.__compile_expression(node.get_right(), scope)
+
+        if kind == INT_BOX:
+            value = self.__compile_typecast(value, value_kind, typecast_int)
+        elif kind == BOOL_BOX:
+            value = self.__compile_typecast(value, value_kind, typecast_bool)
+        else:
+            def assign_any(frame):
+                variable_box = variable(frame)
+                assign_box(variable_box, value(frame))
+                return variable_box
+
+            return assign_any, kind
+
+        def assign(frame):
+            variable_box = variable(frame)
+            variable_box.set_value(value(frame))
+            return variable_box
+
+        return assign, kind
+
+    @staticmethod
+    def __compile_typecast(value, value_kind, typecast):
+        if value_kind in (INT, BOOL):
+            return value
+        elif value_kind in (INT_BOX, BOOL_BOX):
+            return lambda frame: value(frame).value
+        return lambda frame: typecast(value(frame))
+
+    def __compile_call(self, node, scope):
+
+        function_name = node.get_function_name().get_value()
+        if function_name in self.built_in_functions:
+            return self.built_in_functions_map[function_name](node.get_params(), scope), UNKNOWN
+
+        if function_name in ARRAY_FUNCTIONS and function_name not in self.function_names:
+            return self.__compile_library_function(node, scope, call_array_function), UNKNOWN
+
+        if function_name in QUANTUM_FUNCTIONS and function_name not in self.function_names:
+            return self.__compile_library_function(node, scope, call_quantum_function), UNKNOWN
+
+        params = tuple(self.__compile_expression(param, scope)[0] for param in node.get_params())
+        functions = self.functions
+
+        resolved_name = node.get_resolved_name()
+        if resolved_name is not None:
+            # the type checker already picked the overload
+            def call_resolved(frame):
+                return functions[resolved_name]([param(frame) for param in params])
+
+            return call_resolved, UNKNOWN
+
+        if not params:
+            function_name += "_void"
+
+        def call(frame):
+            values = []
+            name = function_name
+            for param in params:
+                value = param(frame)
+                values.append(value)
+                name += "_" + type_str(value)
+
+            function = functions.get(name)
+            if function is None:
+                raise Exception("Could not match function of type " + name)
+
+            return function(values)
+
+        return call, UNKNOWN
+
+    def __compile_library_function(self, node, scope, call_function):
+        function_name = node.get_function_name().get_value()
+        params = tuple(self.__compile_expression(param, scope)[0] for param in node.get_params())
+
+        def call(frame):
+            return call_function(function_name, [param(frame) for param in params])
+
+        return call
+
+    def __compile_print(self, params, scope):
+        params = tuple(self.__compile_expression(param, scope)[0] for param in params)
+        print_value = self.writer.print_value
+
+        def print_values(frame):
+            for param in params:
+                print_value(param(frame))
+
+        return print_values
+
+    def __compile_read(self, params, scope):
+        params = tuple(self.__compile_expression(param, scope)[0] for param in params)
+        reader = self.reader
+
+        def read_values(frame):
+            for param in params:
+                param_box = param(frame)
+                if not isinstance(param_box, Box):
+                    raise Exception("Can only read into variable")
+
+                read_box(reader, param_box)
+
+        return read_values
+
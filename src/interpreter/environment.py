@@ -2,17 +2,29 @@ from scope import Scope
 
 
 class Environment():
-    def __init__(self):
-        self.current_scope = Scope()
+    def __init__(self, size=0):
+        self.current_scope = Scope(size)
+        self.scopes = [self.current_scope]
 
-    def new_scope(self):
-        self.current_scope = Scope(self.current_scope)
+    def new_scope(self, size):
+        self.current_scope = Scope(size)
+        self.scopes.append(self.current_scope)
 
     def remove_scope(self):
-        self.current_scope = self.current_scope.previous_scope()
+        self.scopes.pop()
+        self.current_scope = self.scopes[-1]
 
-    def add_variable(self, variable_name, variable_type):
-        self.current_scope.add_variable(variable_name, variable_type)
+    def add_variable(self, slot, variable_name, variable_type, size=None):
+        self.current_scope.add_variable(slot, variable_name, variable_type, size)
 
-    def get_variable(self, variable_name):
-        return self.current_scope.get_variable(variable_name)
+    def declare_variable(self, slot, variable_name, box):
+        self.current_scope.declare_variable(slot, variable_name, box)
+
+    def bind_variable(self, slot, box):
+        self.current_scope.set_variable(slot, box)
+
+    def get_variable(self, variable_name, depth, slot):
+        box = self.scopes[-1 - depth].get_variable(slot)
+        if box is None:
+            raise Exception("Variable " + variable_name + " does not exist")
+        return box
@@ -0,0 +1,35 @@
+class InlineCache():
+    def __init__(self, limit=8):
+        self.limit = limit
+
+        # monomorphic entry, checked before the polymorphic table
+        self.types = None
+        self.target = None
+        self.targets = None
+
+    def lookup(self, types):
+        if types == self.types:
+            return self.target
+        if self.targets is not None:
+            return self.targets.get(types)
+        return None
+
+    def add(self, types, target):
+        if self.types is None:
+            self.types = types
+            self.target = target
+            return
+
+        if self.targets is None:
+            self.targets = {}
+        if len(self.targets) < self.limit:
+            self.targets[types] = target
+
+    def get_state(self):
+        if self.types is None:
+            return "uninitialized"
+        elif self.targets is None:
+            return "monomorphic"
+        elif len(self.targets) < self.limit:
+            return "polymorphic"
+        return "megamorphic"
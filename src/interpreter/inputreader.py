@@ -0,0 +1,70 @@
+import os
+import sys
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class InputReader():
+    # splits input into whitespace separated words a chunk at a time.
+    # read is any function taking a size and returning at most that many
+    # bytes, or "" once the input is exhausted. flush is called before
+    # every read so prompts are out before the program waits on input
+    def __init__(self, read=None, chunk_size=CHUNK_SIZE, flush=None):
+        if read is None:
+            # os.read returns what is available, so interactive input is
+            # not held back until a whole chunk has been typed
+            read = lambda size: os.read(sys.stdin.fileno(), size)
+
+        self.read = read
+        self.flush = flush
+        self.chunk_size = chunk_size
+        self.words = []
+        self.position = 0
+        self.partial = ""
+        self.eof = False
+
+    def read_word(self):
+        if self.position == len(self.words):
+            self.__fill()
+        word = self.words[self.position]
+        self.position += 1
+        return word
+
+    def read_words(self, count):
+        while len(self.words) - self.position < count:
+            self.__fill()
+
+        words = self.words[self.position:self.position + count]
+        self.position += count
+        return words
+
+    def __fill(self):
+        # drop consumed words before reading more so a long input is not
+        # held in memory all at once
+        del self.words[:self.position]
+        self.position = 0
+
+        while True:
+            if self.eof:
+                raise Exception("Unexpected end of input")
+
+            if self.flush is not None:
+                self.flush()
+
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                chunk = " "
+
+            words = (self.partial + chunk).split()
+
+            # a word running up to the end of the chunk may continue in the
+            # next one
+            self.partial = ""
+            if words and not chunk[-1].isspace():
+                self.partial = words.pop()
+
+            if words:
+                self.words.extend(words)
+                return
@@ -1,28 +1,62 @@
-import sys
-
 from box.box import Box
 from box.intbox import IntBox
 from box.boolbox import BoolBox
 from box.arraybox import ArrayBox
+from box.intelementbox import IntElementBox
+from box.boolelementbox import BoolElementBox
+from box.qubitbox import QubitBox
+from box.qubitarraybox import QubitArrayBox
 
+from arrayfunctions import ARRAY_FUNCTIONS, call_array_function
 from environment import Environment
-from scope import Scope
+from inputreader import InputReader
+from outputwriter import OutputWriter
+from inlinecache import InlineCache
+from memocache import MemoCache
+from purity import PurityAnalyzer
+from quantumfunctions import QUANTUM_FUNCTIONS, call_quantum_function
+from resolver import Resolver
 from returnstatement import ReturnStatement
+from runtime import read_array
 
 from ..parser.types.voidtype import VoidType
 from ..parser.types.inttype import IntType
 from ..parser.types.booltype import BoolType
 from ..parser.types.arraytype import ArrayType
+from ..parser.types.qubittype import QubitType
+from ..quantum.simulator import Simulator
+
+
+TYPE_KEYS = {
+    int: "int",
+    long: "int",
+    bool: "bool",
+    IntBox: "int",
+    BoolBox: "bool",
+    IntElementBox: "int",
+    BoolElementBox: "bool",
+    QubitBox: "qubit"
+}
+
+# nodes that evaluate to the box of a variable rather than to a value
+BOXED_NODES = ("VariableNode", "IndexNode", "AssignNode")
 
 
 class Interpreter():
-    def __init__(self, ast, debug=0):
+    def __init__(self, ast, debug=0, memo_size=10000, typed=False, reader=None, writer=None, simulator=None):
         self.ast = ast
+        self.simulator = simulator if simulator is not None else Simulator()
+        self.writer = writer if writer is not None else OutputWriter()
+        self.reader = reader if reader is not None else InputReader(flush=self.writer.flush)
+        self.typed = typed
         self.functions = {}
+        self.function_names = set()
+        self.pure_functions = set()
+        self.targets = {}
+        self.memo = MemoCache(memo_size) if memo_size > 0 else None
         self.stack = []
         self.env = Environment()
         self.environments = [self.env]
-        self.function_locs = []
         self.debug = debug
         self.built_in_functions = ("print", "read")
         self.built_in_functions_map = {
@@ -43,11 +77,23 @@ class Interpreter():
                 raise Exception(function_name + " already exists")
 
             self.functions[function_name] = function
+            self.function_names.add(fun_name)
 
         if self.functions.get("main_void") is None:
             return
 
-        self.__interpret(self.functions.get("main_void"))
+        Resolver().resolve(self.ast.program)
+
+        if self.memo is not None:
+            self.pure_functions = PurityAnalyzer().memoizable(self.functions)
+
+        main = self.functions.get("main_void")
+        self.env = Environment(main.get_scope_size())
+        self.environments = [self.env]
+        try:
+            self.__interpret(main)
+        finally:
+            self.writer.flush()
 
     def __interpret(self, node):
 
@@ -87,6 +133,8 @@ class Interpreter():
             self.__return(node)
         elif node_type == "StatementsNode":
             self.__statements(node)
+        elif node_type == "StringNode":
+            self.__string(node)
         elif node_type == "VariableNode":
             self.__variable(node)
         elif node_type == "WhileNode":
@@ -96,13 +144,8 @@ class Interpreter():
 
     def __arithmetic(self, node):
 
-        self.__interpret(node.get_left_expression())
-        left = self.stack.pop()
-        left = self.__get_int(left)
-
-        self.__interpret(node.get_right_expression())
-        right = self.stack.pop()
-        right = self.__get_int(right)
+        left = self.__int_value(node.get_left_expression())
+        right = self.__int_value(node.get_right_expression())
 
         arithmetic = node.get_arithmetic_operation()
 
@@ -126,7 +169,17 @@ class Interpreter():
         self.__interpret(node.get_right())
         value_box = self.stack.pop()
 
-        self.__assign_box(variable_box, value_box)
+        if self.typed and variable_box.__class__ is not ArrayBox:
+            # scalar assignments are checked, so only the conversion between
+            # int and bool is left to do
+            if node.get_right().__class__.__name__ in BOXED_NODES:
+                value_box = value_box.value
+            if isinstance(variable_box, IntBox):
+                variable_box.set_value(int(value_box))
+            else:
+                variable_box.set_value(bool(value_box))
+        else:
+            self.__assign_box(variable_box, value_box)
 
         self.stack.append(variable_box)
 
@@ -144,6 +197,8 @@ class Interpreter():
                 return value_box
             else:
                 raise Exception("Unable to typecast to correct array type")
+        elif isinstance(variable_box, QubitBox):
+            raise Exception("Cannot assign to a qubit")
         else:
             raise Exception("Unrecognized type")
 
@@ -188,10 +243,20 @@ class Interpreter():
 
         func(node.get_params())
 
+    def __library_function(self, node, call_function):
+        args = []
+        for param in node.get_params():
+            self.__interpret(param)
+            args.append(self.stack.pop())
+
+        return_val = call_function(node.get_function_name().get_value(), args)
+        if return_val is not None:
+            self.stack.append(return_val)
+
     def __print(self, params):
         for param in params:
             self.__interpret(param)
-            print self.stack.pop()
+            self.writer.print_value(self.stack.pop())
 
     def __read(self, params):
 
@@ -212,36 +277,19 @@ class Interpreter():
             self.__read_bool(param_box)
         elif isinstance(param_box, ArrayBox):
             self.__read_array(param_box)
+        elif isinstance(param_box, QubitBox):
+            raise Exception("Cannot read into a qubit")
         else:
             raise Exception("Cannot read void type")
 
-    @staticmethod
-    def __ignore_spaces():
-        c = sys.stdin.read(1)
-        while c.isspace() or c == '':
-            c = sys.stdin.read(1)
-        return c
-
     def __read_int(self, var_box):
-        var_box.set_value(int(self.__read_word()))
+        var_box.set_value(int(self.reader.read_word()))
 
     def __read_bool(self, var_box):
-        var_box.set_value(bool(self.__read_word()))
-
-    def __read_word(self):
-        c = self.__ignore_spaces()
-
-        value = ""
-        while not c.isspace():
-            if c != '':
-                value += c
-            c = sys.stdin.read(1)
-
-        return value
+        var_box.set_value(bool(self.reader.read_word()))
 
     def __read_array(self, var_box):
-        for box in var_box:
-            self.__read_box(box)
+        read_array(self.reader, var_box)
 
     def __call(self, node):
 
@@ -250,34 +298,66 @@ class Interpreter():
             self.__built_in_functions(node)
             return
 
+        if function_name in ARRAY_FUNCTIONS and function_name not in self.function_names:
+            self.__library_function(node, call_array_function)
+            return
+
+        if function_name in QUANTUM_FUNCTIONS and function_name not in self.function_names:
+            self.__library_function(node, call_quantum_function)
+            return
+
         interpreted_params = []
         for param in node.get_params():
             self.__interpret(param)
             interpreted_params.append(self.stack.pop())
-            function_name += "_" + self.__type_str(interpreted_params[-1])
-
-        function = self.functions.get(function_name)
-        if function is None:
-            raise Exception("Could not match function of type " + function_name)
 
-        self.env = Environment()
+        resolved_name = node.get_resolved_name()
+        if resolved_name is not None:
+            # the type checker already picked the overload
+            function_name, function, plan = self.__target(resolved_name)
+        else:
+            types = tuple([self.__type_key(param) for param in interpreted_params])
+
+            inline_cache = node.get_inline_cache()
+            if inline_cache is None:
+                inline_cache = InlineCache()
+                node.set_inline_cache(inline_cache)
+
+            target = inline_cache.lookup(types)
+            if target is None:
+                target = self.__resolve(function_name, types)
+                inline_cache.add(types, target)
+            function_name, function, plan = target
+
+        key = None
+        if function_name in self.pure_functions:
+            key = (function_name, tuple(self.__unbox(param) for param in interpreted_params))
+            return_val = self.memo.get(key)
+            if return_val is not None:
+                self.stack.append(return_val)
+                return
+
+        self.env = Environment(function.get_scope_size())
         self.environments.append(self.env)
 
-        # self.__interpret(function.get_params())
-        self.__set_params(function.get_params().get_params(), interpreted_params)
-
-        # run function
-        self.__interpret(function)
+        try:
+            self.__set_params(plan, interpreted_params)
 
-        self.environments.pop()
-        self.env = self.environments[-1]
+            # run function
+            self.__interpret(function)
+        finally:
+            self.environments.pop()
+            self.env = self.environments[-1]
 
         # check if top of stack is return statement(r)
         if len(self.stack) != 0 and isinstance(self.stack[-1], ReturnStatement):
             return_val = self.stack.pop().args[0]
 
             # typecast
-            if isinstance(function.get_return_type(), VoidType):
+            if self.typed:
+                if isinstance(return_val, (IntBox, BoolBox)):
+                    return_val = return_val.value
+            elif isinstance(function.get_return_type(), VoidType):
                 if return_val is not None:
                     raise Exception("Incorrect return type")
             elif isinstance(function.get_return_type(), IntType):
@@ -289,43 +369,112 @@ class Interpreter():
             elif isinstance(function.get_return_type(), ArrayType):
                 if not isinstance(return_val, ArrayBox):
                     raise Exception("Incorrect return type")
+            elif isinstance(function.get_return_type(), QubitType):
+                if not isinstance(return_val, QubitBox):
+                    raise Exception("Incorrect return type")
+
+            if key is not None:
+                return_val = self.__unbox(return_val)
+                self.memo.put(key, return_val)
 
             self.stack.append(return_val)
         else:
             if str(function.get_return_type()) != "void":
                 raise Exception("Missing return statement")
 
+    @staticmethod
+    def __unbox(value):
+        if isinstance(value, (IntBox, BoolBox)):
+            return value.get_value()
+        return value
+
+    def get_memo(self):
+        return self.memo
+
     def __type_str(self, value):
         if isinstance(value, (int, IntBox)):
             return "int"
         elif isinstance(value, (bool, BoolBox)):
             return "bool"
         elif isinstance(value, ArrayBox):
-            return "array_" + self.__type_str(value.get_value(0))
+            return "array_" + value.get_element_type()
+        elif isinstance(value, QubitBox):
+            return "qubit"
         else:
             raise Exception("Unrecognized type")
 
-    def __set_params(self, params, param_exprs):
-        for i in range(len(params)):
+    def __resolve(self, function_name, types):
+        if types:
+            function_name += "_" + "_".join(types)
+        else:
+            function_name += "_void"
+
+        return self.__target(function_name)
+
+    def __target(self, function_name):
+        target = self.targets.get(function_name)
+        if target is None:
+            function = self.functions.get(function_name)
+            if function is None:
+                raise Exception("Could not match function of type " + function_name)
+
+            target = (function_name, function, self.__binding_plan(function))
+            self.targets[function_name] = target
+
+        return target
+
+    def __type_key(self, value):
+        type_key = TYPE_KEYS.get(value.__class__)
+        if type_key is None:
+            return self.__type_str(value)
+        return type_key
+
+    @staticmethod
+    def __binding_plan(function):
+        plan = []
+        for param in function.get_params().get_params():
+            param_type = param.get_type().__class__
+            if param_type not in (IntType, BoolType, QubitType):
+                param_type = None
+            plan.append((param_type, param.get_slot(), param))
+        return tuple(plan)
+
+    def __set_params(self, plan, param_exprs):
+        for i in range(len(plan)):
+            param_type, slot, param = plan[i]
             param_expr = param_exprs[i]
-            param_var = params[i].get_variable_name()
-            self.__interpret(params[i])
-            self.__interpret(param_var)
-            variable_box = self.stack.pop()
-            self.__assign_box(variable_box, param_expr)
+
+            if param_type is IntType:
+                variable_box = IntBox()
+                variable_box.set_value(self.__typecast_int(param_expr))
+                self.env.bind_variable(slot, variable_box)
+            elif param_type is BoolType:
+                variable_box = BoolBox()
+                variable_box.set_value(self.__typecast_bool(param_expr))
+                self.env.bind_variable(slot, variable_box)
+            elif param_type is QubitType:
+                # qubits are passed by reference, the callee shares the box
+                if not isinstance(param_expr, QubitBox):
+                    raise Exception("Expected type qubit")
+                self.env.bind_variable(slot, param_expr)
+            else:
+                # array sizes may depend on earlier parameters, so they are
+                # still declared by interpreting the parameter
+                self.__interpret(param)
+                self.__interpret(param.get_variable_name())
+                variable_box = self.stack.pop()
+                self.__assign_box(variable_box, param_expr)
 
     def __compound(self, node):
-        self.env.new_scope()
-        self.__interpret(node.get_statements())
+        self.env.new_scope(node.get_scope_size())
+        try:
+            self.__interpret(node.get_statements())
+        finally:
+            self.env.remove_scope()
 
     def __condition(self, node):
-        self.__interpret(node.get_left_expression())
-        left = self.stack.pop()
-        left = self.__get_int(left)
-
-        self.__interpret(node.get_right_expression())
-        right = self.stack.pop()
-        right = self.__get_int(right)
+        left = self.__int_value(node.get_left_expression())
+        right = self.__int_value(node.get_right_expression())
 
         comparison = node.get_comparison()
 
@@ -345,20 +494,17 @@ class Interpreter():
             raise Exception("Unrecognized comparison operation")
 
     def __function(self, node):
-        self.function_locs.append(len(self.stack))
+        loc = len(self.stack)
 
         try:
             self.__interpret(node.get_statements())
         except ReturnStatement as r:
-            loc = self.function_locs.pop()
-            self.stack = self.stack[:loc]
+            del self.stack[loc:]
             self.stack.append(r)
 
     def __if(self, node):
 
-        self.__interpret(node.get_condition())
-        conditional = self.stack.pop()
-        conditional = self.__get_bool(conditional)
+        conditional = self.__bool_value(node.get_condition())
 
         if conditional:
             self.__interpret(node.get_true_expression())
@@ -372,9 +518,7 @@ class Interpreter():
         array_box = self.stack.pop()
         array_box = self.__get_array(array_box)
 
-        self.__interpret(node.get_index())
-        value = self.stack.pop()
-        value = self.__get_int(value)
+        value = self.__int_value(node.get_index())
 
         self.stack.append(array_box.get_value(value))
 
@@ -382,9 +526,7 @@ class Interpreter():
         self.stack.append(node.get_value())
 
     def __logic(self, node):
-        self.__interpret(node.get_left_expression())
-        left = self.stack.pop()
-        left = self.__get_int(left)
+        left = self.__bool_value(node.get_left_expression())
 
         logic = node.get_logic_operation()
 
@@ -397,9 +539,7 @@ class Interpreter():
             self.stack.append(True)
             return
 
-        self.__interpret(node.get_right_expression())
-        right = self.stack.pop()
-        right = self.__get_int(right)
+        right = self.__bool_value(node.get_right_expression())
 
         if logic == "&&":
             self.stack.append(left and right)
@@ -412,19 +552,47 @@ class Interpreter():
         node_type = node.get_type()
         variable_name = node.get_variable_name().get_value()
 
+        if node_type.__class__.__name__ == "QubitType":
+            qubit_box = QubitBox(self.simulator, self.simulator.allocate())
+            self.env.declare_variable(node.get_slot(), variable_name, qubit_box)
+            return
+
+        size = None
         if node_type.__class__.__name__ == "ArrayType":
-            self.__interpret(node_type.get_size())
-            box = self.stack.pop()
-            box = self.__get_int(box)
-            node_type.set_size(box)
+            size = self.__int_value(node_type.get_size())
 
-        self.env.add_variable(variable_name, node_type)
+            if node_type.get_type().__class__.__name__ == "QubitType":
+                array_box = QubitArrayBox(self.simulator, size)
+                self.env.declare_variable(node.get_slot(), variable_name, array_box)
+                return
+
+        self.env.add_variable(node.get_slot(), variable_name, node_type, size)
 
     def __not(self, node):
 
-        self.__interpret(node.get_expression())
+        self.stack.append(not self.__bool_value(node.get_expression()))
+
+    def __int_value(self, node):
+        self.__interpret(node)
         value = self.stack.pop()
-        self.stack.append(not self.__get_bool(value))
+
+        # the type checker has proven the value is an int, only variables
+        # still need unboxing
+        if self.typed:
+            if node.__class__.__name__ in BOXED_NODES:
+                return value.value
+            return value
+        return self.__get_int(value)
+
+    def __bool_value(self, node):
+        self.__interpret(node)
+        value = self.stack.pop()
+
+        if self.typed:
+            if node.__class__.__name__ in BOXED_NODES:
+                return value.value
+            return value
+        return self.__get_bool(value)
 
     @staticmethod
     def __get_int(value):
@@ -461,25 +629,21 @@ class Interpreter():
 
     def __statements(self, node):
         for statement in node.get_statements():
+            depth = len(self.stack)
             self.__interpret(statement)
 
-            statement_type = statement.__class__.__name__
-            if statement_type not in ("IfNode", "WhileNode", "ReturnNode", "NewVariableNode", "CallNode"):
-                self.stack.pop()
+            # drop whatever value the statement left behind
+            del self.stack[depth:]
+
+    def __string(self, node):
+        self.stack.append(node.get_value())
 
     def __variable(self, node):
-        variable_name = node.get_value()
-        self.stack.append(self.env.get_variable(variable_name))
+        self.stack.append(self.env.get_variable(node.get_value(), node.get_depth(), node.get_slot()))
 
     def __while(self, node):
         condition = node.get_condition()
         expression = node.get_expression()
 
-        self.__interpret(condition)
-        conditional_value = self.stack.pop()
-        conditional_value = self.__get_bool(conditional_value)
-        while conditional_value:
+        while self.__bool_value(condition):
             self.__interpret(expression)
-            self.__interpret(condition)
-            conditional_value = self.stack.pop()
-            conditional_value = self.__get_bool(conditional_value)
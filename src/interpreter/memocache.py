@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+class MemoCache():
+    def __init__(self, size):
+        if size <= 0:
+            raise Exception("Cannot create memo cache of size " + str(size))
+
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+
+        # re-inserting moves the entry to the most recently used end
+        self.entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries.pop(key, None)
+        self.entries[key] = value
+
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_hits(self):
+        return self.hits
+
+    def get_misses(self):
+        return self.misses
+
+    def get_evictions(self):
+        return self.evictions
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return "memo: " + str(self.hits) + " hits, " + str(self.misses) + " misses, " + \
+               str(self.evictions) + " evictions, " + str(len(self.entries)) + "/" + str(self.size) + " entries"
@@ -0,0 +1,60 @@
+import sys
+
+from box.arraybox import ArrayBox
+from box.qubitbox import QubitBox
+from box.qubitarraybox import QubitArrayBox
+from runtime import type_str
+
+
+BUFFER_SIZE = 64 * 1024
+
+# elements of a printed array are formatted this many at a time
+ARRAY_CHUNK = 4096
+
+
+class OutputWriter():
+    # collects printed values and writes them in blocks once buffer_size
+    # bytes are waiting, on flush, and before input is read
+    def __init__(self, stream=None, buffer_size=BUFFER_SIZE):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.size = 0
+
+    def print_value(self, value):
+        # the type checker rejects these too, but it can be turned off
+        if isinstance(value, (QubitBox, QubitArrayBox)):
+            raise Exception("cannot print " + type_str(value) + ", measure it first")
+        elif isinstance(value, ArrayBox):
+            self.__print_array(value)
+        else:
+            self.write(str(value) + "\n")
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.stream.write("".join(self.parts))
+            self.parts = []
+            self.size = 0
+        self.stream.flush()
+
+    def __print_array(self, array_box):
+        # large arrays are formatted in slices rather than as one string
+        to_str = str
+        if array_box.get_element_type() == "bool":
+            to_str = lambda value: str(value != 0)
+
+        self.write("[")
+        first = True
+        for values in array_box.get_chunks():
+            for start in xrange(0, len(values), ARRAY_CHUNK):
+                if not first:
+                    self.write(", ")
+                first = False
+                self.write(", ".join(map(to_str, values[start:start + ARRAY_CHUNK])))
+        self.write("]\n")
@@ -0,0 +1,181 @@
+from arrayfunctions import ARRAY_FUNCTIONS, MUTATING_ARRAY_FUNCTIONS, IO_ARRAY_FUNCTIONS
+from quantumfunctions import QUANTUM_FUNCTIONS
+
+
+class PurityAnalyzer():
+    def __init__(self):
+        self.impure_built_in_functions = ("print", "read")
+        self.function_names = set()
+        self.scopes = []
+        self.calls = set()
+        self.impure = False
+        self.walkers = {
+            "ArithmeticNode": self.__walk_binary,
+            "AssignNode": self.__walk_assign,
+            "BoolNode": self.__walk_nothing,
+            "CallNode": self.__walk_call,
+            "CompoundNode": self.__walk_compound,
+            "ConditionNode": self.__walk_binary,
+            "IfNode": self.__walk_if,
+            "IndexNode": self.__walk_index,
+            "IntNode": self.__walk_nothing,
+            "LogicNode": self.__walk_binary,
+            "NewVariableNode": self.__walk_new_variable,
+            "NotNode": self.__walk_not,
+            "ReturnNode": self.__walk_return,
+            "StatementsNode": self.__walk_statements,
+            "StringNode": self.__walk_nothing,
+            "VariableNode": self.__walk_nothing,
+            "WhileNode": self.__walk_while
+        }
+
+    def analyze(self, functions):
+        # functions maps mangled names to FunctionNodes, a function is pure
+        # if it does no I/O, never writes through an array parameter and
+        # only calls pure functions
+        calls = {}
+        pure = set()
+        self.function_names = set(function.get_function_name() for function in functions.values())
+        for name, function in functions.items():
+            calls[name] = self.__analyze_function(function)
+            if not self.impure:
+                pure.add(name)
+
+        # assume every candidate is pure, then drop the ones calling
+        # something impure until nothing changes, which keeps recursion pure
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                for call in calls[name]:
+                    callees = [callee for callee in functions if self.__matches(functions[callee], call)]
+                    if not callees or any(callee not in pure for callee in callees):
+                        pure.discard(name)
+                        changed = True
+                        break
+
+        return pure
+
+    def memoizable(self, functions):
+        # only calls taking scalars and returning a value can be cached
+        memoizable = set()
+        for name in self.analyze(functions):
+            function = functions[name]
+            if str(function.get_return_type()) == "void":
+                continue
+            if any(str(param.get_type()) not in ("int", "bool") for param in function.get_params().get_params()):
+                continue
+            memoizable.add(name)
+        return memoizable
+
+    @staticmethod
+    def __matches(function, call):
+        return function.get_function_name() == call[0] and function.get_params().get_size() == call[1]
+
+    def __analyze_function(self, node):
+        self.scopes = [{}]
+        self.calls = set()
+        self.impure = False
+
+        for param in node.get_params().get_params():
+            self.scopes[-1][param.get_variable_name().get_value()] = str(param.get_type()).startswith("array")
+        self.__walk(node.get_statements())
+
+        return self.calls
+
+    def __walk(self, node):
+        walker = self.walkers.get(node.__class__.__name__)
+        if walker is None:
+            raise Exception(node.__class__.__name__ + " is an unrecognized type")
+        walker(node)
+
+    def __is_array_param(self, node):
+        if node.__class__.__name__ != "VariableNode":
+            return False
+
+        for scope in reversed(self.scopes):
+            if node.get_value() in scope:
+                return scope[node.get_value()]
+        return False
+
+    def __walk_nothing(self, node):
+        pass
+
+    def __walk_binary(self, node):
+        self.__walk(node.get_left_expression())
+        self.__walk(node.get_right_expression())
+
+    def __walk_assign(self, node):
+        left = node.get_left()
+
+        if left.__class__.__name__ == "IndexNode" and self.__is_array_param(left.get_name()):
+            self.impure = True
+        elif self.__is_array_param(node.get_right()):
+            # the target now aliases the parameter, so later writes through
+            # it would be writes to the caller's array
+            self.impure = True
+
+        self.__walk(left)
+        self.__walk(node.get_right())
+
+    def __walk_call(self, node):
+        function_name = node.get_function_name().get_value()
+        if function_name in self.impure_built_in_functions:
+            self.impure = True
+        elif function_name in ARRAY_FUNCTIONS and function_name not in self.function_names:
+            params = node.get_params()
+            if function_name in IO_ARRAY_FUNCTIONS:
+                self.impure = True
+            elif function_name in MUTATING_ARRAY_FUNCTIONS and params and self.__is_array_param(params[0]):
+                self.impure = True
+        elif function_name in QUANTUM_FUNCTIONS and function_name not in self.function_names:
+            # gates and measurements change the shared quantum state
+            self.impure = True
+        else:
+            self.calls.add((function_name, len(node.get_params())))
+
+        for param in node.get_params():
+            self.__walk(param)
+
+    def __walk_compound(self, node):
+        self.scopes.append({})
+        self.__walk(node.get_statements())
+        self.scopes.pop()
+
+    def __walk_if(self, node):
+        self.__walk(node.get_condition())
+        self.__walk(node.get_true_expression())
+        if node.get_false_expression() is not None:
+            self.__walk(node.get_false_expression())
+
+    def __walk_index(self, node):
+        self.__walk(node.get_name())
+        self.__walk(node.get_index())
+
+    def __walk_new_variable(self, node):
+        node_type = node.get_type()
+        if node_type.__class__.__name__ == "ArrayType":
+            if not isinstance(node_type.get_size(), int):
+                self.__walk(node_type.get_size())
+            node_type = node_type.get_type()
+
+        if node_type.__class__.__name__ == "QubitType":
+            # allocating a qubit grows the shared quantum state
+            self.impure = True
+
+        self.scopes[-1][node.get_variable_name().get_value()] = False
+
+    def __walk_not(self, node):
+        self.__walk(node.get_expression())
+
+    def __walk_return(self, node):
+        if node.get_return_value() is not None:
+            self.__walk(node.get_return_value())
+
+    def __walk_statements(self, node):
+        for statement in node.get_statements():
+            self.__walk(statement)
+
+    def __walk_while(self, node):
+        self.__walk(node.get_condition())
+        self.__walk(node.get_expression())
@@ -0,0 +1,60 @@
+from runtime import get_qubit, get_qubits
+
+
+# quantum functions act on the simulator the qubits were allocated in.
+# like the array functions, user functions of the same name take precedence
+
+
+def quantum_hadamard(qubits):
+    # an array of qubits is transformed as a whole rather than a qubit at a
+    # time. they were allocated together, so they share a simulator
+    if len(qubits) == 1:
+        qubits[0].get_simulator().hadamard(qubits[0].get_index())
+    else:
+        qubits[0].get_simulator().hadamard_all([qubit.get_index() for qubit in qubits])
+
+
+def quantum_cnot(control, target):
+    control.get_simulator().cnot(control.get_index(), target.get_index())
+
+
+def quantum_pauliy(qubit):
+    qubit.get_simulator().pauliy(qubit.get_index())
+
+
+def quantum_measure(qubit):
+    return qubit.get_simulator().measure(qubit.get_index())
+
+
+# name: (function, parameter types, return type) where "qubits" is a qubit
+# or an array of qubits
+QUANTUM_FUNCTIONS = {
+    "hadamard": (quantum_hadamard, ("qubits",), "void"),
+    "cnot": (quantum_cnot, ("qubit", "qubit"), "void"),
+    "pauliy": (quantum_pauliy, ("qubit",), "void"),
+    "measure": (quantum_measure, ("qubit",), "int")
+}
+
+# functions a stabilizer tableau can simulate
+CLIFFORD_FUNCTIONS = ("hadamard", "cnot", "pauliy", "measure")
+
+
+def call_quantum_function(function_name, args):
+    function, param_types, _ = QUANTUM_FUNCTIONS[function_name]
+    if len(args) != len(param_types):
+        raise Exception(function_name + " takes " + str(len(param_types)) + " arguments")
+
+    return function(*[get_qubits(arg) if param_type == "qubits" else get_qubit(arg)
+                      for arg, param_type in zip(args, param_types)])
+
+
+def select_backend(ast):
+    # programs that only use Clifford operations run on a stabilizer
+    # tableau, which is polynomial in the number of qubits
+    function_names = set(function.get_function_name() for function in ast.program)
+
+    for function_name in ast.get_called_functions() - function_names:
+        if function_name in QUANTUM_FUNCTIONS and function_name not in CLIFFORD_FUNCTIONS:
+            return "factored"
+
+    return "stabilizer"
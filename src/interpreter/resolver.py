@@ -0,0 +1,113 @@
+class Resolver():
+    def __init__(self):
+        self.scopes = []
+        self.resolvers = {
+            "ArithmeticNode": self.__resolve_binary,
+            "AssignNode": self.__resolve_assign,
+            "BoolNode": self.__resolve_nothing,
+            "CallNode": self.__resolve_call,
+            "CompoundNode": self.__resolve_compound,
+            "ConditionNode": self.__resolve_binary,
+            "IfNode": self.__resolve_if,
+            "IndexNode": self.__resolve_index,
+            "IntNode": self.__resolve_nothing,
+            "LogicNode": self.__resolve_binary,
+            "NewVariableNode": self.__resolve_new_variable,
+            "NotNode": self.__resolve_not,
+            "ReturnNode": self.__resolve_return,
+            "StatementsNode": self.__resolve_statements,
+            "StringNode": self.__resolve_nothing,
+            "VariableNode": self.__resolve_variable,
+            "WhileNode": self.__resolve_while
+        }
+
+    def resolve(self, program):
+        for function in program:
+            self.resolve_function(function)
+
+    def resolve_function(self, node):
+        self.scopes = [{}]
+
+        for param in node.get_params().get_params():
+            self.__resolve(param)
+        self.__resolve(node.get_statements())
+
+        node.set_scope_size(len(self.scopes[0]))
+
+    def __resolve(self, node):
+        resolver = self.resolvers.get(node.__class__.__name__)
+        if resolver is None:
+            raise Exception(node.__class__.__name__ + " is an unrecognized type")
+        resolver(node)
+
+    def __declare(self, variable):
+        name = variable.get_value()
+        scope = self.scopes[-1]
+        if name in scope:
+            raise Exception("Variable of name " + name + " already exists")
+
+        scope[name] = len(scope)
+        variable.set_address(0, scope[name])
+        return scope[name]
+
+    def __resolve_variable(self, node):
+        name = node.get_value()
+        for depth in range(len(self.scopes)):
+            slot = self.scopes[-1 - depth].get(name)
+            if slot is not None:
+                node.set_address(depth, slot)
+                return
+
+        raise Exception("Variable " + name + " does not exist")
+
+    def __resolve_nothing(self, node):
+        pass
+
+    def __resolve_binary(self, node):
+        self.__resolve(node.get_left_expression())
+        self.__resolve(node.get_right_expression())
+
+    def __resolve_assign(self, node):
+        self.__resolve(node.get_left())
+        self.__resolve(node.get_right())
+
+    def __resolve_call(self, node):
+        for param in node.get_params():
+            self.__resolve(param)
+
+    def __resolve_compound(self, node):
+        self.scopes.append({})
+        self.__resolve(node.get_statements())
+        node.set_scope_size(len(self.scopes.pop()))
+
+    def __resolve_if(self, node):
+        self.__resolve(node.get_condition())
+        self.__resolve(node.get_true_expression())
+        if node.get_false_expression() is not None:
+            self.__resolve(node.get_false_expression())
+
+    def __resolve_index(self, node):
+        self.__resolve(node.get_name())
+        self.__resolve(node.get_index())
+
+    def __resolve_new_variable(self, node):
+        node_type = node.get_type()
+        if node_type.__class__.__name__ == "ArrayType" and not isinstance(node_type.get_size(), int):
+            self.__resolve(node_type.get_size())
+
+        node.set_slot(self.__declare(node.get_variable_name()))
+
+    def __resolve_not(self, node):
+        self.__resolve(node.get_expression())
+
+    def __resolve_return(self, node):
+        if node.get_return_value() is not None:
+            self.__resolve(node.get_return_value())
+
+    def __resolve_statements(self, node):
+        for statement in node.get_statements():
+            self.__resolve(statement)
+
+    def __resolve_while(self, node):
+        self.__resolve(node.get_condition())
+        self.__resolve(node.get_expression())
@@ -0,0 +1,120 @@
+from box.intbox import IntBox
+from box.boolbox import BoolBox
+from box.arraybox import ArrayBox
+from box.qubitbox import QubitBox
+from box.qubitarraybox import QubitArrayBox
+
+
+def get_int(value):
+    if isinstance(value, IntBox):
+        return value.get_value()
+    elif not isinstance(value, int):
+        raise Exception("Expected type int")
+    return value
+
+
+def get_bool(value):
+    if isinstance(value, BoolBox):
+        return value.get_value()
+    elif not isinstance(value, bool):
+        raise Exception("Expected type bool")
+    return value
+
+
+def get_array(value):
+    if isinstance(value, ArrayBox):
+        return value
+    raise Exception("Expected type array")
+
+
+def get_qubit(value):
+    if isinstance(value, QubitBox):
+        return value
+    raise Exception("Expected type qubit")
+
+
+def get_qubits(value):
+    # a qubit or an array of them, as a list of qubits
+    if isinstance(value, QubitBox):
+        return [value]
+    elif isinstance(value, QubitArrayBox):
+        return value.get_qubits()
+    raise Exception("Expected type qubit or array_qubit")
+
+
+def unbox(value):
+    # the value of an int or bool box, anything else as it is
+    if isinstance(value, (IntBox, BoolBox)):
+        return value.get_value()
+    return value
+
+
+def typecast_int(value):
+    if isinstance(value, (int, bool)):
+        return int(value)
+    elif isinstance(value, (IntBox, BoolBox)):
+        return int(value.get_value())
+    else:
+        raise Exception("Unable to typecast into int")
+
+
+def typecast_bool(value):
+    if isinstance(value, ArrayBox):
+        return True
+    elif isinstance(value, (int, bool)):
+        return bool(value)
+    elif isinstance(value, (IntBox, BoolBox)):
+        return bool(value.get_value())
+    else:
+        raise Exception("Unable to typecast into boolean")
+
+
+def assign_box(variable_box, value_box):
+    if isinstance(variable_box, IntBox):
+        variable_box.set_value(typecast_int(value_box))
+    elif isinstance(variable_box, BoolBox):
+        variable_box.set_value(typecast_bool(value_box))
+    elif isinstance(variable_box, ArrayBox):
+        if type_str(variable_box) == type_str(value_box):
+            variable_box.set_value(value_box)
+        else:
+            raise Exception("Unable to typecast to correct array type")
+    elif isinstance(variable_box, QubitBox):
+        raise Exception("Cannot assign to a qubit")
+    else:
+        raise Exception("Unrecognized type")
+
+
+def type_str(value):
+    if isinstance(value, (bool, BoolBox)):
+        return "bool"
+    elif isinstance(value, (int, long, IntBox)):
+        return "int"
+    elif isinstance(value, ArrayBox):
+        return "array_" + value.get_element_type()
+    elif isinstance(value, QubitBox):
+        return "qubit"
+    else:
+        raise Exception("Unrecognized type")
+
+
+def read_box(reader, param_box):
+    if isinstance(param_box, IntBox):
+        param_box.set_value(int(reader.read_word()))
+    elif isinstance(param_box, BoolBox):
+        param_box.set_value(bool(reader.read_word()))
+    elif isinstance(param_box, ArrayBox):
+        read_array(reader, param_box)
+    elif isinstance(param_box, QubitBox):
+        raise Exception("Cannot read into a qubit")
+    else:
+        raise Exception("Cannot read void type")
+
+
+def read_array(reader, array_box):
+    # the words for the whole array are converted in one step
+    words = reader.read_words(array_box.get_size())
+    if array_box.get_element_type() == "int":
+        array_box.set_values(map(int, words))
+    else:
+        array_box.set_values(map(bool, words))
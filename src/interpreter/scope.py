@@ -4,33 +4,31 @@ from box.arraybox import ArrayBox
 
 
 class Scope():
-    def __init__(self, old_scope = None):
-        self.variables = {}
-        self.previous = old_scope
+    def __init__(self, size=0):
+        self.slots = [None] * size
 
-    def add_variable(self, name, variable_type):
-        if self.variables.get(name) is not None:
+    def add_variable(self, slot, name, variable_type, size=None):
+        if self.slots[slot] is not None:
             raise Exception("Variable of name " + name + " already exists")
 
         if variable_type.__class__.__name__ == "IntType":
-            self.variables[name] = IntBox()
+            self.slots[slot] = IntBox()
         elif variable_type.__class__.__name__ == "BoolType":
-            self.variables[name] = BoolBox()
+            self.slots[slot] = BoolBox()
         elif variable_type.__class__.__name__ == "ArrayType":
-            self.variables[name] = ArrayBox(variable_type.get_type(), variable_type.get_size())
+            self.slots[slot] = ArrayBox(variable_type.get_type(), size)
         else:
             raise Exception("Invalid type")
 
-    def get_variable(self, variable_name):
+    def declare_variable(self, slot, name, box):
+        # for variables whose box is made elsewhere, like qubits
+        if self.slots[slot] is not None:
+            raise Exception("Variable of name " + name + " already exists")
 
-        box = self.variables.get(variable_name)
-        if box is not None:
-            return box
+        self.slots[slot] = box
 
-        if self.previous is not None:
-            return self.previous.get_variable(variable_name)
-        else:
-            raise Exception("Variable " + variable_name + " does not exist")
+    def set_variable(self, slot, box):
+        self.slots[slot] = box
 
-    def previous_scope(self):
-        return self.previous
\ No newline at end of file
+    def get_variable(self, slot):
+        return self.slots[slot]
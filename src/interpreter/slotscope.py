@@ -0,0 +1,36 @@
+class SlotScope():
+    def __init__(self, old_scope=None):
+        self.variables = {}
+        self.previous = old_scope
+
+        if old_scope is None:
+            self.next_slot = 0
+            self.frame_size = [0]
+        else:
+            self.next_slot = old_scope.next_slot
+            self.frame_size = old_scope.frame_size
+
+    def add_variable(self, name, variable_type):
+        if self.variables.get(name) is not None:
+            raise Exception("Variable of name " + name + " already exists")
+
+        slot = self.next_slot
+        self.next_slot += 1
+        if self.next_slot > self.frame_size[0]:
+            self.frame_size[0] = self.next_slot
+
+        self.variables[name] = (slot, variable_type)
+        return slot
+
+    def get_variable(self, name):
+        scope = self
+        while scope is not None:
+            variable = scope.variables.get(name)
+            if variable is not None:
+                return variable
+            scope = scope.previous
+
+        return None
+
+    def get_frame_size(self):
+        return self.frame_size[0]
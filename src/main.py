@@ -1,26 +1,350 @@
+import StringIO
+import mmap
+import multiprocessing
 import os
 import sys
 
-from parser.parser import Parser
+from parser.ast import AST
+from parser.astcache import ASTCache
+from optimizer.optimizer import Optimizer
+from typechecker.typechecker import TypeChecker
 from interpreter.interpreter import Interpreter
+from interpreter.inputreader import InputReader
+from interpreter.outputwriter import OutputWriter, BUFFER_SIZE
+from interpreter.closurecompiler import ClosureCompiler
+from interpreter.bytecode.vm import VirtualMachine
+from interpreter.quantumfunctions import select_backend
+from quantum.simulator import Simulator, BACKENDS
+from quantum.sparsevector import SPARSE_BELOW, DENSE_ABOVE
+from quantum.shotrunner import ShotRunner
+from quantum.gatepool import GatePool, THREAD_THRESHOLD
 
 
-def run():
-    if len(sys.argv) == 1:
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureCompiler,
+    "vm": VirtualMachine
+}
+
+PARSERS = ("pyparsing", "pratt")
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "qinterpreter")
+
+
+def parse_text(argument, value):
+    return value
+
+
+def parse_count(argument, value):
+    if not value.isdigit():
+        raise Exception("Expected a non-negative integer for " + argument)
+    return int(value)
+
+
+def parse_positive(argument, value):
+    if not value.isdigit() or int(value) == 0:
+        raise Exception("Expected a positive integer for " + argument)
+    return int(value)
+
+
+def parse_fraction(argument, value):
+    try:
+        fraction = float(value)
+    except ValueError:
+        fraction = -1.0
+
+    if not 0.0 <= fraction <= 1.0:
+        raise Exception("Expected a fraction between 0 and 1 for " + argument)
+    return fraction
+
+
+def parse_choice(name, choices, expected):
+    def parse(argument, value):
+        if value not in choices:
+            raise Exception("Unknown " + name + " " + value + ", expected " + expected)
+        return value
+    return parse
+
+
+# every option as its name, the key it sets, how its value is parsed and
+# what the usage shows for it. flags have no value and set their key to
+# True, or to False for the --no- ones
+OPTIONS = [
+    ("--engine", "engine", parse_choice("engine", ENGINES, "one of " + str(sorted(ENGINES))), "ENGINE",
+     "tree, closure or vm"),
+    ("--parser", "parser", parse_choice("parser", PARSERS, "one of " + str(PARSERS)), "PARSER",
+     "pyparsing or pratt"),
+    ("--check-parser", "check_parser", None, None, "check that both parsers build the same tree and exit"),
+    ("--no-cache", "cache", None, None, "parse without the tree cache"),
+    ("--cache-dir", "cache_dir", parse_text, "DIR", "where parsed trees are cached"),
+    ("--no-optimize", "optimize", None, None, "run the tree as parsed"),
+    ("--opt-report", "opt_report", None, None, "print what the optimizer did"),
+    ("--no-typecheck", "typecheck", None, None, "skip the type checker"),
+    ("--dis", "dis", None, None, "print the bytecode of the vm"),
+    ("--memo-size", "memo_size", parse_count, "N", "calls of pure functions remembered, 0 for none"),
+    ("--memo-stats", "memo_stats", None, None, "print the hits and misses of the memo cache"),
+    ("--input", "input", parse_text, "FILE", "read the input from FILE instead of stdin"),
+    ("--mmap", "mmap", None, None, "map the --input file into memory"),
+    ("--output-buffer", "output_buffer", parse_count, "N", "bytes of output buffered, 0 for none"),
+    ("--seed", "seed", parse_count, "N", "makes measurements repeatable"),
+    ("--quantum-backend", "quantum_backend",
+     parse_choice("quantum backend", ("auto",) + BACKENDS, "auto or one of " + str(BACKENDS)), "BACKEND",
+     "auto, " + ", ".join(BACKENDS)),
+    ("--sparse-below", "sparse_below", parse_fraction, "F", "store groups sparsely below F nonzero amplitudes"),
+    ("--dense-above", "dense_above", parse_fraction, "F", "store groups densely above F nonzero amplitudes"),
+    ("--shots", "shots", parse_positive, "N", "run N times and count the outputs"),
+    ("--workers", "workers", parse_positive, "N", "processes shots are run on"),
+    ("--state-dir", "state_dir", parse_text, "DIR", "keep large state vectors in files in DIR"),
+    ("--chunk-size", "chunk_size", parse_count, "N", "amplitudes of the files read at a time"),
+    ("--io-stats", "io_stats", None, None, "print the chunks read and written"),
+    ("--threads", "threads", parse_positive, "N", "threads gates on large state vectors are split between"),
+    ("--thread-threshold", "thread_threshold", parse_count, "N", "amplitudes from which gates are split up"),
+    ("--help", "help", None, None, "print this and exit")
+]
+
+
+def get_defaults():
+    return {
+        "engine": "tree",
+        "parser": "pyparsing",
+        "check_parser": False,
+        "cache": True,
+        "cache_dir": CACHE_DIR,
+        "optimize": True,
+        "opt_report": False,
+        "typecheck": True,
+        "dis": False,
+        "memo_size": 10000,
+        "memo_stats": False,
+        "input": None,
+        "mmap": False,
+        "output_buffer": BUFFER_SIZE,
+        "seed": None,
+        "quantum_backend": "auto",
+        "sparse_below": SPARSE_BELOW,
+        "dense_above": DENSE_ABOVE,
+        "shots": None,
+        "workers": multiprocessing.cpu_count(),
+        "state_dir": None,
+        "chunk_size": None,
+        "io_stats": False,
+        "threads": multiprocessing.cpu_count(),
+        "thread_threshold": THREAD_THRESHOLD,
+        "help": False,
+        "file": None
+    }
+
+
+def get_usage():
+    defaults = get_defaults()
+    lines = ["usage: qInterpreter.py [options] FILE", "", "options:"]
+    for name, key, parse, value, text in OPTIONS:
+        if value is not None:
+            name += " " + value
+            if defaults[key] is not None:
+                text += " (default " + str(defaults[key]) + ")"
+        lines.append("  " + name.ljust(24) + " " + text)
+    return "\n".join(lines)
+
+
+def parse_arguments(arguments):
+    options = get_defaults()
+    known = dict((option[0], option) for option in OPTIONS)
+
+    i = 0
+    while i < len(arguments):
+        argument = arguments[i]
+
+        if argument in known:
+            name, key, parse, value, text = known[argument]
+            if parse is None:
+                options[key] = not name.startswith("--no-")
+            else:
+                if i + 1 == len(arguments):
+                    raise Exception("Missing value for " + argument)
+                i += 1
+                options[key] = parse(argument, arguments[i])
+        elif argument.startswith("--"):
+            raise Exception("Unknown option " + argument)
+        elif options["file"] is None:
+            options["file"] = argument
+        else:
+            raise Exception("Too many command line arguments")
+
+        i += 1
+
+    if options["help"]:
+        return options
+
+    if options["file"] is None:
         raise Exception("Missing input file")
 
-    if len(sys.argv) > 2:
-        raise Exception("Too many command line arguments")
+    if options["mmap"] and options["input"] is None:
+        raise Exception("--mmap needs an --input file")
+
+    if (options["chunk_size"] is not None or options["io_stats"]) and options["state_dir"] is None:
+        raise Exception("--chunk-size and --io-stats need a --state-dir")
+
+    if options["sparse_below"] > options["dense_above"]:
+        raise Exception("--sparse-below cannot be above --dense-above")
+
+    return options
+
+
+def load_ast(data_file, options):
+    cache = None
+    key = None
+    if options["cache"]:
+        cache = ASTCache(options["cache_dir"])
+        key = cache.get_key(data_file)
+
+    if key is not None:
+        program = cache.load(key)
+        if program is not None:
+            ast = AST()
+            ast.program = program
+            return ast
+
+    # the parser, and pyparsing with it, is only imported on a cache miss
+    from parser.parser import Parser
+
+    p = Parser(backend=options["parser"])
+    p.parse_file(data_file)
+
+    if key is not None:
+        cache.save(key, p.get_ast().program)
 
-    if len(sys.argv) == 2:
-        data_file = sys.argv[1]
+    return p.get_ast()
+
+
+def open_reader(options, writer):
+    if options["input"] is None:
+        return InputReader(flush=writer.flush)
+
+    if not os.path.isfile(options["input"]):
+        raise Exception(options["input"] + " does not exist")
+
+    input_file = open(options["input"], "rb")
+    if options["mmap"] and os.path.getsize(options["input"]) > 0:
+        # empty files cannot be mapped, they are read like any other
+        return InputReader(mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ).read, flush=writer.flush)
+    return InputReader(input_file.read, flush=writer.flush)
+
+
+def read_input(options):
+    if options["input"] is None:
+        return sys.stdin.read()
+
+    if not os.path.isfile(options["input"]):
+        raise Exception(options["input"] + " does not exist")
+
+    with open(options["input"], "rb") as input_file:
+        return input_file.read()
+
+
+def create_storage(options):
+    if options["state_dir"] is None:
+        return None
+
+    # numpy comes with the storage, so it is only imported when asked for
+    from quantum.mappedstorage import MappedStorage
+    return MappedStorage(options["state_dir"], options["chunk_size"])
+
+
+def create_simulator(options, backend, seed, storage):
+    return Simulator(seed=seed, backend=backend, sparse_below=options["sparse_below"],
+                     dense_above=options["dense_above"], storage=storage,
+                     gate_pool=GatePool(options["threads"], options["thread_threshold"]))
+
+
+def create_engine(ast, options, reader, writer, simulator):
+    if options["engine"] == "tree":
+        return Interpreter(ast, memo_size=options["memo_size"], typed=options["typecheck"], reader=reader,
+                           writer=writer, simulator=simulator)
+    return ENGINES[options["engine"]](ast, memo_size=options["memo_size"], reader=reader, writer=writer,
+                                      simulator=simulator)
+
+
+def run_shots(ast, options, backend, storage):
+    # every shot reads the same input, so it is read once up front, where
+    # forked workers share it
+    data = read_input(options) if "read" in ast.get_called_functions() else ""
+
+    def run_shot(simulator):
+        position = [0]
+
+        def read(size):
+            chunk = data[position[0]:position[0] + size]
+            position[0] += len(chunk)
+            return chunk
+
+        output = StringIO.StringIO()
+        writer = OutputWriter(stream=output, buffer_size=options["output_buffer"])
+        create_engine(ast, options, InputReader(read, flush=writer.flush), writer, simulator).interpret()
+        return output.getvalue()
+
+    runner = ShotRunner(run_shot, lambda seed: create_simulator(options, backend, seed, storage), options["shots"],
+                        seed=options["seed"], workers=options["workers"])
+    histogram = runner.run()
+
+    # the most frequent outputs first, each on one line after its count
+    writer = OutputWriter(buffer_size=options["output_buffer"])
+    for output, count in sorted(histogram.iteritems(), key=lambda item: (-item[1], item[0])):
+        writer.write(str(count) + " " + " ".join(output.splitlines()) + "\n")
+    writer.flush()
+
+
+def run():
+    options = parse_arguments(sys.argv[1:])
+    if options["help"]:
+        print get_usage()
+        return
+
+    data_file = options["file"]
 
     if not os.path.isfile(data_file):
         raise Exception(data_file + " does not exist")
 
-    p = Parser()
-    p.parse_file(data_file)
-    ast = p.get_ast()
+    if options["check_parser"]:
+        from parser.paritychecker import ParityChecker
+
+        functions = ParityChecker().check(data_file)
+        print "Parsers agree on " + str(functions) + " functions"
+        return
+
+    ast = load_ast(data_file, options)
+
+    if options["optimize"]:
+        optimizer = Optimizer()
+        optimizer.optimize(ast)
+
+        if options["opt_report"]:
+            for change in optimizer.get_report():
+                sys.stderr.write(change + "\n")
+
+    # checked after optimizing so the annotations land on the final tree
+    if options["typecheck"]:
+        TypeChecker().check(ast.program)
+
+    if options["dis"]:
+        print VirtualMachine(ast).disassemble()
+        return
+
+    backend = options["quantum_backend"]
+    if backend == "auto":
+        backend = select_backend(ast)
+
+    storage = create_storage(options)
+    if options["shots"] is not None:
+        run_shots(ast, options, backend, storage)
+    else:
+        writer = OutputWriter(buffer_size=options["output_buffer"])
+        reader = open_reader(options, writer)
+        i = create_engine(ast, options, reader, writer, create_simulator(options, backend, options["seed"], storage))
+        i.interpret()
+
+        if options["memo_stats"] and i.get_memo() is not None:
+            sys.stderr.write(str(i.get_memo()) + "\n")
 
-    i = Interpreter(ast)
-    i.interpret()
+    if options["io_stats"]:
+        sys.stderr.write(str(storage) + "\n")
@@ -0,0 +1,410 @@
+from ..parser.nodes.arithmeticnode import ArithmeticNode
+from ..parser.nodes.assignnode import AssignNode
+from ..parser.nodes.boolnode import BoolNode
+from ..parser.nodes.callnode import CallNode
+from ..parser.nodes.compoundnode import CompoundNode
+from ..parser.nodes.conditionnode import ConditionNode
+from ..parser.nodes.functionnode import FunctionNode
+from ..parser.nodes.ifnode import IfNode
+from ..parser.nodes.indexnode import IndexNode
+from ..parser.nodes.intnode import IntNode
+from ..parser.nodes.logicnode import LogicNode
+from ..parser.nodes.newvariablenode import NewVariableNode
+from ..parser.nodes.notnode import NotNode
+from ..parser.nodes.returnnode import ReturnNode
+from ..parser.nodes.statementsnode import StatementsNode
+from ..parser.nodes.variablenode import VariableNode
+from ..parser.nodes.whilenode import WhileNode
+from ..parser.types.arraytype import ArrayType
+from ..parser.types.qubittype import QubitType
+
+
+ARITHMETIC = {
+    "+": lambda l, r: l + r,
+    "-": lambda l, r: l - r,
+    "*": lambda l, r: l * r,
+    "/": lambda l, r: l / r,
+    "%": lambda l, r: l % r
+}
+
+COMPARISON = {
+    "<": lambda l, r: l < r,
+    "<=": lambda l, r: l <= r,
+    ">": lambda l, r: l > r,
+    ">=": lambda l, r: l >= r,
+    "==": lambda l, r: l == r
+}
+
+LOGIC = {
+    "&&": lambda l, r: l and r,
+    "||": lambda l, r: l or r
+}
+
+
+class Optimizer():
+    def __init__(self, debug=0):
+        self.debug = debug
+        self.report = []
+        self.function_names = set()
+        self.function_name = None
+        self.scopes = []
+        self.optimizers = {
+            "ArithmeticNode": self.__arithmetic,
+            "AssignNode": self.__assign,
+            "BoolNode": self.__nothing,
+            "CallNode": self.__call,
+            "CompoundNode": self.__compound,
+            "ConditionNode": self.__condition,
+            "IfNode": self.__if,
+            "IndexNode": self.__index,
+            "IntNode": self.__nothing,
+            "LogicNode": self.__logic,
+            "NewVariableNode": self.__new_variable,
+            "NotNode": self.__not,
+            "ReturnNode": self.__return,
+            "StatementsNode": self.__statements,
+            "StringNode": self.__nothing,
+            "VariableNode": self.__nothing,
+            "WhileNode": self.__while
+        }
+
+    def optimize(self, ast):
+        self.function_names = set(function.get_function_name() for function in ast.program)
+        for i in range(len(ast.program)):
+            ast.program[i] = self.optimize_function(ast.program[i])
+
+    def optimize_function(self, node):
+        self.function_name = node.get_function_name_with_params()
+        self.scopes = [{}]
+
+        for param in node.get_params().get_params():
+            self.scopes[-1][param.get_variable_name().get_value()] = param.get_type()
+
+        statements = self.__optimize(node.get_statements())
+        if statements is node.get_statements():
+            return node
+        return FunctionNode(node.name, node.get_params(), statements, node.get_return_type())
+
+    def get_report(self):
+        return self.report
+
+    def __optimize(self, node):
+        optimizer = self.optimizers.get(node.__class__.__name__)
+        if optimizer is None:
+            raise Exception(node.__class__.__name__ + " is an unrecognized type")
+        return optimizer(node)
+
+    def __statement(self, node):
+        # statements that are removed outright leave an empty block behind
+        # where the grammar needs a statement
+        optimized = self.__optimize(node)
+        if optimized is None:
+            return CompoundNode(StatementsNode([]))
+        return optimized
+
+    def __record(self, message):
+        if self.debug > 0:
+            print "Optimizer:", message
+        self.report.append(self.function_name + ": " + message)
+
+    def __fold(self, node, start, value):
+        # the folds recorded for the operands are part of this one
+        del self.report[start:]
+
+        if isinstance(value, bool):
+            folded = BoolNode(value)
+        else:
+            folded = IntNode(value)
+
+        self.__record("folded " + self.__describe(node) + " into " + self.__describe(folded))
+        return folded
+
+    def __is_int(self, node):
+        # only expressions already known to be ints may be replaced by an
+        # operand, anything else must still fail the runtime int check
+        if isinstance(node, (IntNode, ArithmeticNode)):
+            return True
+        if node.__class__.__name__ == "VariableNode":
+            return str(self.__lookup(node.get_value())) == "int"
+        return False
+
+    def __lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    @staticmethod
+    def __is_constant(node, value):
+        return isinstance(node, IntNode) and node.get_value() == value
+
+    def __nothing(self, node):
+        return node
+
+    def __arithmetic(self, node):
+        start = len(self.report)
+        op = node.get_arithmetic_operation()
+        left = self.__optimize(node.get_left_expression())
+        right = self.__optimize(node.get_right_expression())
+
+        if isinstance(left, IntNode) and isinstance(right, IntNode):
+            if op not in ("/", "%") or right.get_value() != 0:
+                return self.__fold(node, start, ARITHMETIC[op](left.get_value(), right.get_value()))
+
+        simplified = None
+        if op == "+" and self.__is_constant(left, 0) and self.__is_int(right):
+            simplified = right
+        elif op in ("+", "-") and self.__is_constant(right, 0) and self.__is_int(left):
+            simplified = left
+        elif op == "*" and self.__is_constant(left, 1) and self.__is_int(right):
+            simplified = right
+        elif op in ("*", "/") and self.__is_constant(right, 1) and self.__is_int(left):
+            simplified = left
+
+        if simplified is not None:
+            del self.report[start:]
+            self.__record("simplified " + self.__describe(node) + " into " + self.__describe(simplified))
+            return simplified
+
+        if left is node.get_left_expression() and right is node.get_right_expression():
+            return node
+        return ArithmeticNode(op, left, right)
+
+    def __assign(self, node):
+        left = self.__optimize(node.get_left())
+        right = self.__optimize(node.get_right())
+
+        if left is node.get_left() and right is node.get_right():
+            return node
+        return AssignNode(left, right)
+
+    def __call(self, node):
+        params = [self.__optimize(param) for param in node.get_params()]
+
+        if all(params[i] is node.get_params()[i] for i in range(len(params))):
+            return node
+        return CallNode(node.get_function_name(), params)
+
+    def __compound(self, node):
+        self.scopes.append({})
+        statements = self.__optimize(node.get_statements())
+        self.scopes.pop()
+
+        if statements is node.get_statements():
+            return node
+        return CompoundNode(statements)
+
+    def __condition(self, node):
+        start = len(self.report)
+        comparison = node.get_comparison()
+        left = self.__optimize(node.get_left_expression())
+        right = self.__optimize(node.get_right_expression())
+
+        if isinstance(left, IntNode) and isinstance(right, IntNode):
+            return self.__fold(node, start, COMPARISON[comparison](left.get_value(), right.get_value()))
+
+        if left is node.get_left_expression() and right is node.get_right_expression():
+            return node
+        return ConditionNode(comparison, left, right)
+
+    def __if(self, node):
+        condition = self.__optimize(node.get_condition())
+        true_expr = self.__statement(node.get_true_expression())
+
+        false_expr = node.get_false_expression()
+        if false_expr is not None:
+            false_expr = self.__statement(false_expr)
+
+        # a declaration in a dropped branch still declares its variable for
+        # the resolver, so those branches are left alone
+        if isinstance(condition, BoolNode):
+            if condition.get_value() and not isinstance(false_expr, NewVariableNode):
+                self.__record("removed if statement with constant true condition")
+                return true_expr
+            elif not condition.get_value() and not isinstance(true_expr, NewVariableNode):
+                self.__record("removed if statement with constant false condition")
+                return false_expr
+
+        if condition is node.get_condition() and true_expr is node.get_true_expression() and \
+                false_expr is node.get_false_expression():
+            return node
+        return IfNode(condition, true_expr, false_expr)
+
+    def __index(self, node):
+        index = self.__optimize(node.get_index())
+
+        if index is node.get_index():
+            return node
+        return IndexNode(node.get_name(), index)
+
+    def __logic(self, node):
+        start = len(self.report)
+        logic = node.get_logic_operation()
+        left = self.__optimize(node.get_left_expression())
+        right = self.__optimize(node.get_right_expression())
+
+        if isinstance(left, BoolNode) and isinstance(right, BoolNode):
+            return self.__fold(node, start, LOGIC[logic](left.get_value(), right.get_value()))
+
+        if left is node.get_left_expression() and right is node.get_right_expression():
+            return node
+        return LogicNode(logic, left, right)
+
+    def __new_variable(self, node):
+        node_type = node.get_type()
+        self.scopes[-1][node.get_variable_name().get_value()] = node_type
+
+        if not isinstance(node_type, ArrayType) or isinstance(node_type.get_size(), int):
+            return node
+
+        size = self.__optimize(node_type.get_size())
+        if size is node_type.get_size():
+            return node
+        return NewVariableNode(node.get_variable_name(), ArrayType(node_type.get_type(), size))
+
+    def __not(self, node):
+        start = len(self.report)
+        expression = self.__optimize(node.get_expression())
+
+        if isinstance(expression, BoolNode):
+            return self.__fold(node, start, not expression.get_value())
+
+        if expression is node.get_expression():
+            return node
+        return NotNode(expression)
+
+    def __return(self, node):
+        if node.get_return_value() is None:
+            return node
+
+        return_value = self.__optimize(node.get_return_value())
+        if return_value is node.get_return_value():
+            return node
+        return ReturnNode(return_value)
+
+    def __statements(self, node):
+        changed = False
+        statements = []
+        for statement in node.get_statements():
+            optimized = self.__optimize(statement)
+            changed = changed or optimized is not statement
+            if optimized is None:
+                continue
+
+            replacement = None
+            if statements and isinstance(optimized, WhileNode):
+                replacement = self.__hadamard_loop(statements[-1], optimized)
+
+            if replacement is not None:
+                statements.extend(replacement)
+                changed = True
+            else:
+                statements.append(optimized)
+
+        if not changed:
+            return node
+
+        new_node = StatementsNode([])
+        new_node.set_statements(statements)
+        return new_node
+
+    def __while(self, node):
+        condition = self.__optimize(node.get_condition())
+        expression = self.__statement(node.get_expression())
+
+        if isinstance(condition, BoolNode) and not condition.get_value() and \
+                not isinstance(expression, NewVariableNode):
+            self.__record("removed while loop with constant false condition")
+            return None
+
+        if condition is node.get_condition() and expression is node.get_expression():
+            return node
+        return WhileNode(condition, expression)
+
+    def __hadamard_loop(self, start, node):
+        # i = 0; while (i < n) { hadamard(q[i]); i = i + 1; } where q is an
+        # array of n qubits applies hadamard to all of q, which is one
+        # transform of the whole array. the counter is left as the loop
+        # would have left it
+        if not isinstance(start, AssignNode) or not self.__is_constant(start.get_right(), 0):
+            return None
+        counter = start.get_left()
+        if counter.__class__.__name__ != "VariableNode" or not self.__is_int(counter):
+            return None
+        name = counter.get_value()
+
+        condition = node.get_condition()
+        if not isinstance(condition, ConditionNode) or condition.get_comparison() != "<" or \
+                not self.__is_variable(condition.get_left_expression(), name) or \
+                not isinstance(condition.get_right_expression(), IntNode):
+            return None
+        size = condition.get_right_expression().get_value()
+
+        body = node.get_expression()
+        if not isinstance(body, CompoundNode) or len(body.get_statements().get_statements()) != 2:
+            return None
+        call, step = body.get_statements().get_statements()
+
+        if not isinstance(call, CallNode) or call.get_function_name().get_value() != "hadamard" or \
+                "hadamard" in self.function_names or len(call.get_params()) != 1:
+            return None
+        element = call.get_params()[0]
+        if not isinstance(element, IndexNode) or element.get_name().__class__.__name__ != "VariableNode" or \
+                not self.__is_variable(element.get_index(), name):
+            return None
+        array = element.get_name().get_value()
+        array_type = self.__lookup(array)
+        if not isinstance(array_type, ArrayType) or not isinstance(array_type.get_type(), QubitType):
+            return None
+        array_size = array_type.get_size()
+        if isinstance(array_size, IntNode):
+            array_size = array_size.get_value()
+        if array_size != size:
+            return None
+
+        if not isinstance(step, AssignNode) or not self.__is_variable(step.get_left(), name):
+            return None
+        increment = step.get_right()
+        if not isinstance(increment, ArithmeticNode) or increment.get_arithmetic_operation() != "+" or \
+                not self.__is_variable(increment.get_left_expression(), name) or \
+                not self.__is_constant(increment.get_right_expression(), 1):
+            return None
+
+        self.__record("replaced loop applying hadamard to every element of " + array + " with hadamard(" +
+                      array + ")")
+        return [CallNode(call.get_function_name(), [VariableNode(array)]),
+                AssignNode(VariableNode(name), IntNode(size))]
+
+    @staticmethod
+    def __is_variable(node, name):
+        return node.__class__.__name__ == "VariableNode" and node.get_value() == name
+
+    def __describe(self, node):
+        node_type = node.__class__.__name__
+
+        if node_type in ("IntNode", "VariableNode"):
+            return str(node.get_value())
+        elif node_type == "BoolNode":
+            return str(node.get_value()).lower()
+        elif node_type == "StringNode":
+            return '"' + node.get_value() + '"'
+        elif node_type == "IndexNode":
+            return self.__describe(node.get_name()) + "[" + self.__describe(node.get_index()) + "]"
+        elif node_type == "NotNode":
+            return "!" + self.__describe(node.get_expression())
+        elif node_type == "CallNode":
+            return self.__describe(node.get_function_name()) + \
+                "(" + ", ".join(self.__describe(param) for param in node.get_params()) + ")"
+        elif node_type == "ArithmeticNode":
+            op = node.get_arithmetic_operation()
+        elif node_type == "ConditionNode":
+            op = node.get_comparison()
+        elif node_type == "LogicNode":
+            op = node.get_logic_operation()
+        elif node_type == "AssignNode":
+            return self.__describe(node.get_left()) + " = " + self.__describe(node.get_right())
+        else:
+            return node_type
+
+        return "(" + self.__describe(node.get_left_expression()) + " " + op + " " + \
+            self.__describe(node.get_right_expression()) + ")"
@@ -1,11 +1,15 @@
+from types.Type import Type
 from types.inttype import IntType
 from types.booltype import BoolType
+from types.qubittype import QubitType
 from types.voidtype import VoidType
 from types.arraytype import ArrayType
 
+from nodes.node import Node
 from nodes.arithmeticnode import ArithmeticNode
 from nodes.assignnode import AssignNode
 from nodes.boolnode import BoolNode
+from nodes.stringnode import StringNode
 from nodes.callnode import CallNode
 from nodes.compoundnode import CompoundNode
 from nodes.conditionnode import ConditionNode
@@ -29,6 +33,22 @@ class AST:
         self.debug = debug_level
         self.program = []
 
+    def get_called_functions(self):
+        # the names of every function called anywhere in the program,
+        # built in or not
+        function_names = set()
+        pending = list(self.program)
+        while pending:
+            node = pending.pop()
+            if isinstance(node, (list, tuple)):
+                pending.extend(node)
+            elif isinstance(node, (Node, Type)):
+                if node.__class__.__name__ == "CallNode":
+                    function_names.add(node.get_function_name().get_value())
+                pending.extend(vars(node).values())
+
+        return function_names
+
     def parse_word(self, text, loc, args):
 
         if self.debug > 0:
@@ -50,6 +70,13 @@ class AST:
 
         return [BoolNode(args[0])]
 
+    def parse_string(self, text, loc, args):
+
+        if self.debug > 0:
+            print "String:", args
+
+        return [StringNode(args[0])]
+
     def parse_type(self, text, loc, args):
 
         if self.debug > 0:
@@ -60,6 +87,8 @@ class AST:
             return [IntType()]
         elif arg_type == "bool":
             return [BoolType()]
+        elif arg_type == "qubit":
+            return [QubitType()]
         elif arg_type == "void":
             return [VoidType()]
         else:
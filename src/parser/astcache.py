@@ -0,0 +1,168 @@
+import cPickle
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from nodes.functionnode import FunctionNode
+
+
+CACHE_VERSION = 1
+
+INCLUDE_PATTERN = re.compile(r'#include\s*"\s*([A-Za-z0-9.]+)\s*"')
+COMMENT_PATTERN = re.compile(r"/\*(?:[^*]|\*(?!/))*\*/")
+
+PARSER_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class ASTCache():
+    def __init__(self, cache_dir, max_size=64 * 1024 * 1024, max_age=30 * 24 * 60 * 60, debug=0):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.debug = debug
+        self.fingerprint = None
+
+    def get_key(self, data_file):
+        # the key covers every transitively included file and the parser
+        # package itself, so editing either one misses the cache.
+        # includes are found by a scan rather than a parse, anything the
+        # scan cannot read makes the program uncacheable
+        digest = hashlib.sha1(str(CACHE_VERSION) + self.__get_fingerprint())
+
+        pending = [data_file]
+        seen = set()
+        while pending:
+            filename = pending.pop(0)
+            if filename in seen:
+                continue
+            seen.add(filename)
+
+            try:
+                with open(filename, "rb") as f:
+                    text = f.read()
+            except IOError:
+                return None
+
+            digest.update(filename + "\0" + hashlib.sha1(text).hexdigest() + "\0")
+            pending.extend(INCLUDE_PATTERN.findall(COMMENT_PATTERN.sub("", text)))
+
+        return digest.hexdigest()
+
+    def load(self, key):
+        path = self.__get_path(key)
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                raise Exception("Cache entry expired")
+
+            with open(path, "rb") as f:
+                entry = cPickle.load(f)
+
+            if entry.get("version") != CACHE_VERSION or entry.get("key") != key:
+                raise Exception("Cache entry does not match its key")
+
+            program = entry.get("program")
+            if not isinstance(program, list) or not all(isinstance(function, FunctionNode) for function in program):
+                raise Exception("Cache entry is not a program")
+        except Exception as e:
+            if self.debug > 0:
+                print "Dropping cache entry", path + ":", e
+            self.__remove(path)
+            return None
+
+        # entries age from their last use, not from when they were written
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return program
+
+    def save(self, key, program):
+        entry = {
+            "version": CACHE_VERSION,
+            "key": key,
+            "program": program
+        }
+
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+
+            data = cPickle.dumps(entry, cPickle.HIGHEST_PROTOCOL)
+        except (OSError, RuntimeError, TypeError, cPickle.PicklingError) as e:
+            # an unwritable directory or a program nested too deeply to
+            # pickle only costs the next run a parse
+            if self.debug > 0:
+                print "Not caching program:", e
+            return
+
+        # write then rename so concurrent runs never read a partial entry
+        temp_path = None
+        try:
+            handle, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(handle, "wb") as f:
+                f.write(data)
+            os.rename(temp_path, self.__get_path(key))
+        except (IOError, OSError):
+            if temp_path is not None:
+                self.__remove(temp_path)
+            return
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".ast"):
+                continue
+
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            if now - stat.st_mtime > self.max_age:
+                self.__remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        # oldest entries go first until the directory fits again
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            self.__remove(path)
+            total -= size
+
+    def __get_fingerprint(self):
+        if self.fingerprint is None:
+            # every module of the parser package, the parsers and lexer
+            # decide which nodes are built just as the node classes do
+            digest = hashlib.sha1()
+            for directory, subdirectories, names in os.walk(PARSER_DIRECTORY):
+                subdirectories.sort()
+                for name in sorted(names):
+                    if name.endswith(".py"):
+                        path = os.path.join(directory, name)
+                        with open(path, "rb") as f:
+                            digest.update(os.path.relpath(path, PARSER_DIRECTORY) + "\0" + f.read())
+            self.fingerprint = digest.hexdigest()
+        return self.fingerprint
+
+    def __get_path(self, key):
+        return os.path.join(self.cache_dir, key + ".ast")
+
+    @staticmethod
+    def __remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
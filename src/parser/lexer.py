@@ -0,0 +1,42 @@
+import re
+
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<skip>\s+|/\*(?:[^*]|\*(?!/))*\*/)
+  | (?P<include>\#include(?![A-Za-z0-9_$]))
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<int>\d+)
+  | (?P<string>"[^"]*")
+  | (?P<op>==|!=|<=|>=|\+=|-=|\*=|/=|&&|\|\||[-+*/%<>=!()\[\]{};,])
+""", re.VERBOSE)
+
+
+class Lexer():
+    def __init__(self, text):
+        self.text = text
+
+    def tokenize(self):
+        # tokens are (kind, value, start, end), end positions let the parser
+        # tell "-1" apart from "- 1" the way the pyparsing grammar does
+        tokens = []
+        text = self.text
+        position = 0
+        match = TOKEN_PATTERN.match
+
+        while position < len(text):
+            token = match(text, position)
+            if token is None:
+                raise Exception("Unexpected character " + repr(text[position]) + " " + self.location(position))
+
+            kind = token.lastgroup
+            if kind != "skip":
+                tokens.append((kind, token.group(kind), position, token.end()))
+            position = token.end()
+
+        tokens.append(("eof", None, position, position))
+        return tokens
+
+    def location(self, position):
+        line = self.text.count("\n", 0, position) + 1
+        column = position - self.text.rfind("\n", 0, position)
+        return "(at char " + str(position) + "), (line:" + str(line) + ", col:" + str(column) + ")"
@@ -3,7 +3,8 @@ from node import Node
 
 class BoolNode(Node):
     def __init__(self, value):
-        self.value = bool(value)
+        # the parser passes the literal's text, and bool("false") is True
+        self.value = value is True or value == "true"
         self.type = BoolType()
 
     def get_value(self):
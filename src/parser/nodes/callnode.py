@@ -5,9 +5,23 @@ class CallNode(Node):
     def __init__(self, function_name, params):
         self.function_name = function_name
         self.params = params
+        self.inline_cache = None
+        self.resolved_name = None
 
     def get_function_name(self):
         return self.function_name
 
     def get_params(self):
-        return self.params
\ No newline at end of file
+        return self.params
+
+    def set_inline_cache(self, inline_cache):
+        self.inline_cache = inline_cache
+
+    def get_inline_cache(self):
+        return self.inline_cache
+
+    def set_resolved_name(self, resolved_name):
+        self.resolved_name = resolved_name
+
+    def get_resolved_name(self):
+        return self.resolved_name
@@ -4,6 +4,13 @@ class CompoundNode(Node):
 
     def __init__(self, statements):
         self.statements = statements
+        self.scope_size = 0
 
     def get_statements(self):
-        return self.statements
\ No newline at end of file
+        return self.statements
+
+    def set_scope_size(self, scope_size):
+        self.scope_size = scope_size
+
+    def get_scope_size(self):
+        return self.scope_size
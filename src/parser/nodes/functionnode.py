@@ -7,6 +7,7 @@ class FunctionNode(Node):
         self.params = params
         self.statements = statements
         self.return_type = return_type
+        self.scope_size = 0
 
     def get_function_name(self):
         return self.name.get_value()
@@ -21,4 +22,10 @@ class FunctionNode(Node):
         return self.statements
 
     def get_params(self):
-        return self.params
\ No newline at end of file
+        return self.params
+
+    def set_scope_size(self, scope_size):
+        self.scope_size = scope_size
+
+    def get_scope_size(self):
+        return self.scope_size
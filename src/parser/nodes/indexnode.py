@@ -7,7 +7,7 @@ class IndexNode(Node):
         self.type = None
 
     def set_type(self, new_type):
-        if self.type is None:
+        if self.type is not None and self.type != new_type:
             raise Exception("Already typed")
 
         self.type = new_type
@@ -5,6 +5,7 @@ class NewVariableNode(Node):
     def __init__(self, variable_name, new_type):
         self.variable_name = variable_name
         self.type = new_type
+        self.slot = None
 
     def get_type(self):
         return self.type
@@ -12,3 +13,9 @@ class NewVariableNode(Node):
     def get_variable_name(self):
         return self.variable_name
 
+    def set_slot(self, slot):
+        self.slot = slot
+
+    def get_slot(self):
+        return self.slot
+
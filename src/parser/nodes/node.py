@@ -1,3 +1,8 @@
 class Node:
+    type = None
+
     def get_type(self):
-        return self.type
\ No newline at end of file
+        return self.type
+
+    def set_type(self, type):
+        self.type = type
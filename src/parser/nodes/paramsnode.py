@@ -3,7 +3,7 @@ from node import Node
 class ParamsNode(Node):
 
     def __init__(self, param_list):
-        self.param_list = param_list
+        self.param_list = list(param_list)
 
     def __str__(self):
         param_str = ""
@@ -8,4 +8,7 @@ class StatementsNode(Node):
             self.statements.append(statement[0])
 
     def get_statements(self):
-        return self.statements
\ No newline at end of file
+        return self.statements
+
+    def set_statements(self, statements):
+        self.statements = statements
@@ -0,0 +1,10 @@
+from node import Node
+from ..types.stringtype import StringType
+
+class StringNode(Node):
+    def __init__(self, value):
+        self.value = str(value)
+        self.type = StringType()
+
+    def get_value(self):
+        return self.value
\ No newline at end of file
@@ -4,12 +4,24 @@ class VariableNode(Node):
     def __init__(self, value):
         self.value = value
         self.type = None
+        self.depth = None
+        self.slot = None
 
     def set_type(self, type):
-        if self.type is None:
+        if self.type is not None and self.type != type:
             raise Exception("Already typed")
 
         self.type = type
 
     def get_value(self):
         return self.value
+
+    def set_address(self, depth, slot):
+        self.depth = depth
+        self.slot = slot
+
+    def get_depth(self):
+        return self.depth
+
+    def get_slot(self):
+        return self.slot
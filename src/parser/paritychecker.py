@@ -0,0 +1,47 @@
+from parser import Parser
+from nodes.node import Node
+from types.Type import Type
+
+
+class ParityChecker():
+    def __init__(self, debug=0):
+        self.debug = debug
+
+    def check(self, data_file):
+        expected = Parser(self.debug, "pyparsing")
+        expected.parse_file(data_file)
+
+        actual = Parser(self.debug, "pratt")
+        actual.parse_file(data_file)
+
+        self.__compare(expected.get_ast().program, actual.get_ast().program, "program")
+        return len(expected.get_ast().program)
+
+    def __compare(self, expected, actual, path):
+        if isinstance(expected, (Node, Type)):
+            if expected.__class__ is not actual.__class__:
+                self.__fail(path, expected.__class__.__name__, actual.__class__.__name__)
+
+            fields = vars(expected)
+            if sorted(fields) != sorted(vars(actual)):
+                self.__fail(path, sorted(fields), sorted(vars(actual)))
+
+            for field in sorted(fields):
+                self.__compare(fields[field], vars(actual)[field], path + "." + field)
+        elif isinstance(expected, (str, int, long, bool, type(None))):
+            if type(expected) is not type(actual) or expected != actual:
+                self.__fail(path, repr(expected), repr(actual))
+        else:
+            # pyparsing leaves ParseResults where the other parser has lists
+            expected = list(expected)
+            actual = list(actual)
+            if len(expected) != len(actual):
+                self.__fail(path, str(len(expected)) + " items", str(len(actual)) + " items")
+
+            for i in range(len(expected)):
+                self.__compare(expected[i], actual[i], path + "[" + str(i) + "]")
+
+    @staticmethod
+    def __fail(path, expected, actual):
+        raise Exception("Parsers disagree at " + path + ": pyparsing built " + str(expected) +
+                        ", pratt built " + str(actual))
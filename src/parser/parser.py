@@ -1,12 +1,20 @@
 from pyparsing import *
 
 from ast import AST
+from prattparser import PrattParser
+
+
+BACKENDS = ("pyparsing", "pratt")
 
 
 class Parser():
 
-    def __init__(self, debug = 0):
+    def __init__(self, debug = 0, backend = "pyparsing"):
+        if backend not in BACKENDS:
+            raise Exception("Unknown parser backend " + backend + ", expected one of " + str(BACKENDS))
+
         self.debug = debug
+        self.backend = backend
         self.ast = AST(debug)
         self.files = []
 
@@ -21,6 +29,7 @@ class Parser():
 
         INT = Keyword("int")
         BOOL = Keyword("bool")
+        QUBIT = Keyword("qubit")
         WHILE = Keyword("while")
         IF = Keyword("if")
         ELSE = Keyword("else")
@@ -35,7 +44,8 @@ class Parser():
         filename = Word(alphanums + "." + alphanums)
         integer = (Regex(r"[+-]?\d+")).setParseAction(self.ast.parse_int)
         boolean = (TRUE | FALSE).setParseAction(self.ast.parse_bool)
-        types = (INT | BOOL).setParseAction(self.ast.parse_type)
+        string = QuotedString('"', multiline=True).setParseAction(self.ast.parse_string)
+        types = (INT | BOOL | QUBIT).setParseAction(self.ast.parse_type)
 
         statements = Forward()
         statement = Forward()
@@ -56,6 +66,7 @@ class Parser():
         factor << Group(
             integer
             | boolean
+            | string
             | (NOT + factor).setParseAction(self.ast.parse_not)
             | LPAR - expression - RPAR
             | (variable + Optional("(" + Optional(delimitedList(expression)) - ")")).setParseAction(self.ast.parse_call)
@@ -87,20 +98,34 @@ class Parser():
         if self.debug > 0:
             print "Include:", args
 
-        filename = args[1]
+        self.__include(args[1])
+
+    def __include(self, filename):
 
         if filename in self.files:
             raise Exception(filename + " has already been included")
 
-        self.files.append(filename)
         self.parse_file(filename)
 
     def parse_file(self, data_file):
-        self.files = self.files.append(data_file)
-        self.program.ignore(cStyleComment).parseFile(data_file, parseAll=True)
+        self.files.append(data_file)
+
+        if self.backend == "pratt":
+            with open(data_file) as f:
+                self.__parse_pratt(f.read())
+        else:
+            self.program.ignore(cStyleComment).parseFile(data_file, parseAll=True)
 
     def parse_text(self, text):
-        self.program.ignore(cStyleComment).parseString(text, parseAll=True)
+        if self.backend == "pratt":
+            self.__parse_pratt(text)
+        else:
+            self.program.ignore(cStyleComment).parseString(text, parseAll=True)
+
+    def __parse_pratt(self, text):
+        # included files are parsed by a parser of their own so the
+        # token stream of the including file is left untouched
+        PrattParser(self.ast, self.__include, self.debug).parse(text)
 
     def get_ast(self):
         return self.ast
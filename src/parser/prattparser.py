@@ -0,0 +1,336 @@
+from lexer import Lexer
+
+from types.inttype import IntType
+from types.booltype import BoolType
+from types.qubittype import QubitType
+from types.voidtype import VoidType
+from types.arraytype import ArrayType
+
+from nodes.arithmeticnode import ArithmeticNode
+from nodes.assignnode import AssignNode
+from nodes.boolnode import BoolNode
+from nodes.callnode import CallNode
+from nodes.compoundnode import CompoundNode
+from nodes.conditionnode import ConditionNode
+from nodes.functionnode import FunctionNode
+from nodes.ifnode import IfNode
+from nodes.indexnode import IndexNode
+from nodes.intnode import IntNode
+from nodes.logicnode import LogicNode
+from nodes.newvariablenode import NewVariableNode
+from nodes.notnode import NotNode
+from nodes.paramsnode import ParamsNode
+from nodes.returnnode import ReturnNode
+from nodes.statementsnode import StatementsNode
+from nodes.stringnode import StringNode
+from nodes.variablenode import VariableNode
+from nodes.whilenode import WhileNode
+
+
+RELATIONAL = 1
+ADDITIVE = 2
+MULTIPLICATIVE = 3
+
+BINDING_POWERS = {
+    "==": RELATIONAL,
+    "+=": RELATIONAL,
+    "-=": RELATIONAL,
+    "*=": RELATIONAL,
+    "/=": RELATIONAL,
+    "!=": RELATIONAL,
+    ">": RELATIONAL,
+    "<": RELATIONAL,
+    "<=": RELATIONAL,
+    ">=": RELATIONAL,
+    "=": RELATIONAL,
+    "+": ADDITIVE,
+    "-": ADDITIVE,
+    "||": ADDITIVE,
+    "*": MULTIPLICATIVE,
+    "/": MULTIPLICATIVE,
+    "%": MULTIPLICATIVE,
+    "&&": MULTIPLICATIVE
+}
+
+TYPES = {
+    "int": IntType,
+    "bool": BoolType,
+    "qubit": QubitType
+}
+
+IDENTIFIER_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_$"
+
+
+class PrattParser():
+    def __init__(self, ast, include, debug=0):
+        self.ast = ast
+        self.include = include
+        self.debug = debug
+        self.lexer = None
+        self.tokens = []
+        self.position = 0
+
+    def parse(self, text):
+        self.lexer = Lexer(text)
+        self.tokens = self.lexer.tokenize()
+        self.position = 0
+
+        while self.__peek()[0] == "include":
+            self.__include()
+
+        functions = []
+        while self.__peek()[0] != "eof":
+            functions.append(self.__function())
+
+        if self.debug > 0:
+            print "Program:", functions
+
+        self.ast.program.extend(functions)
+
+    def __peek(self, offset=0):
+        return self.tokens[self.position + offset]
+
+    def __advance(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def __check(self, value):
+        token = self.tokens[self.position]
+        return token[1] == value and token[0] in ("op", "name")
+
+    def __expect(self, value):
+        if not self.__check(value):
+            self.__fail("\"" + value + "\"")
+        return self.__advance()
+
+    def __fail(self, expected):
+        token = self.__peek()
+        found = "end of text" if token[0] == "eof" else "'" + token[1] + "'"
+        raise Exception("Expected " + expected + ", found " + found + "  " + self.lexer.location(token[2]))
+
+    def __include(self):
+        self.__advance()
+        token = self.__advance()
+        if token[0] != "string":
+            self.position -= 1
+            self.__fail("\"\\\"\"")
+
+        filename = token[1][1:-1].strip()
+        if not filename or filename.strip("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789."):
+            self.position -= 1
+            self.__fail("file name")
+
+        if self.debug > 0:
+            print "Include:", filename
+
+        self.include(filename)
+
+    def __type(self, allow_void=False):
+        token = self.__peek()
+        if token[0] == "name":
+            if token[1] in TYPES:
+                self.__advance()
+                return TYPES[token[1]]()
+            elif allow_void and token[1] == "void":
+                self.__advance()
+                return VoidType()
+
+        self.__fail("type")
+
+    def __name(self):
+        if self.__peek()[0] != "name":
+            self.__fail("name")
+        return VariableNode(self.__advance()[1])
+
+    def __variable(self):
+        variable = self.__name()
+        if self.__check("["):
+            self.__advance()
+            index = self.__expression()
+            self.__expect("]")
+            return IndexNode(variable, index)
+        return variable
+
+    def __declaration(self):
+        variable_type = self.__type()
+        variable = self.__variable()
+
+        if isinstance(variable, IndexNode):
+            return NewVariableNode(variable.get_name(), ArrayType(variable_type, variable.get_index()))
+        return NewVariableNode(variable, variable_type)
+
+    def __function(self):
+        return_type = self.__type(True)
+        name = self.__name()
+
+        self.__expect("(")
+        params = []
+        if not self.__check(")"):
+            params.append(self.__declaration())
+            while self.__check(","):
+                self.__advance()
+                params.append(self.__declaration())
+        self.__expect(")")
+
+        self.__expect("{")
+        statements = self.__statements()
+        self.__expect("}")
+
+        if self.debug > 0:
+            print "Function:", name.get_value()
+
+        return FunctionNode(name, ParamsNode(params), statements, return_type)
+
+    def __statements(self):
+        statements = []
+        while not self.__check("}") and self.__peek()[0] != "eof":
+            # StatementsNode unwraps the groups built by the pyparsing grammar
+            statements.append((self.__statement(),))
+        return StatementsNode(statements)
+
+    def __statement(self):
+        token = self.__peek()
+
+        if token[0] == "name":
+            if token[1] == "if":
+                return self.__if()
+            elif token[1] == "while":
+                return self.__while()
+            elif token[1] == "return":
+                return self.__return()
+            elif token[1] in TYPES:
+                declaration = self.__declaration()
+                self.__expect(";")
+                return declaration
+        elif token[1] == "{" and token[0] == "op":
+            self.__advance()
+            statements = self.__statements()
+            self.__expect("}")
+            return CompoundNode(statements)
+
+        expression = self.__expression()
+        self.__expect(";")
+        return expression
+
+    def __if(self):
+        self.__advance()
+        self.__expect("(")
+        condition = self.__expression()
+        self.__expect(")")
+        true_expr = self.__statement()
+
+        false_expr = None
+        if self.__check("else"):
+            self.__advance()
+            false_expr = self.__statement()
+
+        return IfNode(condition, true_expr, false_expr)
+
+    def __while(self):
+        self.__advance()
+        self.__expect("(")
+        condition = self.__expression()
+        self.__expect(")")
+        return WhileNode(condition, self.__statement())
+
+    def __return(self):
+        self.__advance()
+        if self.__check(";"):
+            self.__advance()
+            return ReturnNode(None)
+
+        value = self.__expression()
+        self.__expect(";")
+        return ReturnNode(value)
+
+    def __is_sign(self):
+        token = self.__peek()
+        return token[0] == "op" and token[1] in ("+", "-")
+
+    def __is_unary_sign(self):
+        # like the pyparsing keywords, a sign is only unary when it is not
+        # directly followed by an identifier character, "-1" is a literal
+        if not self.__is_sign():
+            return False
+
+        token = self.__peek()
+        text = self.lexer.text
+        return token[3] == len(text) or text[token[3]] not in IDENTIFIER_CHARS
+
+    def __expression(self, min_power=RELATIONAL):
+        if min_power <= ADDITIVE and self.__is_unary_sign():
+            sign = self.__advance()[1]
+            left = ArithmeticNode(sign, IntNode("0"), self.__expression(MULTIPLICATIVE))
+        else:
+            left = self.__factor()
+
+        while True:
+            token = self.__peek()
+            if token[0] != "op":
+                break
+
+            power = BINDING_POWERS.get(token[1])
+            if power is None or power < min_power:
+                break
+
+            self.__advance()
+            left = self.__binary(token[1], left, self.__expression(power + 1))
+
+        return left
+
+    @staticmethod
+    def __binary(op, left, right):
+        if op in ("<", "<=", ">", ">=", "=="):
+            return ConditionNode(op, left, right)
+        elif op == "=":
+            return AssignNode(left, right)
+        elif op in ("+", "-", "*", "/", "%"):
+            return ArithmeticNode(op, left, right)
+        elif op in ("||", "&&"):
+            return LogicNode(op, left, right)
+        raise Exception("Incorrect operand")
+
+    def __factor(self):
+        token = self.__peek()
+        kind = token[0]
+
+        if kind == "int":
+            self.__advance()
+            return IntNode(token[1])
+        elif kind == "string":
+            self.__advance()
+            return StringNode(token[1][1:-1])
+        elif kind == "op":
+            if token[1] == "!":
+                self.__advance()
+                return NotNode(self.__factor())
+            elif token[1] == "(":
+                self.__advance()
+                expression = self.__expression()
+                self.__expect(")")
+                return expression
+            elif self.__is_sign():
+                number = self.__peek(1)
+                if number[0] == "int" and number[2] == token[3]:
+                    self.position += 2
+                    return IntNode(token[1] + number[1])
+        elif kind == "name":
+            if token[1] in ("true", "false"):
+                self.__advance()
+                return BoolNode(token[1])
+
+            variable = self.__variable()
+            if self.__check("("):
+                self.__advance()
+                params = []
+                if not self.__check(")"):
+                    params.append(self.__expression())
+                    while self.__check(","):
+                        self.__advance()
+                        params.append(self.__expression())
+                self.__expect(")")
+                return CallNode(variable, params)
+            return variable
+
+        self.__fail("expression")
@@ -1,8 +1,6 @@
 class Type():
     def __eq__(self, other):
-        try:
-            if self.__class__.__name__ == other.__class__.name__:
-                return True
-        except:
-            return False
-        return False
\ No newline at end of file
+        return self.__class__ is other.__class__ and str(self) == str(other)
+
+    def __ne__(self, other):
+        return not self == other
@@ -0,0 +1,6 @@
+from Type import Type
+
+class QubitType(Type):
+     
+     def __str__(self):
+        return "qubit"
\ No newline at end of file
@@ -0,0 +1,6 @@
+from Type import Type
+
+class StringType(Type):
+     
+     def __str__(self):
+        return "string"
\ No newline at end of file
@@ -0,0 +1,220 @@
+import numpy
+
+from statevector import StateVector, MAX_QUBITS
+from mappedvector import MappedVector
+from sparsevector import SparseVector, SPARSE_BELOW, DENSE_ABOVE
+
+
+class FactoredState():
+    # a product of state vectors, one per group of qubits that have been
+    # entangled. single qubit gates stay inside their group, cnot merges
+    # two groups and measuring splits the qubit back out, so memory follows
+    # the largest group rather than the number of qubits. groups with few
+    # nonzero amplitudes are kept as sparse vectors, which may also grow
+    # past the qubits a dense vector can hold. with a storage, dense groups
+    # are mapped from files once they outgrow a chunk
+    def __init__(self, random, max_qubits=MAX_QUBITS, sparse_below=SPARSE_BELOW, dense_above=DENSE_ABOVE,
+                 storage=None, gate_pool=None, debug=0):
+        if sparse_below > dense_above:
+            raise Exception("The sparse threshold cannot be above the dense threshold")
+
+        self.random = random
+        self.max_qubits = max_qubits
+        self.sparse_below = sparse_below
+        self.dense_above = dense_above
+        self.storage = storage
+        self.gate_pool = gate_pool
+        self.debug = debug
+        self.groups = {}
+        self.members = {}
+        self.free = []
+        self.size = 0
+
+    def allocate(self):
+        if self.free:
+            qubit = self.free.pop()
+        else:
+            qubit = self.size
+            self.size += 1
+
+        self.__add_group(qubit, 0)
+        return qubit
+
+    def release(self, qubit):
+        # measuring leaves the qubit in a group of its own, which is dropped
+        self.measure(qubit)
+        self.members.pop(self.groups.pop(qubit))
+        self.free.append(qubit)
+
+    def is_entangled(self, qubit):
+        return len(self.members[self.groups[qubit]]) > 1
+
+    def get_size(self):
+        return len(self.groups)
+
+    def get_groups(self):
+        return self.members.values()
+
+    def hadamard(self, qubit):
+        group = self.groups[qubit]
+        group.hadamard(self.members[group].index(qubit))
+
+        # only a hadamard changes the number of amplitudes a sparse vector
+        # holds, counting the dense ones is left to measurements
+        if isinstance(group, SparseVector):
+            self.__adapt(group)
+
+    def hadamard_all(self, qubits):
+        # every dense group takes its own qubits in one transform. a sparse
+        # one fills up with each hadamard and may turn dense part way
+        groups = []
+        members = {}
+        for qubit in qubits:
+            group = self.groups[qubit]
+            if group not in members:
+                groups.append(group)
+                members[group] = []
+            members[group].append(qubit)
+
+        for group in groups:
+            if isinstance(group, SparseVector):
+                for qubit in members[group]:
+                    self.hadamard(qubit)
+            else:
+                group.hadamard_all([self.members[group].index(qubit) for qubit in members[group]])
+
+    def pauliy(self, qubit):
+        group = self.groups[qubit]
+        group.pauliy(self.members[group].index(qubit))
+
+    def cnot(self, control, target):
+        group = self.groups[control]
+        other = self.groups[target]
+
+        if group is not other:
+            group = self.__merge(group, other)
+
+        members = self.members[group]
+        group.cnot(members.index(control), members.index(target))
+
+    def measure(self, qubit):
+        group = self.groups[qubit]
+        members = self.members[group]
+        index = members.index(qubit)
+        outcome = group.measure(index)
+
+        if len(members) > 1:
+            group.remove(index, outcome)
+            members.pop(index)
+            self.__add_group(qubit, outcome)
+            self.__adapt(group)
+
+        return outcome
+
+    def sample(self, qubits, shots):
+        # groups are independent of each other, so each is sampled on its
+        # own, in the order of their qubits to keep seeded runs repeatable
+        samples = numpy.zeros((shots, len(qubits)), dtype=numpy.uint8)
+        groups = []
+        columns = {}
+        for column, qubit in enumerate(qubits):
+            group = self.groups[qubit]
+            if group not in columns:
+                groups.append(group)
+                columns[group] = []
+            columns[group].append(column)
+
+        for group in groups:
+            group_columns = columns[group]
+            members = self.members[group]
+            local = [members.index(qubits[column]) for column in group_columns]
+            samples[:, group_columns] = group.sample(local, shots)
+        return samples
+
+    def __merge(self, group, other):
+        # two sparse groups stay sparse, and so do groups too large to be
+        # dense, otherwise both become dense
+        members = self.members.pop(group) + self.members.pop(other)
+        if len(members) > self.max_qubits or \
+                (isinstance(group, SparseVector) and isinstance(other, SparseVector)):
+            merged = self.__sparse(group)
+            merged.merge(self.__sparse(other))
+        else:
+            merged = self.__dense(group)
+            merged.merge(self.__dense(other))
+
+        for qubit in members:
+            self.groups[qubit] = merged
+        self.members[merged] = members
+
+        if self.debug > 0:
+            print "Merged qubits", members
+
+        return self.__adapt(merged)
+
+    def __adapt(self, group):
+        # switches a group between sparse and dense once the fraction of
+        # nonzero amplitudes crosses one of the thresholds, and returns the
+        # group the qubits are in now
+        size = group.get_size()
+        if size > self.max_qubits:
+            # too large to be dense, so it is held to the same memory
+            if group.get_count() > 1 << self.max_qubits:
+                raise Exception("Cannot hold more than " + str(1 << self.max_qubits) + " amplitudes")
+            return group
+
+        fill = float(group.get_count()) / (1 << size)
+        if isinstance(group, SparseVector):
+            if fill <= self.dense_above:
+                return group
+            replacement = self.__dense(group)
+        elif fill < self.sparse_below:
+            replacement = self.__sparse(group)
+        else:
+            return group
+
+        members = self.members.pop(group)
+        for qubit in members:
+            self.groups[qubit] = replacement
+        self.members[replacement] = members
+
+        if self.debug > 0:
+            print "Stored qubits", members, "sparsely" if isinstance(replacement, SparseVector) else "densely"
+
+        return replacement
+
+    def __dense(self, group):
+        if not isinstance(group, SparseVector):
+            return group
+
+        if self.storage is None:
+            amplitudes = numpy.zeros(1 << group.get_size(), dtype=numpy.complex128)
+        else:
+            amplitudes = self.storage.create(1 << group.get_size())
+
+        if group.get_count() > 0:
+            indices, values = zip(*sorted(group.get_amplitudes().iteritems()))
+            amplitudes[list(indices)] = values
+        return self.__create_vector(amplitudes)
+
+    def __sparse(self, group):
+        if isinstance(group, SparseVector):
+            return group
+
+        indices, values = group.get_nonzero()
+        return SparseVector(self.random, group.get_size(), dict(zip(indices.tolist(), values.tolist())))
+
+    def __create_vector(self, amplitudes=None):
+        if self.storage is None:
+            return StateVector(self.random, self.max_qubits, amplitudes, self.gate_pool)
+        return MappedVector(self.random, self.storage, self.max_qubits, amplitudes)
+
+    def __add_group(self, qubit, value):
+        group = self.__create_vector()
+        group.allocate()
+        if value == 1:
+            # Y only adds a global phase to the flip
+            group.pauliy(0)
+
+        self.groups[qubit] = group
+        self.members[group] = [qubit]
@@ -0,0 +1,72 @@
+import atexit
+import os
+from multiprocessing.pool import ThreadPool
+
+
+# vectors with fewer amplitudes than this are left to a single thread
+THREAD_THRESHOLD = 1 << 18
+
+# thread pools by process and number of threads. simulators share them, and
+# a forked process starts its own as threads do not survive a fork
+thread_pools = {}
+
+# set once the interpreter exits. multiprocessing stops the threads of the
+# pools then, so qubits released after that are left to the calling thread
+exiting = False
+
+
+def stop_thread_pools():
+    global exiting
+    exiting = True
+
+
+atexit.register(stop_thread_pools)
+
+
+class GatePool():
+    # runs a gate kernel over the halves of a state vector in blocks on a
+    # pool of threads. numpy lets go of the GIL while it works on arrays, so
+    # the blocks of a large vector are worked on at the same time
+    def __init__(self, threads=1, threshold=THREAD_THRESHOLD):
+        if threads < 1:
+            raise Exception("Expected at least one thread")
+
+        self.threads = threads
+        self.threshold = threshold
+
+    def get_threads(self):
+        return self.threads
+
+    def map(self, kernel, *halves):
+        # the halves are views of the same shape, split along their longest
+        # axis. returns what the kernel returned for every block
+        shape = halves[0].shape
+        if self.threads == 1 or exiting or 2 * halves[0].size < self.threshold:
+            return [kernel(*halves)]
+
+        return self.__split(kernel, halves, max(range(len(shape)), key=lambda i: shape[i]))
+
+    def map_rows(self, kernel, rows):
+        # like map, but the blocks are always rows of the first axis, for
+        # kernels that work across all of the others
+        if self.threads == 1 or exiting or rows.size < self.threshold:
+            return [kernel(rows)]
+
+        return self.__split(kernel, (rows,), 0)
+
+    def __split(self, kernel, halves, axis):
+        shape = halves[0].shape
+        parts = min(self.threads, shape[axis])
+        blocks = []
+        for part in xrange(parts):
+            index = [slice(None)] * len(shape)
+            index[axis] = slice(shape[axis] * part // parts, shape[axis] * (part + 1) // parts)
+            blocks.append([half[tuple(index)] for half in halves])
+
+        return self.__get_pool().map(lambda block: kernel(*block), blocks)
+
+    def __get_pool(self):
+        key = (os.getpid(), self.threads)
+        if key not in thread_pools:
+            thread_pools[key] = ThreadPool(self.threads)
+        return thread_pools[key]
@@ -0,0 +1,78 @@
+import mmap
+import os
+import tempfile
+
+import numpy
+
+
+# amplitudes per chunk, 1MB of complex128 that stays in cache while a gate
+# works on it
+CHUNK_SIZE = 1 << 16
+
+# amplitudes in a page, chunks are a whole number of pages
+PAGE_AMPLITUDES = mmap.PAGESIZE // numpy.dtype(numpy.complex128).itemsize
+
+
+class MappedStorage():
+    # creates the files state vectors are mapped from and counts the chunks
+    # read from and written to them. the files are deleted as soon as they
+    # are mapped, so they are gone with the last vector using them. arrays
+    # that fit in one chunk are kept in memory instead
+    def __init__(self, directory, chunk_size=None):
+        if chunk_size is None:
+            chunk_size = CHUNK_SIZE
+        if not os.path.isdir(directory):
+            raise Exception(directory + " is not a directory")
+        if chunk_size < PAGE_AMPLITUDES or chunk_size & (chunk_size - 1) != 0:
+            raise Exception("The chunk size has to be a power of two of at least " + str(PAGE_AMPLITUDES) +
+                            " amplitudes")
+
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.files = 0
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def get_chunk_size(self):
+        return self.chunk_size
+
+    def create(self, length):
+        if length <= self.chunk_size:
+            return numpy.zeros(length, dtype=numpy.complex128)
+
+        # a new file reads as zeros without any of it being written
+        descriptor, path = tempfile.mkstemp(suffix=".state", dir=self.directory)
+        try:
+            amplitudes = numpy.memmap(path, dtype=numpy.complex128, mode="w+", shape=(length,))
+        finally:
+            os.close(descriptor)
+            os.unlink(path)
+
+        self.files += 1
+        return amplitudes
+
+    def read(self, amplitudes, start, stop):
+        chunk = numpy.array(amplitudes[start:stop])
+        if isinstance(amplitudes, numpy.memmap):
+            self.reads += 1
+            self.bytes_read += chunk.nbytes
+        return chunk
+
+    def write(self, amplitudes, start, chunk):
+        amplitudes[start:start + len(chunk)] = chunk
+        if isinstance(amplitudes, numpy.memmap):
+            self.writes += 1
+            self.bytes_written += chunk.nbytes
+
+    def get_reads(self):
+        return self.reads
+
+    def get_writes(self):
+        return self.writes
+
+    def __str__(self):
+        return "state: " + str(self.reads) + " chunks read (" + str(self.bytes_read >> 20) + "MB), " + \
+               str(self.writes) + " chunks written (" + str(self.bytes_written >> 20) + "MB), " + \
+               str(self.files) + " files"
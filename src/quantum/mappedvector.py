@@ -0,0 +1,210 @@
+import math
+
+import numpy
+
+from statevector import StateVector, hadamard_kernel, pauliy_kernel, swap_kernel, norm_kernel, collapse_kernel, \
+    walsh_kernel, walsh_matrix, walsh_groups, WALSH_QUBITS
+
+
+# 2^34 amplitudes take 256GB of disk
+MAPPED_MAX_QUBITS = 34
+
+
+class MappedVector(StateVector):
+    # a state vector whose amplitudes are in a file mapped into memory, once
+    # they no longer fit in one chunk. gates stream over the file a chunk at
+    # a time, and a gate on a qubit with a stride of a chunk or more pairs
+    # each chunk with the one a stride further, so at most two chunks of
+    # the vector are in memory at once
+    def __init__(self, random, storage, max_qubits=MAPPED_MAX_QUBITS, amplitudes=None):
+        if amplitudes is None:
+            amplitudes = storage.create(1)
+            amplitudes[0] = 1
+        StateVector.__init__(self, random, max_qubits, amplitudes)
+        self.storage = storage
+
+    def allocate(self):
+        if self.free:
+            return self.free.pop()
+
+        if self.size == self.max_qubits:
+            raise Exception("Cannot allocate more than " + str(self.max_qubits) + " qubits")
+
+        # the new qubit is the highest bit, its half of the file is zeros
+        amplitudes = self.storage.create(2 * len(self.amplitudes))
+        for start, chunk in self.__chunks():
+            self.storage.write(amplitudes, start, chunk)
+        self.amplitudes = amplitudes
+        self.size += 1
+        return self.size - 1
+
+    def release(self, qubit):
+        if self.measure(qubit) == 1:
+            for zero, one, _ in self.__pairs(qubit):
+                swap_kernel(zero, one)
+        self.free.append(qubit)
+
+    def merge(self, other):
+        if self.size + other.size > self.max_qubits:
+            raise Exception("Cannot entangle more than " + str(self.max_qubits) + " qubits")
+
+        # index i of the other vector covers indices i * low to (i + 1) * low
+        # of the merged one, written a chunk of them at a time
+        low = len(self.amplitudes)
+        high = len(other.amplitudes)
+        chunk_size = self.storage.get_chunk_size()
+        amplitudes = self.storage.create(low * high)
+
+        if low >= chunk_size:
+            for row in xrange(high):
+                factor = other.amplitudes[row]
+                for start, chunk in self.__chunks():
+                    self.storage.write(amplitudes, row * low + start, chunk * factor)
+        else:
+            rows = max(chunk_size // low, 1)
+            own = self.storage.read(self.amplitudes, 0, low)
+            for row in xrange(0, high, rows):
+                factors = self.storage.read(other.amplitudes, row, row + rows)
+                self.storage.write(amplitudes, row * low, numpy.outer(factors, own).ravel())
+
+        self.amplitudes = amplitudes
+        offset = self.size
+        self.size += other.size
+        return offset
+
+    def remove(self, qubit, outcome):
+        amplitudes = self.storage.create(len(self.amplitudes) // 2)
+        low = (1 << qubit) - 1
+        for zero, one, start in self.__pairs(qubit, write=False):
+            half = one if outcome == 1 else zero
+            self.storage.write(amplitudes, ((start >> (qubit + 1)) << qubit) | (start & low), half.ravel())
+
+        self.amplitudes = amplitudes
+        self.size -= 1
+
+    def get_count(self):
+        return sum(numpy.count_nonzero(chunk) for _, chunk in self.__chunks())
+
+    def get_nonzero(self):
+        indices = []
+        values = []
+        for start, chunk in self.__chunks():
+            nonzero = numpy.flatnonzero(chunk)
+            indices.append(nonzero + start)
+            values.append(chunk[nonzero])
+        return numpy.concatenate(indices), numpy.concatenate(values)
+
+    def hadamard(self, qubit):
+        for zero, one, _ in self.__pairs(qubit):
+            hadamard_kernel(zero, one)
+
+    def hadamard_all(self, qubits):
+        # qubits below the chunk size are transformed inside each chunk. the
+        # others are transformed up to WALSH_QUBITS at a time across the
+        # chunks that differ only in them, which are read and written
+        # together, so a pass over the file covers several qubits. the first
+        # pass also does the transforms inside the chunks it reads
+        chunk_size = min(self.storage.get_chunk_size(), len(self.amplitudes))
+        chunk_bits = chunk_size.bit_length() - 1
+        inside = [(group, walsh_matrix(len(group)))
+                  for group in walsh_groups([qubit for qubit in qubits if qubit < chunk_bits])]
+        outside = sorted(qubit - chunk_bits for qubit in qubits if qubit >= chunk_bits)
+        passes = [outside[start:start + WALSH_QUBITS] for start in xrange(0, len(outside), WALSH_QUBITS)] or [[]]
+
+        for bits in passes:
+            matrix = walsh_matrix(len(bits))
+            mask = sum(1 << bit for bit in bits)
+            offsets = [sum(1 << bits[i] for i in xrange(len(bits)) if j >> i & 1) for j in xrange(1 << len(bits))]
+
+            for chunk in xrange(len(self.amplitudes) // chunk_size):
+                if chunk & mask:
+                    continue
+
+                starts = [(chunk | offset) * chunk_size for offset in offsets]
+                block = numpy.array([self.storage.read(self.amplitudes, start, start + chunk_size)
+                                     for start in starts])
+                if bits:
+                    block = matrix.dot(block)
+                for group, group_matrix in inside:
+                    walsh_kernel(block.reshape(-1, 1 << len(group), 1 << group[0]), group_matrix)
+
+                for start, row in zip(starts, block):
+                    self.storage.write(self.amplitudes, start, row)
+            inside = []
+
+    def pauliy(self, qubit):
+        for zero, one, _ in self.__pairs(qubit):
+            pauliy_kernel(zero, one)
+
+    def cnot(self, control, target):
+        step = 2 << target
+        for zero, one, start in self.__pairs(target):
+            rows, columns = zero.shape
+            indices = start + (numpy.arange(rows) * step)[:, numpy.newaxis] + numpy.arange(columns)
+            flip = ((indices >> control) & 1).astype(bool)
+
+            temp = zero[flip]
+            zero[flip] = one[flip]
+            one[flip] = temp
+
+    def measure(self, qubit):
+        probability = sum(norm_kernel(one) for _, one, _ in self.__pairs(qubit, write=False))
+        probability = min(max(probability, 0.0), 1.0)
+        outcome = int(self.random.random_sample() < probability)
+
+        scale = 1 / math.sqrt(probability if outcome == 1 else 1 - probability)
+        for zero, one, _ in self.__pairs(qubit):
+            if outcome == 1:
+                collapse_kernel(one, zero, scale)
+            else:
+                collapse_kernel(zero, one, scale)
+        return outcome
+
+    def sample(self, qubits, shots):
+        # shots are spread over the chunks by their probabilities first and
+        # then drawn within each chunk
+        totals = numpy.array([numpy.vdot(chunk, chunk).real for _, chunk in self.__chunks()])
+        counts = self.random.multinomial(shots, totals / totals.sum())
+
+        indices = []
+        for (start, chunk), count in zip(self.__chunks(), counts):
+            if count > 0:
+                probabilities = numpy.abs(chunk) ** 2
+                indices.append(start + self.random.choice(len(chunk), size=count, p=probabilities / probabilities.sum()))
+
+        indices = numpy.concatenate(indices)
+        return ((indices[:, numpy.newaxis] >> numpy.array(qubits, dtype=numpy.int64)) & 1).astype(numpy.uint8)
+
+    def __chunks(self):
+        chunk_size = self.storage.get_chunk_size()
+        for start in xrange(0, len(self.amplitudes), chunk_size):
+            yield start, self.storage.read(self.amplitudes, start, start + chunk_size)
+
+    def __pairs(self, qubit, write=True):
+        # the amplitudes with the qubit clear and with it set, as rows of
+        # consecutive indices a row step of twice the stride apart, along
+        # with the index of the first one. they are written back once the
+        # loop body has changed them
+        stride = 1 << qubit
+        length = len(self.amplitudes)
+        chunk_size = min(self.storage.get_chunk_size(), length)
+
+        if stride < chunk_size:
+            # both halves are in every chunk
+            for start in xrange(0, length, chunk_size):
+                chunk = self.storage.read(self.amplitudes, start, start + chunk_size)
+                view = chunk.reshape(-1, 2, stride)
+                yield view[:, 0, :], view[:, 1, :], start
+                if write:
+                    self.storage.write(self.amplitudes, start, chunk)
+            return
+
+        for base in xrange(0, length, 2 * stride):
+            for offset in xrange(0, stride, chunk_size):
+                start = base + offset
+                zero = self.storage.read(self.amplitudes, start, start + chunk_size)
+                one = self.storage.read(self.amplitudes, start + stride, start + stride + chunk_size)
+                yield zero.reshape(1, -1), one.reshape(1, -1), start
+                if write:
+                    self.storage.write(self.amplitudes, start, zero)
+                    self.storage.write(self.amplitudes, start + stride, one)
@@ -0,0 +1,2 @@
+class MeasurementFeedback(Exception):
+    pass
@@ -0,0 +1,108 @@
+import multiprocessing
+
+from measurementfeedback import MeasurementFeedback
+from shotsimulator import ShotSimulator
+
+
+# shots are handed to the workers this many at a time
+CHUNK_SHOTS = 16
+
+# the runner whose shots the workers of a pool run. pools fork, so it is
+# set before one is started instead of being pickled with every chunk
+worker_runner = None
+
+
+def run_chunk(seeds):
+    return worker_runner.run_shots(seeds)
+
+
+class ShotRunner():
+    # runs a program for a number of shots and counts how often each output
+    # comes up. run takes a simulator and returns what the program printed,
+    # create_simulator takes a seed. when nothing depends on a measurement
+    # the state is simulated once and sampled for every shot, and the
+    # program is only run again per distinct sample, without simulating.
+    # otherwise every shot is a run of its own, spread over a pool of
+    # workers
+    def __init__(self, run, create_simulator, shots, seed=None, workers=1, debug=0):
+        if shots < 1:
+            raise Exception("Expected at least one shot")
+        if workers < 1:
+            raise Exception("Expected at least one worker")
+
+        self.run_program = run
+        self.create_simulator = create_simulator
+        self.shots = shots
+        self.seed = seed
+        self.workers = workers
+        self.debug = debug
+
+    def run(self):
+        simulator = ShotSimulator(self.create_simulator(self.seed), self.shots)
+        try:
+            output = self.run_program(simulator)
+        except Exception as e:
+            # the first run measures 0 throughout, which a program that
+            # checks its measurements may not expect
+            if not simulator.is_measured():
+                raise
+            return self.__run_each(e)
+        simulator.finish()
+
+        if not simulator.is_measured():
+            return {output: self.shots}
+
+        import numpy
+
+        samples, counts = numpy.unique(simulator.get_samples(), axis=0, return_counts=True)
+        histogram = {}
+        for sample, count in zip(samples, counts):
+            replay = simulator.replay(sample)
+            try:
+                output = self.run_program(replay)
+                replay.finish()
+                if replay.is_diverged():
+                    raise MeasurementFeedback("the operations depend on a measurement")
+            except MeasurementFeedback as e:
+                return self.__run_each(e)
+
+            histogram[output] = histogram.get(output, 0) + int(count)
+
+        if self.debug > 0:
+            print "Sampled", self.shots, "shots with", len(samples), "runs"
+        return histogram
+
+    def run_shots(self, seeds):
+        histogram = {}
+        for seed in seeds:
+            output = self.run_program(self.create_simulator(seed))
+            histogram[output] = histogram.get(output, 0) + 1
+        return histogram
+
+    def __run_each(self, reason):
+        global worker_runner
+        import numpy
+
+        if self.debug > 0:
+            print "Running every shot on", self.workers, "workers,", reason
+
+        # every shot has a seed of its own drawn from the master seed, so
+        # the counts do not depend on how the shots are split up
+        seeds = numpy.random.RandomState(self.seed).randint(0, 1 << 31, size=self.shots).tolist()
+        if self.workers == 1 or self.shots <= CHUNK_SHOTS:
+            return self.run_shots(seeds)
+
+        chunks = [seeds[start:start + CHUNK_SHOTS] for start in xrange(0, len(seeds), CHUNK_SHOTS)]
+        worker_runner = self
+        pool = multiprocessing.Pool(min(self.workers, len(chunks)))
+        try:
+            histograms = pool.map(run_chunk, chunks, chunksize=1)
+        finally:
+            pool.terminate()
+            worker_runner = None
+
+        histogram = {}
+        for chunk_histogram in histograms:
+            for output, count in chunk_histogram.iteritems():
+                histogram[output] = histogram.get(output, 0) + count
+        return histogram
@@ -0,0 +1,134 @@
+from measurementfeedback import MeasurementFeedback
+
+
+class ShotSimulator():
+    # stands in for the simulator while shots are sampled. the first run
+    # simulates every gate but defers the measurements: it measures 0 and
+    # the measured qubits are sampled for every shot at once when the run
+    # is over. a measured qubit that a later gate would change is copied
+    # onto a fresh qubit first, which is sampled in its place. later runs
+    # replay the recorded operations without simulating them and measure
+    # from one sample. a run that takes another path than the first means
+    # the measurements feed back into the program and raises
+    # MeasurementFeedback
+    def __init__(self, simulator, shots, operations=None, sample=None):
+        self.simulator = simulator
+        self.shots = shots
+        self.operations = operations if operations is not None else []
+        self.pending = {}
+        self.targets = []
+        self.samples = None
+        self.sample = sample
+        self.position = 0 if sample is not None else None
+        self.finished = False
+        self.diverged = False
+
+    def is_measured(self):
+        return len(self.targets) > 0
+
+    def get_samples(self):
+        return self.samples
+
+    def is_diverged(self):
+        return self.diverged
+
+    def finish(self):
+        # qubits collected after the run are not part of it
+        self.finished = True
+        if self.position is None and self.is_measured():
+            self.samples = self.simulator.sample(self.targets, self.shots)
+
+    def replay(self, sample):
+        # a fresh simulator per run, so qubits of an earlier run that are
+        # collected late cannot upset this one
+        return ShotSimulator(self.simulator, self.shots, self.operations, sample)
+
+    def get_backend(self):
+        return self.simulator.get_backend()
+
+    def get_state(self):
+        return self.simulator.get_state()
+
+    def allocate(self):
+        if self.position is not None:
+            return self.__replay(("allocate",))[1]
+
+        qubit = self.simulator.allocate()
+        self.operations.append(("allocate", qubit))
+        return qubit
+
+    def release(self, qubit):
+        # called when boxes are collected, so a release that does not fit
+        # is remembered rather than raised
+        if self.finished:
+            return
+
+        if self.position is not None:
+            if self.position == len(self.operations):
+                return
+            if self.diverged or self.operations[self.position] != ("release", qubit):
+                self.diverged = True
+                return
+            self.position += 1
+            return
+
+        # releasing measures the qubit, which would settle its partners
+        # for every shot, so entangled and measured qubits are kept
+        if qubit not in self.pending and not self.simulator.is_entangled(qubit):
+            self.simulator.release(qubit)
+        self.operations.append(("release", qubit))
+
+    def hadamard(self, qubit):
+        self.__gate(("hadamard", qubit), self.simulator.hadamard, [qubit], qubit)
+
+    def hadamard_all(self, qubits):
+        self.__gate(("hadamard_all", tuple(qubits)), self.simulator.hadamard_all, qubits, qubits)
+
+    def pauliy(self, qubit):
+        self.__gate(("pauliy", qubit), self.simulator.pauliy, [qubit], qubit)
+
+    def cnot(self, control, target):
+        # the control keeps its value, only the target has to be copied
+        self.__gate(("cnot", control, target), self.simulator.cnot, [target], control, target)
+
+    def measure(self, qubit):
+        if self.position is not None:
+            return int(self.sample[self.__replay(("measure", qubit))[2]])
+
+        if qubit not in self.pending:
+            self.pending[qubit] = len(self.targets)
+            self.targets.append(qubit)
+        self.operations.append(("measure", qubit, self.pending[qubit]))
+        return 0
+
+    def __gate(self, operation, gate, changed, *qubits):
+        if self.position is not None:
+            self.__replay(operation)
+            return
+
+        for qubit in changed:
+            self.__copy(qubit)
+        gate(*qubits)
+        self.operations.append(operation)
+
+    def __copy(self, qubit):
+        column = self.pending.pop(qubit, None)
+        if column is not None:
+            copy = self.simulator.allocate()
+            self.simulator.cnot(qubit, copy)
+            self.targets[column] = copy
+
+    def __replay(self, operation):
+        if self.diverged or self.position == len(self.operations):
+            self.__diverge()
+
+        recorded = self.operations[self.position]
+        if recorded[:len(operation)] != operation:
+            self.__diverge()
+
+        self.position += 1
+        return recorded
+
+    def __diverge(self):
+        self.diverged = True
+        raise MeasurementFeedback("the operations depend on a measurement")
@@ -0,0 +1,98 @@
+from sparsevector import SPARSE_BELOW, DENSE_ABOVE
+from gatepool import GatePool
+
+
+BACKENDS = ("factored", "statevector", "stabilizer")
+
+
+class Simulator():
+    # the quantum state shared by every qubit of a run. it is only created
+    # when the first qubit is allocated, so numpy is never imported by
+    # programs that do not use qubits. state vectors are mapped from files
+    # when there is a storage to create them in, and gates on vectors in
+    # memory are split between the threads of the gate pool
+    def __init__(self, seed=None, backend="factored", sparse_below=SPARSE_BELOW, dense_above=DENSE_ABOVE,
+                 storage=None, gate_pool=None, debug=0):
+        if backend not in BACKENDS:
+            raise Exception("Unknown quantum backend " + backend + ", expected one of " + str(BACKENDS))
+
+        self.seed = seed
+        self.backend = backend
+        self.sparse_below = sparse_below
+        self.dense_above = dense_above
+        self.storage = storage
+        self.gate_pool = gate_pool if gate_pool is not None else GatePool()
+        self.debug = debug
+        self.state = None
+
+    def allocate(self):
+        if self.state is None:
+            self.state = self.__create_state()
+
+        qubit = self.state.allocate()
+        if self.debug > 0:
+            print "Allocated qubit", qubit
+        return qubit
+
+    def release(self, qubit):
+        if self.debug > 0:
+            print "Released qubit", qubit
+        self.state.release(qubit)
+
+    def is_entangled(self, qubit):
+        # only the factored state knows which qubits share a group, the
+        # other states are taken to entangle all of their qubits
+        if self.backend != "factored":
+            return True
+        return self.state.is_entangled(qubit)
+
+    def get_backend(self):
+        return self.backend
+
+    def get_state(self):
+        return self.state
+
+    def hadamard(self, qubit):
+        self.state.hadamard(qubit)
+
+    def hadamard_all(self, qubits):
+        self.state.hadamard_all(qubits)
+
+    def pauliy(self, qubit):
+        self.state.pauliy(qubit)
+
+    def cnot(self, control, target):
+        if control == target:
+            raise Exception("cnot needs two different qubits")
+        self.state.cnot(control, target)
+
+    def measure(self, qubit):
+        return self.state.measure(qubit)
+
+    def sample(self, qubits, shots):
+        return self.state.sample(qubits, shots)
+
+    def __create_state(self):
+        import numpy
+
+        if self.debug > 0:
+            print "Simulating qubits with the", self.backend, "backend"
+
+        random = numpy.random.RandomState(self.seed)
+        if self.backend == "stabilizer":
+            from stabilizertableau import StabilizerTableau
+            return StabilizerTableau(random)
+        elif self.backend == "factored":
+            from factoredstate import FactoredState
+            if self.storage is not None:
+                from mappedvector import MAPPED_MAX_QUBITS
+                return FactoredState(random, max_qubits=MAPPED_MAX_QUBITS, sparse_below=self.sparse_below,
+                                     dense_above=self.dense_above, storage=self.storage, debug=self.debug)
+            return FactoredState(random, sparse_below=self.sparse_below, dense_above=self.dense_above,
+                                 gate_pool=self.gate_pool, debug=self.debug)
+        elif self.storage is not None:
+            from mappedvector import MappedVector
+            return MappedVector(random, self.storage)
+
+        from statevector import StateVector
+        return StateVector(random, gate_pool=self.gate_pool)
@@ -0,0 +1,115 @@
+import math
+
+
+SQRT_HALF = math.sqrt(0.5)
+
+# amplitudes smaller than this are taken to have cancelled out
+TOLERANCE = 1e-12
+
+# fractions of nonzero amplitudes below which a state is stored sparsely and
+# above which it is stored densely again, apart so states do not flip back
+# and forth
+SPARSE_BELOW = 0.01
+DENSE_ABOVE = 0.05
+
+
+class SparseVector():
+    # the nonzero amplitudes only, keyed by basis index with qubit k as bit k
+    # like in the dense vector. there is no limit on the number of qubits,
+    # memory follows the number of nonzero amplitudes instead
+    def __init__(self, random, size=0, amplitudes=None):
+        self.random = random
+        self.size = size
+        self.amplitudes = {0: 1 + 0j} if amplitudes is None else amplitudes
+        self.free = []
+
+    def allocate(self):
+        if self.free:
+            return self.free.pop()
+
+        # the new qubit is the highest bit and is |0>, no index changes
+        self.size += 1
+        return self.size - 1
+
+    def release(self, qubit):
+        if self.measure(qubit) == 1:
+            bit = 1 << qubit
+            self.amplitudes = dict((index ^ bit, amplitude) for index, amplitude in self.amplitudes.iteritems())
+        self.free.append(qubit)
+
+    def merge(self, other):
+        offset = self.size
+        self.amplitudes = dict(((other_index << offset) | index, other_amplitude * amplitude)
+                               for other_index, other_amplitude in other.amplitudes.iteritems()
+                               for index, amplitude in self.amplitudes.iteritems())
+        self.size += other.size
+        return offset
+
+    def remove(self, qubit, outcome):
+        # the bits above the qubit move down one place
+        bit = 1 << qubit
+        low = bit - 1
+        amplitudes = {}
+        for index, amplitude in self.amplitudes.iteritems():
+            if bool(index & bit) == bool(outcome):
+                amplitudes[((index >> (qubit + 1)) << qubit) | (index & low)] = amplitude
+        self.amplitudes = amplitudes
+        self.size -= 1
+
+    def get_size(self):
+        return self.size
+
+    def get_count(self):
+        return len(self.amplitudes)
+
+    def get_amplitudes(self):
+        return self.amplitudes
+
+    def hadamard(self, qubit):
+        bit = 1 << qubit
+        amplitudes = {}
+        for index, amplitude in self.amplitudes.iteritems():
+            amplitude *= SQRT_HALF
+            zero = index & ~bit
+            amplitudes[zero] = amplitudes.get(zero, 0) + amplitude
+            if index & bit:
+                amplitude = -amplitude
+            amplitudes[zero | bit] = amplitudes.get(zero | bit, 0) + amplitude
+
+        self.amplitudes = dict((index, amplitude) for index, amplitude in amplitudes.iteritems()
+                               if abs(amplitude) > TOLERANCE)
+
+    def pauliy(self, qubit):
+        bit = 1 << qubit
+        self.amplitudes = dict((index ^ bit, amplitude * (-1j if index & bit else 1j))
+                               for index, amplitude in self.amplitudes.iteritems())
+
+    def cnot(self, control, target):
+        control_bit = 1 << control
+        target_bit = 1 << target
+        self.amplitudes = dict((index ^ target_bit if index & control_bit else index, amplitude)
+                               for index, amplitude in self.amplitudes.iteritems())
+
+    def sample(self, qubits, shots):
+        # like the dense vector, but the bits are taken from the indices
+        # that are there rather than from every one. numpy is imported here
+        # as the simulator imports this module for its thresholds alone
+        import numpy
+
+        indices = self.amplitudes.keys()
+        probabilities = numpy.array([abs(self.amplitudes[index]) ** 2 for index in indices])
+        chosen = self.random.choice(len(indices), size=shots, p=probabilities / probabilities.sum())
+        bits = numpy.array([[(index >> qubit) & 1 for qubit in qubits] for index in indices], dtype=numpy.uint8)
+        return bits[chosen].reshape(shots, len(qubits))
+
+    def measure(self, qubit):
+        bit = 1 << qubit
+        probability = sum(abs(amplitude) ** 2 for index, amplitude in self.amplitudes.iteritems() if index & bit)
+
+        # the random number is drawn the same way as for the dense vector
+        probability = min(max(probability, 0.0), 1.0)
+        outcome = int(self.random.random_sample() < probability)
+        scale = 1 / math.sqrt(probability if outcome else 1 - probability)
+        self.amplitudes = dict((index, amplitude * scale) for index, amplitude in self.amplitudes.iteritems()
+                               if bool(index & bit) == bool(outcome))
+        return outcome
@@ -0,0 +1,226 @@
+import numpy
+
+
+WORD_BITS = 64
+
+# set bits in every byte value, for counting the bits of packed rows
+POPCOUNT = numpy.array([bin(i).count("1") for i in range(256)], dtype=numpy.int64)
+
+
+class StabilizerTableau():
+    # the CHP representation of a stabilizer state: every qubit has a
+    # destabilizer and a stabilizer row, each a Pauli product stored as
+    # bit-packed x and z words plus a sign bit. destabilizers take the rows
+    # from 0 and stabilizers the rows from capacity. unused rows stay the
+    # identity, which every operation below leaves alone
+    def __init__(self, random, capacity=WORD_BITS):
+        self.random = random
+        self.size = 0
+        self.free = []
+        self.capacity = 0
+        self.x = numpy.zeros((0, 0), dtype=numpy.uint64)
+        self.z = numpy.zeros((0, 0), dtype=numpy.uint64)
+        self.r = numpy.zeros(0, dtype=numpy.uint8)
+        self.__grow(capacity)
+
+    def allocate(self):
+        # released qubits are back in |0> and are handed out again first
+        if self.free:
+            return self.free.pop()
+
+        if self.size == self.capacity:
+            self.__grow(2 * self.capacity)
+
+        # a new qubit in |0> is destabilized by X and stabilized by Z
+        qubit = self.size
+        word, bit = self.__position(qubit)
+        self.x[qubit, word] = bit
+        self.z[self.capacity + qubit, word] = bit
+        self.size += 1
+        return qubit
+
+    def release(self, qubit):
+        # discarding a qubit is the same as measuring it and ignoring the
+        # outcome, it is then reset to |0> for reuse
+        if self.measure(qubit) == 1:
+            self.r ^= self.__column(self.z, qubit)
+        self.free.append(qubit)
+
+    def get_size(self):
+        return self.size
+
+    def hadamard(self, qubit):
+        x = self.__column(self.x, qubit)
+        z = self.__column(self.z, qubit)
+
+        self.r ^= x & z
+        self.__set_column(self.x, qubit, z)
+        self.__set_column(self.z, qubit, x)
+
+    def hadamard_all(self, qubits):
+        for qubit in qubits:
+            self.hadamard(qubit)
+
+    def pauliy(self, qubit):
+        # Y anticommutes with X and Z, so only the signs change
+        self.r ^= self.__column(self.x, qubit) ^ self.__column(self.z, qubit)
+
+    def cnot(self, control, target):
+        x_control = self.__column(self.x, control)
+        z_control = self.__column(self.z, control)
+        x_target = self.__column(self.x, target)
+        z_target = self.__column(self.z, target)
+
+        self.r ^= x_control & z_target & (x_target ^ z_control ^ 1)
+        self.__set_column(self.x, target, x_target ^ x_control)
+        self.__set_column(self.z, control, z_control ^ z_target)
+
+    def measure(self, qubit):
+        capacity = self.capacity
+        x = self.__column(self.x, qubit)
+
+        anticommuting = numpy.flatnonzero(x[capacity:2 * capacity])
+        if len(anticommuting) == 0:
+            return self.__measure_determined(x)
+
+        # the outcome is random: every other row that anticommutes with Z
+        # is multiplied by the first such stabilizer, which then becomes a
+        # destabilizer and is replaced by +-Z on the measured qubit
+        row = capacity + anticommuting[0]
+        targets = numpy.flatnonzero(x[:2 * capacity])
+        self.__rowsum(targets[targets != row], row)
+
+        destabilizer = row - capacity
+        self.x[destabilizer] = self.x[row]
+        self.z[destabilizer] = self.z[row]
+        self.r[destabilizer] = self.r[row]
+
+        outcome = int(self.random.random_sample() < 0.5)
+        word, bit = self.__position(qubit)
+        self.x[row] = 0
+        self.z[row] = 0
+        self.z[row, word] = bit
+        self.r[row] = outcome
+        return outcome
+
+    def sample(self, qubits, shots):
+        # the outcomes a stabilizer state can give are one of them plus any
+        # sum of the x parts of its stabilizers, all equally likely. one is
+        # measured on a copy, the rest come from random sums of the rows
+        x = self.x.copy()
+        z = self.z.copy()
+        r = self.r.copy()
+        reference = numpy.array([self.measure(qubit) for qubit in qubits], dtype=numpy.uint8)
+        self.x[...] = x
+        self.z[...] = z
+        self.r[...] = r
+
+        rows = numpy.column_stack([self.__column(self.x, qubit)[self.capacity:self.capacity + self.size]
+                                   for qubit in qubits])
+        coefficients = self.random.randint(0, 2, size=(shots, self.size))
+        sums = numpy.dot(coefficients.astype(numpy.float64), rows.astype(numpy.float64))
+        return (sums.astype(numpy.int64) % 2).astype(numpy.uint8) ^ reference
+
+    def __measure_determined(self, x):
+        # Z is already a product of stabilizers, the ones paired with the
+        # destabilizers that anticommute with it, and the sign of that
+        # product is the outcome. stabilizers commute, so rather than
+        # multiplying them one at a time the power of i is counted at once:
+        # one for every Y going in, minus one for every Y coming out, and
+        # two for every Z that has to move past a later X
+        rows = self.capacity + numpy.flatnonzero(x[:self.capacity])
+        words = (self.size + WORD_BITS - 1) // WORD_BITS
+        xs = self.x[rows, :words]
+        zs = self.z[rows, :words]
+
+        z_before = numpy.bitwise_xor.accumulate(zs, axis=0) ^ zs
+        swaps = numpy.bitwise_xor.reduce(z_before & xs, axis=0)
+        x_product = numpy.bitwise_xor.reduce(xs, axis=0)
+        z_product = numpy.bitwise_xor.reduce(zs, axis=0)
+
+        phase = 2 * int(self.r[rows].sum()) + self.__count_bits_mod4(xs & zs) - \
+            self.__count_bits(x_product & z_product) + 2 * self.__count_bits(swaps)
+        return (phase % 4) // 2
+
+    def __rowsum(self, targets, source):
+        # multiplies every target row by the source row. the sign of each
+        # product follows from the power of i picked up per qubit, which is
+        # +1 or -1 wherever the two Paulis differ
+        if len(targets) == 0:
+            return
+
+        x1 = self.x[source]
+        z1 = self.z[source]
+        x2 = self.x[targets]
+        z2 = self.z[targets]
+
+        plus = (x1 & z1 & z2 & ~x2) | (x1 & ~z1 & x2 & z2) | (~x1 & z1 & x2 & ~z2)
+        minus = (x1 & z1 & x2 & ~z2) | (x1 & ~z1 & ~x2 & z2) | (~x1 & z1 & x2 & z2)
+        phase = 2 * self.r[targets].astype(numpy.int64) + 2 * int(self.r[source]) + \
+            self.__popcount(plus) - self.__popcount(minus)
+
+        self.r[targets] = (phase % 4) // 2
+        self.x[targets] = x2 ^ x1
+        self.z[targets] = z2 ^ z1
+
+    @staticmethod
+    def __popcount(words):
+        return POPCOUNT[words.view(numpy.uint8)].reshape(len(words), -1).sum(axis=1)
+
+    @staticmethod
+    def __count_bits(words):
+        return int(POPCOUNT[words.view(numpy.uint8)].sum())
+
+    @staticmethod
+    def __count_bits_mod4(words):
+        # adds the rows pairwise as two bit counters per bit position, which
+        # halves the rows every step and only keeps the count mod 4
+        low = words
+        high = numpy.zeros_like(words)
+        while len(low) > 1:
+            if len(low) % 2 == 1:
+                low = numpy.vstack((low, numpy.zeros_like(low[:1])))
+                high = numpy.vstack((high, numpy.zeros_like(high[:1])))
+
+            carry = low[0::2] & low[1::2]
+            low = low[0::2] ^ low[1::2]
+            high = high[0::2] ^ high[1::2] ^ carry
+
+        return int(POPCOUNT[low.view(numpy.uint8)].sum() + 2 * POPCOUNT[high.view(numpy.uint8)].sum()) % 4
+
+    @staticmethod
+    def __position(qubit):
+        return qubit // WORD_BITS, numpy.uint64(1 << (qubit % WORD_BITS))
+
+    @staticmethod
+    def __column(bits, qubit):
+        # the bit of one qubit in every row, as 0 or 1
+        shift = numpy.uint64(qubit % WORD_BITS)
+        return ((bits[:, qubit // WORD_BITS] >> shift) & numpy.uint64(1)).astype(numpy.uint8)
+
+    @staticmethod
+    def __set_column(bits, qubit, column):
+        word = qubit // WORD_BITS
+        shift = numpy.uint64(qubit % WORD_BITS)
+        bits[:, word] &= ~(numpy.uint64(1) << shift)
+        bits[:, word] |= column.astype(numpy.uint64) << shift
+
+    def __grow(self, capacity):
+        # both halves move to their new offsets, the packed words of the
+        # existing qubits keep their place
+        words = capacity // WORD_BITS
+        x = numpy.zeros((2 * capacity, words), dtype=numpy.uint64)
+        z = numpy.zeros((2 * capacity, words), dtype=numpy.uint64)
+        r = numpy.zeros(2 * capacity, dtype=numpy.uint8)
+
+        old = self.capacity
+        old_words = self.x.shape[1]
+        for start, new_start in ((0, 0), (old, capacity)):
+            x[new_start:new_start + old, :old_words] = self.x[start:start + old]
+            z[new_start:new_start + old, :old_words] = self.z[start:start + old]
+            r[new_start:new_start + old] = self.r[start:start + old]
+
+        self.x = x
+        self.z = z
+        self.r = r
+        self.capacity = capacity
@@ -0,0 +1,215 @@
+import math
+
+import numpy
+
+from gatepool import GatePool
+
+
+SQRT_HALF = math.sqrt(0.5)
+
+# 2^26 amplitudes take 1GB
+MAX_QUBITS = 26
+
+# a hadamard on several qubits is a fast Walsh-Hadamard transform with a
+# radix of up to 2^4, one pass over the vector for every four qubits. the
+# passes work through 256KB of amplitudes at a time
+WALSH_QUBITS = 4
+WALSH_BLOCK = 1 << 14
+
+
+# kernels working in place on the amplitudes with a qubit clear and set,
+# or on any block of them
+
+
+def hadamard_kernel(zero, one):
+    temp = zero.copy()
+    zero += one
+    zero *= SQRT_HALF
+    temp -= one
+    numpy.multiply(temp, SQRT_HALF, out=one)
+
+
+def pauliy_kernel(zero, one):
+    temp = zero.copy()
+    numpy.multiply(one, -1j, out=zero)
+    numpy.multiply(temp, 1j, out=one)
+
+
+def swap_kernel(zero, one):
+    temp = zero.copy()
+    zero[...] = one
+    one[...] = temp
+
+
+def norm_kernel(amplitudes):
+    return numpy.vdot(amplitudes, amplitudes).real
+
+
+def collapse_kernel(keep, drop, scale):
+    keep *= scale
+    drop[...] = 0
+
+
+def walsh_kernel(rows, matrix):
+    # multiplies the middle axis of the rows by a hadamard matrix a block at
+    # a time, so the temporaries stay in cache
+    _, width, inner = rows.shape
+    count = max(WALSH_BLOCK // (width * inner), 1)
+    span = min(inner, max(WALSH_BLOCK // width, 1))
+    for start in xrange(0, len(rows), count):
+        for column in xrange(0, inner, span):
+            block = rows[start:start + count, :, column:column + span]
+            if span == 1:
+                # the matrix is symmetric, so it can multiply from the right
+                block[:, :, 0] = block[:, :, 0].dot(matrix)
+            else:
+                block[...] = numpy.matmul(matrix, block)
+
+
+def walsh_matrix(count):
+    # the hadamard on count qubits, the sign of an entry being the parity
+    # of the bits its row and column have in common
+    indices = numpy.arange(1 << count)
+    parity = numpy.zeros((1 << count, 1 << count), dtype=numpy.int64)
+    for bit in xrange(count):
+        parity ^= (indices[:, numpy.newaxis] >> bit) & (indices >> bit) & 1
+    return (1 - 2 * parity) * math.sqrt(0.5) ** count + 0j
+
+
+def walsh_groups(qubits):
+    # runs of consecutive qubits, which are one axis of the state vector,
+    # at most WALSH_QUBITS to a run
+    groups = []
+    for qubit in sorted(qubits):
+        if groups and groups[-1][-1] == qubit - 1 and len(groups[-1]) < WALSH_QUBITS:
+            groups[-1].append(qubit)
+        else:
+            groups.append([qubit])
+    return groups
+
+
+class StateVector():
+    # amplitudes of every basis state, qubit k is bit k of the index. gates
+    # work on strided views of the axes they touch, so no operator larger
+    # than the vector itself is ever built. the gate pool splits the views
+    # of large vectors between threads
+    def __init__(self, random, max_qubits=MAX_QUBITS, amplitudes=None, gate_pool=None):
+        self.random = random
+        self.max_qubits = max_qubits
+        self.gate_pool = gate_pool if gate_pool is not None else GatePool()
+        if amplitudes is None:
+            amplitudes = numpy.ones(1, dtype=numpy.complex128)
+        self.amplitudes = amplitudes
+        self.size = len(amplitudes).bit_length() - 1
+        self.free = []
+
+    def allocate(self):
+        # released qubits are back in |0> and are handed out again first
+        if self.free:
+            return self.free.pop()
+
+        if self.size == self.max_qubits:
+            raise Exception("Cannot allocate more than " + str(self.max_qubits) + " qubits")
+
+        # the new qubit is the highest bit and starts out as |0>
+        amplitudes = numpy.zeros(2 * len(self.amplitudes), dtype=numpy.complex128)
+        amplitudes[:len(self.amplitudes)] = self.amplitudes
+        self.amplitudes = amplitudes
+        self.size += 1
+        return self.size - 1
+
+    def release(self, qubit):
+        # discarding a qubit is the same as measuring it and ignoring the
+        # outcome, it is then reset to |0> for reuse
+        if self.measure(qubit) == 1:
+            self.gate_pool.map(swap_kernel, *self.__halves(qubit))
+        self.free.append(qubit)
+
+    def merge(self, other):
+        # the qubits of the other vector follow this vector's own, the
+        # combined state is their tensor product
+        if self.size + other.size > self.max_qubits:
+            raise Exception("Cannot entangle more than " + str(self.max_qubits) + " qubits")
+
+        self.amplitudes = numpy.outer(other.amplitudes, self.amplitudes).ravel()
+        offset = self.size
+        self.size += other.size
+        return offset
+
+    def remove(self, qubit, outcome):
+        # drops a measured qubit, which leaves the others in the half of the
+        # amplitudes that agrees with the outcome
+        self.amplitudes = self.__halves(qubit)[outcome].flatten()
+        self.size -= 1
+
+    def get_size(self):
+        return self.size
+
+    def get_count(self):
+        return numpy.count_nonzero(self.amplitudes)
+
+    def get_nonzero(self):
+        indices = numpy.flatnonzero(self.amplitudes)
+        return indices, self.amplitudes[indices]
+
+    def get_amplitudes(self):
+        return self.amplitudes
+
+    def hadamard(self, qubit):
+        self.gate_pool.map(hadamard_kernel, *self.__halves(qubit))
+
+    def hadamard_all(self, qubits):
+        # a hadamard on each of the qubits, a run of consecutive ones at a
+        # time instead of a pass over the vector per qubit
+        for group in walsh_groups(qubits):
+            if len(group) == 1:
+                self.hadamard(group[0])
+                continue
+
+            matrix = walsh_matrix(len(group))
+            rows = self.amplitudes.reshape(-1, 1 << len(group), 1 << group[0])
+            self.gate_pool.map_rows(lambda block: walsh_kernel(block, matrix), rows)
+
+    def pauliy(self, qubit):
+        self.gate_pool.map(pauliy_kernel, *self.__halves(qubit))
+
+    def cnot(self, control, target):
+        low = min(control, target)
+        high = max(control, target)
+        view = self.amplitudes.reshape(-1, 2, 1 << (high - low - 1), 2, 1 << low)
+
+        # axis 1 is the higher of the two qubits and axis 3 the lower one,
+        # the target is flipped wherever the control is set
+        if control == high:
+            zero = view[:, 1, :, 0, :]
+            one = view[:, 1, :, 1, :]
+        else:
+            zero = view[:, 0, :, 1, :]
+            one = view[:, 1, :, 1, :]
+
+        self.gate_pool.map(swap_kernel, zero, one)
+
+    def measure(self, qubit):
+        zero, one = self.__halves(qubit)
+
+        probability = min(max(sum(self.gate_pool.map(norm_kernel, one)), 0.0), 1.0)
+        if self.random.random_sample() < probability:
+            scale = 1 / math.sqrt(probability)
+            self.gate_pool.map(lambda keep, drop: collapse_kernel(keep, drop, scale), one, zero)
+            return 1
+
+        scale = 1 / math.sqrt(1 - probability)
+        self.gate_pool.map(lambda keep, drop: collapse_kernel(keep, drop, scale), zero, one)
+        return 0
+
+    def sample(self, qubits, shots):
+        # measures the qubits of as many copies of the state as there are
+        # shots, leaving the state itself as it is
+        probabilities = numpy.abs(self.amplitudes) ** 2
+        indices = self.random.choice(len(probabilities), size=shots, p=probabilities / probabilities.sum())
+        return ((indices[:, numpy.newaxis] >> numpy.array(qubits, dtype=numpy.int64)) & 1).astype(numpy.uint8)
+
+    def __halves(self, qubit):
+        # the amplitudes with the qubit clear and with it set, as views
+        view = self.amplitudes.reshape(-1, 2, 1 << qubit)
+        return view[:, 0, :], view[:, 1, :]
@@ -0,0 +1,289 @@
+from ..parser.types.inttype import IntType
+from ..parser.types.booltype import BoolType
+from ..parser.types.voidtype import VoidType
+from ..parser.types.arraytype import ArrayType
+from ..parser.types.stringtype import StringType
+from ..parser.types.qubittype import QubitType
+from ..interpreter.arrayfunctions import ARRAY_FUNCTIONS
+from ..interpreter.quantumfunctions import QUANTUM_FUNCTIONS
+
+
+INT = IntType()
+BOOL = BoolType()
+VOID = VoidType()
+STRING = StringType()
+QUBIT = QubitType()
+
+RETURN_TYPES = {
+    "int": INT,
+    "void": VOID,
+    "qubit": QUBIT
+}
+
+LVALUES = ("VariableNode", "IndexNode", "AssignNode")
+
+
+class TypeChecker():
+    def __init__(self, debug=0):
+        self.debug = debug
+        self.built_in_functions = ("print", "read")
+        self.functions = {}
+        self.function_names = set()
+        self.function = None
+        self.scopes = []
+        self.checkers = {
+            "ArithmeticNode": self.__arithmetic,
+            "AssignNode": self.__assign,
+            "BoolNode": self.__bool,
+            "CallNode": self.__call,
+            "CompoundNode": self.__compound,
+            "ConditionNode": self.__condition,
+            "IfNode": self.__if,
+            "IndexNode": self.__index,
+            "IntNode": self.__int,
+            "LogicNode": self.__logic,
+            "NewVariableNode": self.__new_variable,
+            "NotNode": self.__not,
+            "ReturnNode": self.__return,
+            "StatementsNode": self.__statements,
+            "StringNode": self.__string,
+            "VariableNode": self.__variable,
+            "WhileNode": self.__while
+        }
+
+    def check(self, program):
+        self.functions = {}
+        self.function_names = set(function.get_function_name() for function in program)
+        for function in program:
+            if function.get_function_name() in self.built_in_functions:
+                raise Exception("Cannot overwrite a built-in function: " + str(self.built_in_functions))
+
+            function_name = function.get_function_name_with_params()
+            if function_name in self.functions:
+                raise Exception(function_name + " already exists")
+
+            self.functions[function_name] = function
+
+        for function in program:
+            self.check_function(function)
+
+    def check_function(self, node):
+        self.function = node
+        self.scopes = [{}]
+
+        for param in node.get_params().get_params():
+            param_type = param.get_type()
+            if isinstance(param_type, ArrayType) and self.__is_qubits(param_type):
+                self.__fail("arrays of qubits cannot be parameters")
+            self.__check(param)
+        self.__check(node.get_statements())
+
+    def __check(self, node):
+        checker = self.checkers.get(node.__class__.__name__)
+        if checker is None:
+            raise Exception(node.__class__.__name__ + " is an unrecognized type")
+
+        node_type = checker(node)
+        if node_type is not None:
+            node.set_type(node_type)
+        return node_type
+
+    def __fail(self, message):
+        raise Exception("Type error in " + self.function.get_function_name_with_params() + ": " + message)
+
+    def __expect(self, node, expected, what):
+        found = self.__check(node)
+        if found != expected:
+            self.__fail(what + " must be " + str(expected) + ", found " + str(found))
+        return found
+
+    def __expect_value(self, node, what):
+        found = self.__check(node)
+        if found is None or isinstance(found, VoidType):
+            self.__fail(what + " has no value")
+        return found
+
+    @staticmethod
+    def __is_qubits(node_type):
+        # qubits and arrays of them cannot be copied, printed or read
+        if isinstance(node_type, ArrayType):
+            node_type = node_type.get_type()
+        return isinstance(node_type, QubitType)
+
+    def __arithmetic(self, node):
+        operation = node.get_arithmetic_operation()
+        self.__expect(node.get_left_expression(), INT, "left operand of " + operation)
+        self.__expect(node.get_right_expression(), INT, "right operand of " + operation)
+        return INT
+
+    def __assign(self, node):
+        left = node.get_left()
+        if left.__class__.__name__ not in LVALUES:
+            self.__fail("can only assign to variable")
+
+        variable_type = self.__check(left)
+        value_type = self.__expect_value(node.get_right(), "assigned value")
+
+        # ints and bools convert into each other, arrays must match exactly
+        # and strings are only ever arguments. qubits cannot be copied
+        if isinstance(value_type, StringType):
+            self.__fail("cannot assign string to " + str(variable_type))
+        elif self.__is_qubits(variable_type) or self.__is_qubits(value_type):
+            self.__fail("cannot assign " + str(value_type) + " to " + str(variable_type))
+        elif isinstance(variable_type, ArrayType) or isinstance(value_type, ArrayType):
+            if variable_type != value_type:
+                self.__fail("cannot assign " + str(value_type) + " to " + str(variable_type))
+
+        return variable_type
+
+    def __bool(self, node):
+        return BOOL
+
+    def __call(self, node):
+        function_name = node.get_function_name().get_value()
+        params = node.get_params()
+
+        if function_name == "print":
+            for param in params:
+                found = self.__expect_value(param, "argument of print")
+                if self.__is_qubits(found):
+                    self.__fail("cannot print " + str(found) + ", measure it first")
+            return VOID
+        elif function_name == "read":
+            for param in params:
+                if param.__class__.__name__ not in LVALUES:
+                    self.__fail("can only read into variable")
+                found = self.__check(param)
+                if self.__is_qubits(found):
+                    self.__fail("cannot read into " + str(found))
+            return VOID
+        elif function_name in ARRAY_FUNCTIONS and function_name not in self.function_names:
+            return self.__library_function(node, ARRAY_FUNCTIONS)
+        elif function_name in QUANTUM_FUNCTIONS and function_name not in self.function_names:
+            return self.__library_function(node, QUANTUM_FUNCTIONS)
+
+        for param in params:
+            function_name += "_" + str(self.__expect_value(param, "argument of " + function_name))
+        if not params:
+            function_name += "_void"
+
+        function = self.functions.get(function_name)
+        if function is None:
+            self.__fail("could not match function of type " + function_name)
+
+        node.set_resolved_name(function_name)
+        return function.get_return_type()
+
+    def __library_function(self, node, functions):
+        function_name = node.get_function_name().get_value()
+        _, param_types, return_type = functions[function_name]
+
+        params = node.get_params()
+        if len(params) != len(param_types):
+            self.__fail(function_name + " takes " + str(len(param_types)) + " arguments")
+
+        # the first array argument fixes what "array" and "element" mean
+        array_type = None
+        for i in range(len(params)):
+            what = "argument " + str(i + 1) + " of " + function_name
+            found = self.__expect_value(params[i], what)
+
+            expected = param_types[i]
+            if expected == "array" and array_type is None:
+                if not isinstance(found, ArrayType):
+                    self.__fail(what + " must be an array, found " + str(found))
+                if self.__is_qubits(found):
+                    self.__fail(what + " cannot be an array of qubits")
+                array_type = found
+                continue
+            elif expected == "qubits":
+                if not self.__is_qubits(found):
+                    self.__fail(what + " must be qubit or an array of qubits, found " + str(found))
+                continue
+            elif expected == "array":
+                expected = str(array_type)
+            elif expected == "element":
+                expected = str(array_type.get_type())
+
+            if str(found) != expected:
+                self.__fail(what + " must be " + expected + ", found " + str(found))
+
+        return RETURN_TYPES[return_type]
+
+    def __compound(self, node):
+        self.scopes.append({})
+        self.__check(node.get_statements())
+        self.scopes.pop()
+
+    def __condition(self, node):
+        comparison = node.get_comparison()
+        self.__expect(node.get_left_expression(), INT, "left operand of " + comparison)
+        self.__expect(node.get_right_expression(), INT, "right operand of " + comparison)
+        return BOOL
+
+    def __if(self, node):
+        self.__expect(node.get_condition(), BOOL, "if condition")
+        self.__check(node.get_true_expression())
+        if node.get_false_expression() is not None:
+            self.__check(node.get_false_expression())
+
+    def __index(self, node):
+        array_type = self.__check(node.get_name())
+        if not isinstance(array_type, ArrayType):
+            self.__fail(node.get_name().get_value() + " is not an array")
+
+        self.__expect(node.get_index(), INT, "array index")
+        return array_type.get_type()
+
+    def __int(self, node):
+        return INT
+
+    def __logic(self, node):
+        logic = node.get_logic_operation()
+        self.__expect(node.get_left_expression(), BOOL, "left operand of " + logic)
+        self.__expect(node.get_right_expression(), BOOL, "right operand of " + logic)
+        return BOOL
+
+    def __new_variable(self, node):
+        node_type = node.get_type()
+        if isinstance(node_type, ArrayType) and not isinstance(node_type.get_size(), int):
+            self.__expect(node_type.get_size(), INT, "array size")
+
+        name = node.get_variable_name().get_value()
+        if name in self.scopes[-1]:
+            self.__fail("variable of name " + name + " already exists")
+        self.scopes[-1][name] = node_type
+
+    def __not(self, node):
+        self.__expect(node.get_expression(), BOOL, "operand of !")
+        return BOOL
+
+    def __return(self, node):
+        return_type = self.function.get_return_type()
+
+        if node.get_return_value() is None:
+            if not isinstance(return_type, VoidType):
+                self.__fail("missing return value, expected " + str(return_type))
+        elif isinstance(return_type, VoidType):
+            self.__fail("void function returns a value")
+        else:
+            self.__expect(node.get_return_value(), return_type, "return value")
+
+    def __statements(self, node):
+        for statement in node.get_statements():
+            self.__check(statement)
+
+    def __string(self, node):
+        return STRING
+
+    def __variable(self, node):
+        name = node.get_value()
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+
+        self.__fail("variable " + name + " does not exist")
+
+    def __while(self, node):
+        self.__expect(node.get_condition(), BOOL, "while condition")
+        self.__check(node.get_expression())
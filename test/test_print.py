@@ -0,0 +1,49 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENGINES = ("tree", "closure", "vm")
+
+
+class PrintQubitsTest(unittest.TestCase):
+    # printing qubits fails at run time even when the type checker is off
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_program(self, source, engine):
+        path = os.path.join(self.directory, "program.txt")
+        with open(path, "w") as program_file:
+            program_file.write(source)
+
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "qInterpreter.py"), "--no-cache",
+                                    "--no-typecheck", "--engine", engine, path],
+                                   stdin=open(os.devnull), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, error = process.communicate()
+        return process.returncode, output, error
+
+    def test_qubit_array(self):
+        for engine in ENGINES:
+            code, output, error = self.run_program("int main() { qubit q[3]; print(q); }", engine)
+            self.assertNotEqual(code, 0)
+            self.assertEqual(output, "")
+            self.assertIn("Exception: cannot print array_qubit, measure it first", error)
+
+    def test_qubit(self):
+        for engine in ENGINES:
+            code, output, error = self.run_program("int main() { qubit q; print(q); }", engine)
+            self.assertNotEqual(code, 0)
+            self.assertEqual(output, "")
+            self.assertIn("Exception: cannot print qubit, measure it first", error)
+
+
+if __name__ == "__main__":
+    unittest.main()